@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Benchmark the time it takes to ``import pigskin.pigskin``.
+
+Front-ends (such as Kodi add-ons) start a new interpreter for every menu
+invocation, so import time is paid over and over. This measures it with
+``python -X importtime`` and fails if the budget is exceeded, or if any module
+which should only be imported on first use was imported.
+
+Usage: python benchmarks/import_time.py [--runs N]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# The budget (in milliseconds) for pigskin's own modules; i.e. the import time
+# of ``pigskin.pigskin`` minus that of ``requests``, which it needs to create
+# its HTTP session.
+BUDGET_MS = 20
+
+# These must only be imported when first used.
+LAZY_MODULES = [
+    'defusedxml',
+    'm3u8',
+    'multiprocessing.pool',
+    'numpy',
+    'pigskin.download',
+    'pigskin.europe.auth',
+    'pigskin.europe.video',
+    'pigskin.hls',
+    'pigskin.prefetch',
+    'pigskin.proxy',
+    'pigskin.schedule',
+    'pigskin.snapshot',
+    'uuid',
+]
+
+LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$')
+
+
+def measure():
+    """Import ``pigskin.pigskin`` in a fresh interpreter.
+
+    Returns
+    -------
+    dict
+        With the module name as the key and the cumulative import time (in
+        microseconds) as the value.
+    """
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='')
+    output = subprocess.check_output(
+        [sys.executable, '-X', 'importtime', '-c', 'import pigskin.pigskin'],
+        cwd=repo, env=env, stderr=subprocess.STDOUT,
+    ).decode()
+
+    modules = {}
+    for line in output.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7, help='the number of imports to take the median of')
+    args = parser.parse_args()
+
+    if sys.version_info < (3, 7):
+        print('SKIP: -X importtime needs Python 3.7 or newer')
+        return 0
+
+    # warm up (and compile) first
+    modules = measure()
+
+    eager = sorted(m for m in modules for lazy in LAZY_MODULES if m == lazy or m.startswith(lazy + '.'))
+    if eager:
+        print('FAIL: imported eagerly: {0}'.format(', '.join(eager)))
+        return 1
+
+    totals = []
+    own = []
+    for _ in range(args.runs):
+        modules = measure()
+        totals.append(modules['pigskin.pigskin'] / 1000.0)
+        own.append((modules['pigskin.pigskin'] - modules.get('requests', 0)) / 1000.0)
+
+    total_ms = sorted(totals)[len(totals) // 2]
+    own_ms = sorted(own)[len(own) // 2]
+    print('import pigskin.pigskin: {0:.1f} ms total, {1:.1f} ms excluding requests (budget: {2} ms)'.format(total_ms, own_ms, BUDGET_MS))
+
+    if own_ms > BUDGET_MS:
+        print('FAIL: over budget')
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+Benchmark the JSON decoding of the ``games`` route payload.
+
+``get_current_season_and_week()``, ``get_seasons()``, and ``get_weeks()`` all
+read the same (large) payload. This measures the time each decoder takes to
+parse it, and the time saved per request by decoding it once and sharing the
+tree among those consumers, rather than decoding it for each.
+
+The payload is read from a recorded test cassette.
+
+Usage: python benchmarks/json_decode.py [--runs N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import yaml
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from pigskin.decoder import DECODERS, _load_decoder
+
+CASSETTE = os.path.join(REPO, 'tests', 'cassettes', 'public_API', 'europe_pigskin_seasons.yaml')
+URL = 'https://www.nflgamepass.com/api/en/content/v1/web/games/seasons'
+
+# the consumers of the payload, which each decoded it themselves
+CONSUMERS = 3
+
+
+def load_payload():
+    with open(CASSETTE) as f:
+        cassette = yaml.safe_load(f)
+
+    for interaction in cassette['interactions']:
+        if interaction['request']['uri'] == URL:
+            body = interaction['response']['body']['string']
+            return body if isinstance(body, bytes) else body.encode('utf-8')
+
+    raise ValueError('{0} is not in the cassette'.format(URL))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=200, help='the number of decodes to time')
+    args = parser.parse_args()
+
+    payload = load_payload()
+    print('payload: {0:.1f} kB'.format(len(payload) / 1024.0))
+
+    baseline = None
+    for name in reversed(DECODERS):
+        loads = _load_decoder(name)
+        if loads is None:
+            print('{0:>6}: not installed'.format(name))
+            continue
+
+        ms = min(timeit.repeat(lambda: loads(payload), number=args.runs, repeat=3)) / args.runs * 1000
+        if baseline is None:
+            baseline = ms
+
+        # per request: CONSUMERS decodes with the stdlib before; one now
+        saved = baseline * CONSUMERS - ms
+        print('{0:>6}: {1:.3f} ms per decode; {2:.3f} ms ({3:.0f}%) saved per request when shared by {4} consumers'.format(
+            name, ms, saved, saved / (baseline * CONSUMERS) * 100, CONSUMERS))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Season statistics computed from game scores, with NumPy.
+
+NumPy is an optional dependency; install it with ``pip install
+pigskin[analytics]``.
+"""
+import logging
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class schedule_stats(object):
+    """The scores of many seasons' games, held in arrays for vectorized
+    statistics.
+
+    Games are loaded through ``week.games`` (and so reuse anything already
+    fetched or cached). Each row of the arrays keeps a reference to its
+    ``game`` object, for drill-down.
+
+    Parameters
+    ----------
+    pigskin_obj : pigskin
+    seasons : list
+        The seasons to load (e.g. ``['2016', '2017']``).
+    season_types : list
+        Any of ``pre``, ``reg``, and ``post``. Defaults to the regular season.
+
+    Raises
+    ------
+    ImportError
+        If NumPy is not installed.
+
+    Note
+    ----
+    Games without a score (not yet played) are loaded, but left out of every
+    statistic.
+    """
+    def __init__(self, pigskin_obj, seasons, season_types=('reg',)):
+        if np is None:
+            raise ImportError('schedule_stats requires NumPy; install pigskin[analytics]')
+
+        self._pigskin = pigskin_obj
+        self.logger = logging.getLogger(__name__)
+
+        rows = []
+        for s in seasons:
+            season_obj = self._pigskin.seasons[str(s)]
+            for st in season_types:
+                for w in season_obj.weeks.get(st, {}):
+                    games = season_obj.weeks[st][w].games
+                    if games is None:
+                        self.logger.warn('schedule_stats: no games for {0} {1} week {2}'.format(s, st, w))
+                        continue
+                    rows.extend((int(s), st, int(w), games[g]) for g in games)
+
+        self.teams = sorted(set(g.home['name'] for _, _, _, g in rows) | set(g.away['name'] for _, _, _, g in rows))
+        team_index = dict((t, i) for i, t in enumerate(self.teams))
+
+        def points(value):
+            return np.nan if value is None else value
+
+        self._games = [g for _, _, _, g in rows]
+        self.season = np.array([r[0] for r in rows], dtype=np.int32)
+        self.season_type = np.array([r[1] for r in rows])
+        self.week = np.array([r[2] for r in rows], dtype=np.int32)
+        self.home = np.array([team_index[g.home['name']] for g in self._games], dtype=np.int32)
+        self.away = np.array([team_index[g.away['name']] for g in self._games], dtype=np.int32)
+        self.home_points = np.array([points(g.home['points']) for g in self._games], dtype=np.float64)
+        self.away_points = np.array([points(g.away['points']) for g in self._games], dtype=np.float64)
+        self.played = ~(np.isnan(self.home_points) | np.isnan(self.away_points))
+
+
+    def __len__(self):
+        return len(self._games)
+
+
+    def game(self, i):
+        """Return the ``game`` object of a row."""
+        return self._games[i]
+
+
+    def games_of(self, team, season=None):
+        """Return the games of a team.
+
+        Parameters
+        ----------
+        team : str
+            The name of the team (e.g. Bears).
+        season : str or int
+            Only the games of this season. All loaded seasons if None.
+
+        Returns
+        -------
+        list
+            Of ``game`` objects, in loaded order.
+        """
+        t = self._team_index(team)
+        mask = (self.home == t) | (self.away == t)
+        if season is not None:
+            mask &= self.season == int(season)
+
+        return [self._games[i] for i in np.flatnonzero(mask)]
+
+
+    def aggregates(self, season=None):
+        """Return the per-team aggregates of played games.
+
+        Parameters
+        ----------
+        season : str or int
+            Only this season. If None, every loaded season is aggregated
+            separately.
+
+        Returns
+        -------
+        OrderedDict
+            With the team name as the key (or a ``(season, team)`` tuple if
+            ``season`` is None), and a dict with the keys ``games``, ``wins``,
+            ``losses``, ``ties``, ``points_for``, ``points_against``, and
+            ``margin`` as the value.
+        """
+        seasons, season_index = np.unique(self.season, return_inverse=True)
+        team_count = len(self.teams)
+        mask = self.played.copy()
+        if season is not None:
+            mask &= self.season == int(season)
+
+        # one entry per team per game: the home side, then the away side
+        key = np.concatenate([season_index * team_count + self.home, season_index * team_count + self.away])[np.tile(mask, 2)]
+        points_for = np.concatenate([self.home_points, self.away_points])[np.tile(mask, 2)]
+        points_against = np.concatenate([self.away_points, self.home_points])[np.tile(mask, 2)]
+
+        size = len(seasons) * team_count
+
+        def count(selected=None, weights=None):
+            if selected is None:
+                return np.bincount(key, weights=weights, minlength=size)
+            return np.bincount(key[selected], minlength=size)
+
+        columns = OrderedDict([
+            ('games', count()),
+            ('wins', count(points_for > points_against)),
+            ('losses', count(points_for < points_against)),
+            ('ties', count(points_for == points_against)),
+            ('points_for', count(weights=points_for)),
+            ('points_against', count(weights=points_against)),
+        ])
+        columns['margin'] = columns['points_for'] - columns['points_against']
+
+        stats = OrderedDict()
+        for k in np.flatnonzero(columns['games']):
+            s, t = str(seasons[k // team_count]), self.teams[k % team_count]
+            stats[t if season is not None else (s, t)] = dict((c, int(columns[c][k])) for c in columns)
+
+        return stats
+
+
+    def standings(self, season):
+        """Return the teams of a season ranked by their record.
+
+        Teams are ranked by win percentage (ties count as half a win), then by
+        point margin.
+
+        Parameters
+        ----------
+        season : str or int
+
+        Returns
+        -------
+        list
+            Of ``(team, stats)`` tuples, from first to last. ``stats`` is as
+            in ``aggregates()``, with an additional ``win_pct``.
+        """
+        stats = self.aggregates(season)
+        teams = list(stats)
+        if not teams:
+            return []
+
+        games = np.array([stats[t]['games'] for t in teams], dtype=np.float64)
+        wins = np.array([stats[t]['wins'] for t in teams], dtype=np.float64)
+        ties = np.array([stats[t]['ties'] for t in teams], dtype=np.float64)
+        margin = np.array([stats[t]['margin'] for t in teams])
+        win_pct = (wins + ties / 2) / games
+
+        standings = []
+        for i in np.lexsort((-margin, -win_pct)):
+            stats[teams[i]]['win_pct'] = float(win_pct[i])
+            standings.append((teams[i], stats[teams[i]]))
+
+        return standings
+
+
+    def head_to_head(self, team, opponent, season=None):
+        """Return a team's record against an opponent.
+
+        Parameters
+        ----------
+        team : str
+        opponent : str
+        season : str or int
+            Only this season. All loaded seasons if None.
+
+        Returns
+        -------
+        dict
+            From ``team``'s perspective, with the keys ``games``, ``wins``,
+            ``losses``, ``ties``, ``points_for``, and ``points_against``, and
+            ``matchups``: a list of the ``game`` objects (including unplayed
+            ones).
+        """
+        t, o = self._team_index(team), self._team_index(opponent)
+        matchups = ((self.home == t) & (self.away == o)) | ((self.home == o) & (self.away == t))
+        if season is not None:
+            matchups &= self.season == int(season)
+        mask = matchups & self.played
+
+        at_home = self.home[mask] == t
+        points_for = np.where(at_home, self.home_points[mask], self.away_points[mask])
+        points_against = np.where(at_home, self.away_points[mask], self.home_points[mask])
+
+        return {
+            'games': int(mask.sum()),
+            'wins': int((points_for > points_against).sum()),
+            'losses': int((points_for < points_against).sum()),
+            'ties': int((points_for == points_against).sum()),
+            'points_for': int(points_for.sum()),
+            'points_against': int(points_against.sum()),
+            'matchups': [self._games[i] for i in np.flatnonzero(matchups)],
+        }
+
+
+    def _team_index(self, team):
+        try:
+            return self.teams.index(team)
+        except ValueError:
+            raise KeyError(team)
@@ -0,0 +1,309 @@
+"""
+Circuit breakers for the upstream endpoints of Game Pass, with a fallback to
+the last good response.
+"""
+import logging
+import threading
+import time
+try:
+    from urllib.parse import urlparse
+except ImportError:  # Python 2.7
+    from urlparse import urlparse
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from .cache import bytes_lru_cache
+from .ratelimit import rate_limited_adapter
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class circuit_breaker(object):
+    """The circuit breaker of a single endpoint.
+
+    While closed, requests pass. After ``failure_threshold`` consecutive
+    failures it opens, and requests fail fast. Once ``reset_timeout`` seconds
+    have passed it is half-open: a single probe request is let through, which
+    closes the breaker if it succeeds, or opens it again if it fails.
+
+    Parameters
+    ----------
+    failure_threshold : int
+    reset_timeout : int or float
+        Seconds the breaker stays open before probing.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+
+        self.failures = 0  # consecutive
+        self.rejected = 0  # requests failed fast, in total
+        self.served_stale = 0  # requests answered with the last good response, in total
+        self._state = CLOSED
+        self._opened = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+
+    @property
+    def state(self):
+        """``closed``, ``open``, or ``half_open``."""
+        with self._lock:
+            if self._state == OPEN and time.time() - self._opened >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+
+    def allow(self):
+        """Whether a request may be sent now.
+
+        Returns
+        -------
+        bool
+            False if the request should fail fast.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+
+            if time.time() - self._opened < self.reset_timeout or self._probing:
+                self.rejected += 1
+                return False
+
+            self._state = HALF_OPEN
+            self._probing = True
+            return True
+
+
+    def record(self, success):
+        """Record the outcome of a request that was allowed.
+
+        Returns
+        -------
+        bool
+            True if this outcome changed the state of the breaker.
+        """
+        with self._lock:
+            previous = self._state
+            self._probing = False
+
+            if success:
+                self.failures = 0
+                self._state = CLOSED
+            else:
+                self.failures += 1
+                if self._state == HALF_OPEN or self.failures >= self.failure_threshold:
+                    self._state = OPEN
+                    self._opened = time.time()
+
+            return self._state != previous
+
+
+    def stats(self):
+        """The state of the breaker.
+
+        Returns
+        -------
+        dict
+            With the keys ``state``, ``failures``, ``rejected``, and
+            ``served_stale``.
+        """
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'rejected': self.rejected,
+            'served_stale': self.served_stale,
+        }
+
+
+class circuit_breakers(object):
+    """A circuit breaker per endpoint, and the last good response of each URL.
+
+    An endpoint is a named URL template (see ``add_endpoint()``), such as a
+    route of the config, so one failing route does not make the others of
+    its host fail fast. URLs of no endpoint are each their own, by host and
+    path.
+
+    Parameters
+    ----------
+    failure_threshold : int
+    reset_timeout : int or float
+    fallback_bytes : int
+        The maximum total size of the kept last good responses.
+
+    Note
+    ----
+    Only the successful GET responses of metadata (JSON or XML: schedules,
+    config, shows, ...) which carried neither an ``Authorization`` nor a
+    ``Cookie`` header are kept, so one account's data is never served to
+    another (the breakers may be shared by many accounts), and video is never
+    held in memory.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30, fallback_bytes=8 * 1024 * 1024):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.fallback = bytes_lru_cache(fallback_bytes)
+        self.logger = logging.getLogger(__name__)
+
+        self._breakers = {}
+        self._endpoints = []  # (name, template)
+        self._lock = threading.Lock()
+
+
+    def __getitem__(self, endpoint):
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = circuit_breaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[endpoint]
+
+
+    @property
+    def endpoints(self):
+        """The endpoints requested so far."""
+        with self._lock:
+            return list(self._breakers)
+
+
+    def add_endpoint(self, name, template):
+        """Give the URLs of a template a breaker of their own.
+
+        Parameters
+        ----------
+        name : str
+            The name of the endpoint. An endpoint may have many templates.
+        template : object
+            With a ``matches(url)`` method, such as a ``url_template``.
+
+        Note
+        ----
+        Templates are tried in the order they were added.
+        """
+        with self._lock:
+            if (name, template) not in self._endpoints:
+                self._endpoints.append((name, template))
+
+
+    def endpoint(self, url):
+        """Return the endpoint of a URL.
+
+        Returns
+        -------
+        str
+            The name of the first endpoint with a template matching the URL;
+            otherwise its host and path.
+        """
+        with self._lock:
+            endpoints = list(self._endpoints)
+
+        for name, template in endpoints:
+            if template.matches(url):
+                return name
+
+        parsed = urlparse(url)
+        return parsed.netloc + parsed.path
+
+
+    def stats(self):
+        """The state of every endpoint's breaker.
+
+        Returns
+        -------
+        dict
+            With the endpoint as the key, and ``circuit_breaker.stats()`` as
+            the value.
+        """
+        return dict((endpoint, self[endpoint].stats()) for endpoint in self.endpoints)
+
+
+    def record(self, endpoint, success):
+        """Record the outcome of a request to an endpoint, logging any change
+        of state of its breaker."""
+        breaker = self[endpoint]
+        if breaker.record(success):
+            self.logger.warn('circuit breaker for {0} is {1}'.format(endpoint, breaker.state))
+
+
+    def stale(self, endpoint, method, url):
+        """Return the last good response body of a request which was not
+        allowed, or None if there is none to serve."""
+        body = self.fallback.get(url) if method == 'GET' else None
+        if body is not None:
+            self[endpoint].served_stale += 1
+
+        return body
+
+
+    def keep(self, method, url, request_headers, response_headers, body):
+        """Keep a successful response as the fallback of its URL, if it is
+        metadata (see the class notes)."""
+        content_type = response_headers.get('Content-Type', '')
+        if (method == 'GET'
+                and 'Authorization' not in request_headers
+                and 'Cookie' not in request_headers
+                and ('json' in content_type or 'xml' in content_type)):
+            self.fallback.set(url, body)
+
+
+class circuit_breaker_adapter(rate_limited_adapter):
+    """A rate limited transport adapter which also fails fast while the
+    breaker of an endpoint is open.
+
+    While open, a GET is answered with the last good response of its URL if
+    one is kept (with an ``X-Pigskin-Stale`` header); any other request gets
+    a synthetic ``503 Service Unavailable``, which callers handle like any
+    other failed request.
+
+    Parameters
+    ----------
+    limiter : rate_limiter
+    breakers : circuit_breakers
+    """
+    def __init__(self, limiter, breakers, **kwargs):
+        self.breakers = breakers
+        super(circuit_breaker_adapter, self).__init__(limiter, **kwargs)
+
+
+    def send(self, request, **kwargs):
+        endpoint = self.breakers.endpoint(request.url)
+
+        if not self.breakers[endpoint].allow():
+            return self._fail_fast(endpoint, request)
+
+        try:
+            response = super(circuit_breaker_adapter, self).send(request, **kwargs)
+        except Exception:
+            self.breakers.record(endpoint, False)
+            raise
+
+        self.breakers.record(endpoint, response.status_code < 500)
+
+        if response.ok and not kwargs.get('stream'):
+            self.breakers.keep(request.method, request.url, request.headers, response.headers, response.content)
+
+        return response
+
+
+    def _fail_fast(self, endpoint, request):
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.headers = CaseInsensitiveDict()
+        response.encoding = 'utf-8'
+        response._content_consumed = True
+
+        body = self.breakers.stale(endpoint, request.method, request.url)
+        if body is not None:
+            response.status_code = 200
+            response.reason = 'OK'
+            response.headers['X-Pigskin-Stale'] = '1'
+            response._content = body
+        else:
+            response.status_code = 503
+            response.reason = 'Service Unavailable (circuit open)'
+            response._content = b''
+
+        return response
+
@@ -0,0 +1,233 @@
+"""
+Small, thread-safe caches shared by the pigskin objects.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class ttl_cache(object):
+    """A dict-like cache whose entries expire after a time-to-live.
+
+    Parameters
+    ----------
+    ttl : int or float
+        The default number of seconds an entry is considered fresh.
+
+    Note
+    ----
+    All methods are safe to call from multiple threads (e.g. the stream
+    prefetcher and the front-end's own thread).
+    """
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+
+    def __len__(self):
+        with self._lock:
+            self._purge()
+            return len(self._entries)
+
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+    def delete(self, key):
+        """Remove an entry, if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+    def get(self, key, default=None):
+        """Return the value of a fresh entry.
+
+        Parameters
+        ----------
+        key : hashable
+            The key of the entry.
+        default
+            What to return when the entry is missing or has expired.
+
+        Returns
+        -------
+        The cached value, or ``default``.
+        """
+        with self._lock:
+            try:
+                value, expires = self._entries[key]
+            except KeyError:
+                return default
+
+            if expires <= time.time():
+                del self._entries[key]
+                return default
+
+        return value
+
+
+    def items(self):
+        """Return the fresh entries.
+
+        Returns
+        -------
+        list
+            Of ``(key, value, expires)`` tuples, where ``expires`` is a UNIX
+            timestamp.
+        """
+        with self._lock:
+            self._purge()
+            return [(k, self._entries[k][0], self._entries[k][1]) for k in self._entries]
+
+
+    def set(self, key, value, ttl=None):
+        """Store a value.
+
+        Parameters
+        ----------
+        key : hashable
+            The key of the entry.
+        value
+            The value to cache.
+        ttl : int or float
+            Seconds the entry is fresh for. Defaults to the cache's ``ttl``.
+            ``float('inf')`` never expires.
+        """
+        if ttl is None:
+            ttl = self.ttl
+
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+
+
+    def _purge(self):
+        """Drop expired entries. The caller must hold the lock."""
+        now = time.time()
+        for key in [k for k in self._entries if self._entries[k][1] <= now]:
+            del self._entries[key]
+
+
+class bytes_lru_cache(object):
+    """A least-recently-used cache of byte strings, bounded by total size.
+
+    Parameters
+    ----------
+    max_bytes : int
+        The maximum total size of all entries. The least recently used entries
+        are evicted to make room for new ones.
+    directory : str
+        If set, entries are stored as files in this directory rather than in
+        memory. The directory is created if needed.
+
+    Note
+    ----
+    Values larger than ``max_bytes`` are never cached.
+    """
+    def __init__(self, max_bytes=64 * 1024 * 1024, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.size = 0
+
+        self._entries = OrderedDict()  # key -> value (or file path) and size
+        self._lock = threading.Lock()
+
+        if self.directory and not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            for key in list(self._entries):
+                self._evict(key)
+
+
+    def get(self, key, default=None):
+        """Return the value of an entry, and mark it as recently used.
+
+        Returns
+        -------
+        bytes
+            The cached value, or ``default`` if missing.
+        """
+        with self._lock:
+            try:
+                value, size = self._entries.pop(key)
+            except KeyError:
+                return default
+
+            self._entries[key] = (value, size)
+
+            if self.directory:
+                try:
+                    with open(value, 'rb') as f:
+                        return f.read()
+                except (IOError, OSError):
+                    del self._entries[key]
+                    self.size -= size
+                    return default
+
+        return value
+
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries if needed.
+
+        Returns
+        -------
+        bool
+            True if the value was cached, False if it is too large.
+        """
+        size = len(value)
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+
+            while self._entries and self.size + size > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+
+            if self.directory:
+                path = os.path.join(self.directory, hashlib.sha1(repr(key).encode()).hexdigest())
+                with open(path, 'wb') as f:
+                    f.write(value)
+                value = path
+
+            self._entries[key] = (value, size)
+            self.size += size
+
+        return True
+
+
+    def _evict(self, key):
+        """Remove an entry. The caller must hold the lock."""
+        value, size = self._entries.pop(key)
+        self.size -= size
+
+        if self.directory:
+            try:
+                os.remove(value)
+            except OSError:
+                pass
@@ -0,0 +1,121 @@
+"""
+Pluggable persistence of login state, so that new processes start
+authenticated.
+"""
+import json
+import logging
+import os
+import threading
+
+from .files import replace
+
+
+class credential_store(object):
+    """The interface of a credential store.
+
+    A credential store persists a dict holding the ``username``, the
+    ``access_token`` and ``refresh_token`` (and their ``token_expiry``, a UNIX
+    timestamp), the ``auth_method`` that last succeeded, the ``subscription``
+    tag, and the session ``cookies``. Subclass it to keep credentials somewhere
+    else (e.g. a keyring or a database).
+    """
+    def load(self):
+        """Return the saved credentials.
+
+        Returns
+        -------
+        dict
+            None if nothing has been saved.
+        """
+        raise NotImplementedError
+
+
+    def save(self, credentials):
+        """Save credentials, replacing any previously saved.
+
+        Parameters
+        ----------
+        credentials : dict
+        """
+        raise NotImplementedError
+
+
+    def clear(self):
+        """Forget any saved credentials."""
+        raise NotImplementedError
+
+
+class memory_credential_store(credential_store):
+    """Keep credentials in memory; mostly useful to share them between
+    pigskin instances of the same process."""
+    def __init__(self):
+        self._credentials = None
+
+
+    def load(self):
+        if self._credentials is None:
+            return None
+
+        return dict(self._credentials)
+
+
+    def save(self, credentials):
+        self._credentials = dict(credentials)
+
+
+    def clear(self):
+        self._credentials = None
+
+
+class file_credential_store(credential_store):
+    """Keep credentials in a JSON file.
+
+    Parameters
+    ----------
+    path : str
+        The file to keep the credentials in.
+
+    Note
+    ----
+    The tokens grant access to the account. The file is created readable by
+    its owner only; make sure it is kept somewhere private.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                credentials = json.load(f)
+        except (IOError, OSError):
+            return None
+        except ValueError:
+            self.logger.error('file_credential_store: {0} is corrupt; ignoring'.format(self.path))
+            return None
+
+        if not isinstance(credentials, dict):
+            return None
+
+        return credentials
+
+
+    def save(self, credentials):
+        tmp_path = self.path + '.tmp'
+
+        with self._lock:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(credentials, f)
+
+            replace(tmp_path, self.path)
+
+
+    def clear(self):
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
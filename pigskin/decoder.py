@@ -0,0 +1,129 @@
+"""
+JSON decoding of response bodies, with the fastest decoder installed.
+
+``orjson`` or ``ujson`` are used if installed (``pip install
+pigskin[speedups]``); otherwise the standard library's ``json``.
+"""
+import json
+
+from . import settings
+from .cache import ttl_cache
+
+DECODERS = ['orjson', 'ujson', 'json']
+
+
+def _load_decoder(name):
+    """Return the ``loads()`` of a decoder, which accepts bytes. None if it is
+    not installed."""
+    if name == 'orjson':
+        try:
+            import orjson
+        except ImportError:
+            return None
+        return orjson.loads
+
+    if name == 'ujson':
+        try:
+            import ujson
+        except ImportError:
+            return None
+        return ujson.loads
+
+    if name == 'json':
+        def loads(content):
+            if isinstance(content, bytes) and not isinstance(content, str):  # Python 3
+                content = content.decode('utf-8')
+            return json.loads(content)
+        return loads
+
+    raise ValueError('unknown JSON decoder: {0}'.format(name))
+
+
+class frozen_dict(dict):
+    """A ``dict`` which cannot be modified. Copies of it can."""
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('a shared JSON tree is read-only; modify a copy')
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class frozen_list(list):
+    """A ``list`` which cannot be modified. Copies of it can."""
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('a shared JSON tree is read-only; modify a copy')
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def freeze(tree):
+    """Return a decoded JSON tree made of ``frozen_dict`` and ``frozen_list``,
+    so that sharing it is safe.
+
+    Parameters
+    ----------
+    tree
+        A decoded JSON document.
+
+    Returns
+    -------
+    The read-only tree. ``copy.deepcopy()`` of it is a plain, modifiable one.
+    """
+    if isinstance(tree, dict):
+        return frozen_dict((k, freeze(tree[k])) for k in tree)
+    if isinstance(tree, list):
+        return frozen_list(freeze(v) for v in tree)
+    return tree
+
+
+class json_decoder(object):
+    """Decode JSON, and share decoded trees among the consumers of a URL.
+
+    Parameters
+    ----------
+    name : str
+        ``orjson``, ``ujson``, or ``json``. The fastest one installed if None.
+    shared_ttl : int or float
+        Seconds a shared tree is reused.
+
+    Note
+    ----
+    A shared tree is handed to every consumer as is, so it is frozen (see
+    ``freeze()``): modifying it raises ``TypeError``.
+    """
+    def __init__(self, name=None, shared_ttl=settings.json_shared_ttl):
+        for candidate in [name] if name else DECODERS:
+            loads = _load_decoder(candidate)
+            if loads is not None:
+                break
+        else:
+            raise ImportError('JSON decoder {0} is not installed'.format(name))
+
+        self.name = candidate
+        self.shared = ttl_cache(shared_ttl)
+        self._loads = loads
+
+
+    def decode(self, content):
+        """Decode a JSON document.
+
+        Parameters
+        ----------
+        content : bytes
+
+        Returns
+        -------
+        The decoded document.
+
+        Raises
+        ------
+        ValueError
+            If ``content`` is not valid JSON.
+        """
+        return self._loads(content)
@@ -0,0 +1,212 @@
+"""
+Download (archive) game versions to disk.
+"""
+import logging
+import os
+import time
+from multiprocessing.pool import ThreadPool
+try:
+    from urllib.parse import urlparse
+except ImportError:  # Python 2.7
+    from urlparse import urlparse
+
+from .files import read_checkpoint, write_checkpoint
+from .hls import split_stream_url, variant_url
+
+
+class downloader(object):
+    """Download the HLS segments of a game version to a single file.
+
+    Segments are fetched by a pool of workers, but written to disk in order as
+    soon as they are available, so that at most a few segments per worker are
+    held in memory. Progress is checkpointed next to the output file, so an
+    interrupted download resumes where it left off.
+
+    Parameters
+    ----------
+    pigskin_obj : pigskin
+        The (logged in) pigskin instance.
+    max_workers : int
+        The maximum number of segments downloaded concurrently.
+    retries : int
+        How many times a failing segment is retried before giving up.
+    """
+    def __init__(self, pigskin_obj, max_workers=4, retries=3):
+        self._pigskin = pigskin_obj
+        self._hls = self._pigskin._hls
+        self._store = self._pigskin._store
+        self.logger = logging.getLogger(__name__)
+
+        self.max_workers = max(1, int(max_workers))
+        self.retries = retries
+
+
+    def download(self, version_obj, path, bitrate=None, progress=None):
+        """Download a game version.
+
+        Parameters
+        ----------
+        version_obj : version
+            The version to download (e.g.
+            ``game.versions['condensed']``).
+        path : str
+            Where to write the media (MPEG-TS or fragmented MP4) file.
+        bitrate : int or float
+            A bitrate (key) from ``m3u8_to_dict()``. Defaults to the highest
+            available.
+        progress : callable
+            Called with a stats dict (see Returns) after every segment.
+
+        Returns
+        -------
+        dict
+            With the keys ``segments`` (written so far), ``segment_count``,
+            ``bytes`` (written in this run), ``seconds``, and ``throughput``
+            (bytes per second in this run). None if there was a failure; the
+            checkpoint is kept so the download can be resumed.
+        """
+        try:
+            stream_url = version_obj.streams['hls']
+        except (KeyError, TypeError):
+            self.logger.error('download: no HLS stream available for this version')
+            return None
+
+        ladder = self._hls.get_ladder(stream_url)
+        if not ladder:
+            self.logger.error('download: unable to read the bitrate ladder')
+            return None
+
+        if bitrate is None:
+            bitrate = max(ladder)
+        if bitrate not in ladder:
+            self.logger.error('download: bitrate {0} is not available'.format(bitrate))
+            return None
+
+        playlist_url, headers = split_stream_url(ladder[bitrate]['stream'])
+        playlist = self._hls.fetch_playlist(playlist_url)
+        if playlist is None:
+            return None
+
+        segment_urls = self._segment_urls(playlist_url, playlist)
+        if segment_urls is None:
+            return None
+
+        # a slow segment is no sign of an overloaded CDN
+        for host in set(urlparse(u).netloc for u in segment_urls):
+            self._store.rate_limiter.add_streaming_host(host)
+
+        job = {
+            'video_id': version_obj._video_id,
+            'bitrate': bitrate,
+            'segment_count': len(segment_urls),
+        }
+
+        return self._download_segments(segment_urls, headers, path, job, progress)
+
+
+    def _segment_urls(self, playlist_url, playlist):
+        """Return the URLs of a media playlist's segments, in the order they
+        are written: each fMP4 initialization section (``EXT-X-MAP``) comes
+        before the first segment it applies to. None if the segments are
+        encrypted (``EXT-X-KEY``), which would be written unplayable."""
+        urls = []
+        init_uri = None
+        for segment in playlist.segments:
+            key = getattr(segment, 'key', None)
+            if key is not None and (key.method or 'NONE').upper() != 'NONE':
+                self.logger.error('download: the playlist is encrypted ({0}); unable to download it'.format(key.method))
+                return None
+
+            init_section = getattr(segment, 'init_section', None)
+            if init_section is not None and init_section.uri != init_uri:
+                init_uri = init_section.uri
+                urls.append(variant_url(playlist_url, init_uri))
+
+            urls.append(variant_url(playlist_url, segment.uri))
+
+        return urls
+
+
+    def _download_segments(self, segment_urls, headers, path, job, progress=None):
+        """Download segments (in order) to ``path``, resuming from and updating
+        the checkpoint described by ``job``."""
+        checkpoint_path = path + '.checkpoint'
+        checkpoint = read_checkpoint(checkpoint_path, job, {'next': 0, 'offset': 0})
+        if checkpoint['next']:
+            self.logger.debug('download: resuming at segment {0}'.format(checkpoint['next']))
+
+        mode = 'r+b' if checkpoint['next'] and os.path.exists(path) else 'wb'
+        if mode == 'wb':
+            checkpoint['next'] = checkpoint['offset'] = 0
+
+        stats = {
+            'segments': checkpoint['next'],
+            'segment_count': len(segment_urls),
+            'bytes': 0,
+            'seconds': 0.0,
+            'throughput': 0.0,
+        }
+        start = time.time()
+        window = self.max_workers * 2
+        pool = ThreadPool(self.max_workers)
+
+        try:
+            with open(path, mode) as f:
+                f.seek(checkpoint['offset'])
+                f.truncate()
+
+                # keep a bounded window of segments in flight, ahead of the
+                # one being written
+                todo = range(checkpoint['next'], len(segment_urls))
+                pending = [pool.apply_async(self._fetch_segment, (segment_urls[i], headers)) for i in todo[:window]]
+                todo = todo[window:]
+
+                while pending:
+                    body = pending.pop(0).get()
+                    if body is None:
+                        self.logger.error('download: giving up on segment {0}'.format(checkpoint['next']))
+                        return None
+
+                    if todo:
+                        pending.append(pool.apply_async(self._fetch_segment, (segment_urls[todo[0]], headers)))
+                        todo = todo[1:]
+
+                    f.write(body)
+                    f.flush()
+
+                    checkpoint['next'] += 1
+                    checkpoint['offset'] += len(body)
+                    write_checkpoint(checkpoint_path, checkpoint)
+
+                    stats['segments'] = checkpoint['next']
+                    stats['bytes'] += len(body)
+                    stats['seconds'] = time.time() - start
+                    stats['throughput'] = stats['bytes'] / stats['seconds'] if stats['seconds'] else 0.0
+                    if progress:
+                        progress(stats)
+        finally:
+            pool.terminate()
+            pool.join()
+
+        stats['seconds'] = time.time() - start
+        stats['throughput'] = stats['bytes'] / stats['seconds'] if stats['seconds'] else 0.0
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        self.logger.debug('download: finished at {0:.0f} bytes/s'.format(stats['throughput']))
+        return stats
+
+
+    def _fetch_segment(self, url, headers):
+        """Return the content of a segment, retrying on failure. None if it
+        could not be fetched."""
+        for attempt in range(self.retries + 1):
+            try:
+                r = self._store.s.get(url, headers=headers)
+                if r.ok:
+                    return r.content
+                self.logger.warn('download: segment returned {0}'.format(r.status_code))
+            except Exception:
+                self.logger.warn('download: failed to fetch a segment (attempt {0})'.format(attempt + 1))
+
+        return None
@@ -1,4 +1,7 @@
 import logging
+import threading
+import time
+
 from .. import settings
 
 class auth(object):
@@ -6,11 +9,14 @@ class auth(object):
         self._pigskin = pigskin_obj
         self._store = self._pigskin._store
         self.logger = logging.getLogger(__name__)
+        # refresh tokens are single-use; concurrent refreshes (e.g. from the
+        # prefetcher) must not race each other.
+        self._refresh_lock = threading.Lock()
 
 
     def get_subscription(self):
         """Get the subscription (if any) of the user."""
-        url = self._store.gp_config['modules']['API']['USER_ACCOUNT']
+        url = self._store.routes.url('user_account')
         headers = {'Authorization': 'Bearer {0}'.format(self._store.access_token)}
 
         try:
@@ -33,14 +39,23 @@ class auth(object):
     def login(self, username, password, force=False):
         """Login to NFL Game Pass Europe."""
         # if the user already has access, just skip the entire auth process
-        if not force:
-            if self._store.subscription:
+        if not force and self._store.subscription and self._store.username in [None, username]:
+            if not self._tokens_expired():
                 self.logger.debug('No need to login; the user already has access.')
                 return True
 
-        for auth in [self._gp_auth, self._gigya_auth]:
-            self.logger.debug('Trying {0} authentication.'.format(auth.__name__))
-            data = auth(username, password)
+            # restored credentials only need fresh tokens
+            if self._store.refresh_token and self.refresh_tokens():
+                self.logger.debug('No need to login; the tokens were refreshed.')
+                return True
+
+        # try the method that worked last time first
+        auth_methods = ['_gp_auth', '_gigya_auth']
+        auth_methods.sort(key=lambda a: a != self._store.auth_method)
+
+        for auth_method in auth_methods:
+            self.logger.debug('Trying {0} authentication.'.format(auth_method))
+            data = getattr(self, auth_method)(username, password)
             try:
                 self._store.username = username
                 # TODO: are these tokens provided for valid accounts without a subscription?
@@ -51,6 +66,9 @@ class auth(object):
                 self._store.access_token = None
                 self._store.refresh_token = None
             else:
+                self._store.auth_method = auth_method
+                self._set_token_expiry(data)
+                self.save_credentials()
                 self.logger.debug('login was successful')
                 return True
 
@@ -58,9 +76,68 @@ class auth(object):
         return False
 
 
+    def restore_credentials(self):
+        """Restore the login state from the credential store (if any).
+
+        Returns
+        -------
+        bool
+            True if credentials were restored, False otherwise.
+        """
+        if self._store.credential_store is None:
+            return False
+
+        credentials = self._store.credential_store.load()
+        if not credentials or not credentials.get('refresh_token'):
+            return False
+
+        for key in ['username', 'access_token', 'refresh_token', 'token_expiry', 'auth_method', 'subscription']:
+            setattr(self._store, key, credentials.get(key))
+
+        for c in credentials.get('cookies', []):
+            self._store.s.cookies.set(c['name'], c['value'], domain=c['domain'], path=c['path'], expires=c['expires'])
+
+        self.logger.debug('restored the credentials of a previous session')
+        return True
+
+
+    def save_credentials(self):
+        """Save the login state to the credential store (if any)."""
+        if self._store.credential_store is None or not self._store.refresh_token:
+            return
+
+        credentials = dict((key, getattr(self._store, key)) for key in ['username', 'access_token', 'refresh_token', 'token_expiry', 'auth_method', 'subscription'])
+        credentials['cookies'] = [
+            {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path, 'expires': c.expires}
+            for c in self._store.s.cookies
+        ]
+
+        try:
+            self._store.credential_store.save(credentials)
+        except Exception:
+            self.logger.exception('unable to save the credentials')
+
+
+    def _set_token_expiry(self, data):
+        """Set when the access token expires, from an OAuth token response."""
+        try:
+            self._store.token_expiry = time.time() + int(data['expires_in'])
+        except (KeyError, TypeError, ValueError):
+            self._store.token_expiry = None
+
+
+    def _tokens_expired(self):
+        """Whether the access token has (or is about to) expire. Tokens of
+        unknown age are assumed to be valid."""
+        if self._store.token_expiry is None:
+            return False
+
+        return time.time() > self._store.token_expiry - 60
+
+
     def logout(self):
         """Logout from NFL Game Pass Europe."""
-        url = self._store.gp_config['modules']['API']['LOGOUT']
+        url = self._store.routes.url('logout')
         headers = {'Authorization': 'Bearer {0}'.format(self._store.access_token)}
 
         post_data = {
@@ -87,6 +164,10 @@ class auth(object):
         self._store.access_token = None
         self._store.refresh_token = None
         self._store.subscription = None
+        self._store.token_expiry = None
+
+        if self._store.credential_store is not None:
+            self._store.credential_store.clear()
 
         self.logger.debug('logout successful')
         return True
@@ -94,7 +175,28 @@ class auth(object):
 
     def refresh_tokens(self):
         """Refresh the tokens needed to access content."""
-        url = self._store.gp_config['modules']['API']['REFRESH_TOKEN']
+        with self._refresh_lock:
+            return self._refresh_tokens()
+
+
+    def refresh_tokens_if_needed(self):
+        """Refresh the tokens, only if the access token has (or is about to)
+        expire, or its age is unknown.
+
+        Returns
+        -------
+        bool
+            True if the tokens are fresh, False if refreshing them failed.
+        """
+        with self._refresh_lock:
+            if self._store.token_expiry is not None and not self._tokens_expired():
+                return True
+            return self._refresh_tokens()
+
+
+    def _refresh_tokens(self):
+        """Refresh the tokens. The caller must hold ``_refresh_lock``."""
+        url = self._store.routes.url('refresh_token')
         post_data = {
             'client_id': self._store.gp_config['modules']['API']['CLIENT_ID'],
             'refresh_token': self._store.refresh_token,
@@ -116,6 +218,9 @@ class auth(object):
             self.logger.error('could not find GP tokens to refresh')
             return False
 
+        self._set_token_expiry(data)
+        self.save_credentials()
+
         # TODO: check for status codes, just in case
 
         self.logger.debug('successfully refreshed tokens')
@@ -190,7 +295,7 @@ class auth(object):
         ``_gigya_auth()``
         ``login()``
         """
-        url = self._store.gp_config['modules']['API']['LOGIN']
+        url = self._store.routes.url('login')
 
         post_data = {
             'client_id': self._store.gp_config['modules']['API']['CLIENT_ID'],
@@ -1,6 +1,11 @@
 import logging
 from collections import OrderedDict
 
+from .. import settings
+from ..decoder import freeze
+
+TEAM_COUNT = 32
+
 
 class data(object):
     def __init__(self, pigskin_obj):
@@ -18,13 +23,11 @@ class data(object):
             with the ``season``, ``season_type``, and ``week`` fields populated
             if successful. None if otherwise.
         """
-        url = self._store.gp_config['modules']['ROUTES_DATA_PROVIDERS']['games']
+        url = self._store.routes.url('games')
         current = None
 
         try:
-            r = self._store.s.get(url)
-            #self._log_request(r)
-            data = r.json()
+            data = self._get_json(url, shared=True)
         except ValueError:
             self.logger.error('current_season_and_week: server response is invalid')
             return None
@@ -51,13 +54,11 @@ class data(object):
             a list of available seasons, sorted from the most to least recent;
             None if there was a failure.
         """
-        url = self._store.gp_config['modules']['ROUTES_DATA_PROVIDERS']['games']
+        url = self._store.routes.url('games')
         seasons_list = None
 
         try:
-            r = self._store.s.get(url)
-            #self._log_request(r)
-            data = r.json()
+            data = self._get_json(url, shared=True)
         except ValueError:
             self.logger.error('_get_seasons: invalid server response')
             return None
@@ -80,20 +81,60 @@ class data(object):
         return shows
 
 
+    def get_show_episodes(self, show_slug, season=None):
+        """Get the episodes (and metadata) of a show.
+
+        Parameters
+        ----------
+        show_slug : str
+            The slug of the show (e.g. a-football-life).
+        season : str or int
+            Only get the episodes of this season. All episodes if None.
+
+        Returns
+        -------
+        list
+            Of dicts of episode metadata, in the order Game Pass lists them.
+            None if there was a failure.
+
+        Notes
+        -----
+        See ``_extract_episode_info()`` for a description of the metadata
+        structure.
+        """
+        season_slug = None if season is None else 'season-{0}'.format(season)
+        url = self._store.routes.url('network_episodes', seasonSlug=season_slug, tvShowSlug=show_slug)
+
+        try:
+            data = self._get_json(url, shared=True)
+            episodes_list = data['modules']['archive']['content']
+        except (KeyError, TypeError, ValueError):
+            self.logger.error('get_show_episodes: server response is invalid')
+            return None
+
+        episodes = []
+        for e in episodes_list:
+            episode_info = self._extract_episode_info(e)
+            if episode_info is None:
+                self.logger.warn('get_show_episodes: invalid record; skipping.')
+                continue
+            episode_info['season'] = self._guess_show_season(e)
+            episodes.append(episode_info)
+
+        return episodes
+
+
     def get_show_seasons(self, show_slug):
         # TODO: accept the show name rather than slug
         # TODO: This only support NFL Network, what's the situation with RedZone?
         # The 'seasons' list returned in _get_shows_nfl_network() cannot be
         # trusted (both incomplete and missing entries). Here, we loop over
         # every episode to build the list.
-        url = self._store.gp_config['modules']['API']['NETWORK_EPISODES']
-        url = url.replace(':seasonSlug/', '').replace(':tvShowSlug', show_slug)
+        url = self._store.routes.url('network_episodes', seasonSlug=None, tvShowSlug=show_slug)
         season_list = []
 
         try:
-            r = self._store.s.get(url)
-            #self._log_request(r)
-            data = r.json()
+            data = self._get_json(url, shared=True)
             episodes_list = data['modules']['archive']['content']
         except (KeyError, TypeError, ValueError):
             self.logger.error('get_show_seasons: server response is invalid')
@@ -138,7 +179,23 @@ class data(object):
         ``_get_team_games_easy()``
         ``_get_team_games_hard()``
         """
-        games = self._get_team_games_easy(team, season)
+        # The API behind ``_get_team_games_easy()`` only covers the current
+        # season, so once ``current`` has been populated, other seasons go
+        # straight to ``_get_team_games_hard()``; no request is made to find
+        # out. Until then, the API is tried, and once it has answered without
+        # a season's games, it is not asked about that season again for
+        # ``settings.negative_cache_ttl`` seconds.
+        games = None
+        unsupported_key = ('team_games_easy', str(season))
+        if self._pigskin._current is not None:
+            try_easy = self._is_current_season(season)
+        else:
+            try_easy = unsupported_key not in self._store.negative_cache
+
+        if try_easy:
+            games = self._get_team_games_easy(team, season)
+            if games is not None and not games:
+                self._store.negative_cache.set(unsupported_key, True)
 
         if not games:
             games = self._get_team_games_hard(team, season)
@@ -169,47 +226,30 @@ class data(object):
         -----
         TODO: describe metadata structure
         """
-        # ['modules']['API']['TEAMS'] only provides the teams for the current
-        # season. So, we ask for all the games of a non-bye-week of the regular
-        # season to assemble a list of teams.
-        no_bye_weeks = [1, 2, 3, 13, 14, 15, 16, 17]
-        teams = OrderedDict()
-
-        # loop over non-bye weeks until we find one with 16 games
-        # The 1st week should always have 16 games, but week 1 of 2017 had only 15.
-        for week in no_bye_weeks:
-            games_list = self._fetch_games_list(str(season), 'reg', str(week))
-
-            if len(games_list) == 16:
-                break
-
-        if len(games_list) != 16:
-            return None
-
-        try:
-            teams_list = []
-            for game in games_list:
-                # Cities which have multiple teams include the team name with
-                # the city name. We remove that.
-                teams_list.append({
-                    'abbr': game['homeTeamAbbr'],
-                    'city': game['homeCityState'].replace(' ' + game['homeNickName'], ''),
-                    'name': game['homeNickName'],
-                })
-
-                teams_list.append({
-                    'abbr': game['visitorTeamAbbr'],
-                    'city': game['visitorCityState'].replace(' ' + game['visitorNickName'], ''),
-                    'name': game['visitorNickName'],
-                })
-        except KeyError:
-            self.logger.error('get_teams: could not build the teams list')
+        # Teams are derived once per season, from the cheapest source
+        # available: the season's games (if they have all been fetched
+        # already), or else a scan of non-bye weeks.
+        season = str(season)
+        teams = self._store.team_registry.get(season)
+        if teams is not None:
+            return OrderedDict((t, dict(teams[t])) for t in teams)
+
+        teams = self._get_teams_crawled(season)
+        if teams is None:
+            teams = self._get_teams_scan(season)
+        if teams is None:
             return None
 
-        teams_list = sorted(teams_list, key=lambda x: x['name'])
-        teams = OrderedDict((t['name'], t) for t in teams_list)
+        if len(teams) < TEAM_COUNT:
+            # some weeks failed to load; retry soon, rather than keep the gaps
+            ttl = settings.negative_cache_ttl
+        elif self._is_past_season(season):
+            ttl = float('inf')  # the teams of a past season never change
+        else:
+            ttl = None
+        self._store.team_registry.set(season, teams, ttl)
 
-        return teams
+        return OrderedDict((t, dict(teams[t])) for t in teams)
 
 
     def get_week_games(self, season, season_type, week):
@@ -271,14 +311,12 @@ class data(object):
             description (value) if it's a special week (Hall of Fame, Super
             Bowl, etc). None if there was a failure.
         """
-        url = self._store.gp_config['modules']['ROUTES_DATA_PROVIDERS']['games']
+        url = self._store.routes.url('games')
         season = int(season)
         weeks = OrderedDict()
 
         try:
-            r = self._store.s.get(url)
-            #self._log_request(r)
-            data = r.json()
+            data = self._get_json(url, shared=True)
         except ValueError:
             self.logger.error('_get_weeks: invalid server response')
             return None
@@ -299,6 +337,42 @@ class data(object):
         return weeks
 
 
+    @staticmethod
+    def _extract_episode_info(raw_episode):
+        """Return normalized episode data.
+
+        Parameters
+        ----------
+        raw_episode : dict
+            The raw dict for an episode's data from Game Pass.
+
+        Returns
+        -------
+        dict
+            With the keys ``title``, ``desc``, ``slug``, ``video_id``,
+            ``air_date`` (an nfldate string or None), and ``duration`` (in
+            seconds, or None). None if the record is invalid.
+        """
+        try:
+            episode_info = {
+                'title': raw_episode['title'].strip(),
+                'desc': raw_episode.get('description') or '',
+                'slug': raw_episode['slug'],
+                'video_id': raw_episode['videoId'],
+                'air_date': raw_episode.get('scheduleDate') or None,
+                'duration': None,
+            }
+        except (AttributeError, KeyError):
+            return None
+
+        try:
+            episode_info['duration'] = float(raw_episode['videoDuration'])
+        except (KeyError, TypeError, ValueError):
+            pass
+
+        return episode_info
+
+
     @staticmethod
     def _extract_game_info(raw_game):
         """Return normalized game data.
@@ -330,11 +404,13 @@ class data(object):
                 'phase': raw_game['phase'],
                 'home': {
                     'name': raw_game['homeNickName'],
+                    'abbr': raw_game.get('homeTeamAbbr'),
                     'city': raw_game['homeCityState'],
                     'points': None,
                 },
                 'away': {
                     'name': raw_game['visitorNickName'],
+                    'abbr': raw_game.get('visitorTeamAbbr'),
                     'city': raw_game['visitorCityState'],
                     'points': None,
                 },
@@ -380,14 +456,11 @@ class data(object):
             With a dict of metadata as the value. An empty list if there was a
             failure.
         """
-        url = self._store.gp_config['modules']['ROUTES_DATA_PROVIDERS']['games_detail']
-        url = url.replace(':seasonType', season_type).replace(':season', str(season)).replace(':week', str(week))
+        url = self._store.routes.url('games_detail', season=season, seasonType=season_type, week=week)
         games_list = []
 
         try:
-            r = self._store.s.get(url)
-            #self._log_request(r)
-            data = r.json()
+            data = self._get_json(url)
         except ValueError:
             self.logger.error('_fetch_games_list: invalid server response')
             return []
@@ -401,15 +474,48 @@ class data(object):
         return games_list
 
 
+    def _get_json(self, url, shared=False):
+        """Fetch a URL and decode its JSON body.
+
+        Parameters
+        ----------
+        url : str
+        shared : bool
+            Whether to decode the body once and share the tree with every
+            other consumer of the URL, for ``settings.json_shared_ttl``
+            seconds. Shared trees are read-only (see ``decoder.freeze()``).
+
+        Returns
+        -------
+        The decoded body.
+
+        Raises
+        ------
+        ValueError
+            If the body is not valid JSON.
+        """
+        decoder = self._store.json_decoder
+        if shared:
+            data = decoder.shared.get(url)
+            if data is not None:
+                return data
+
+        r = self._store.s.get(url)
+        data = decoder.decode(r.content)
+
+        if shared:
+            data = freeze(data)
+            decoder.shared.set(url, data)
+        return data
+
+
     def _get_shows_nfl_network(self):
         # TODO: do we get a more complete response when logged in?
-        url = self._store.gp_config['modules']['API']['NETWORK_PROGRAMS']
+        url = self._store.routes.url('network_programs')
         shows_dict = OrderedDict()
 
         try:
-            r = self._store.s.get(url)
-            #self._log_request(r)
-            data = r.json()
+            data = self._get_json(url)
         except ValueError:
             self.logger.error('_get_shows_nfl_network: server response is invalid')
             return None
@@ -447,6 +553,79 @@ class data(object):
         return shows_dict
 
 
+    def _get_teams_crawled(self, season):
+        """Get the teams of a season from its regular season games, if they
+        have all been fetched already. No requests are made.
+
+        Returns
+        -------
+        OrderedDict
+            Like ``get_teams()``. None if the games are not all available.
+        """
+        try:
+            weeks = self._pigskin._seasons[season]._weeks['reg']
+        except (KeyError, TypeError):
+            return None
+
+        if not weeks or any(weeks[w]._games is None for w in weeks):
+            return None
+
+        teams = {}
+        for w in weeks:
+            for g in weeks[w]._games.values():
+                for side in [g.home, g.away]:
+                    if side.get('abbr') is None:
+                        return None
+                    teams[side['name']] = {
+                        'abbr': side['abbr'],
+                        'city': side['city'].replace(' ' + side['name'], ''),
+                        'name': side['name'],
+                    }
+
+        return OrderedDict((t, teams[t]) for t in sorted(teams))
+
+
+    def _get_teams_scan(self, season):
+        """Get the teams of a season by scanning the games of non-bye weeks,
+        until every team has been seen.
+
+        Returns
+        -------
+        OrderedDict
+            Like ``get_teams()``. None if there was a failure.
+        """
+        # Week 1 should always have every team playing, but week 1 of 2017 had
+        # only 15 games. So the teams of several weeks are combined.
+        no_bye_weeks = [1, 2, 3, 13, 14, 15, 16, 17]
+        teams = {}
+
+        for week in no_bye_weeks:
+            games_list = self._fetch_games_list(season, 'reg', str(week))
+
+            try:
+                for game in games_list:
+                    # Cities which have multiple teams include the team name
+                    # with the city name. We remove that.
+                    for side in ['home', 'visitor']:
+                        name = game[side + 'NickName']
+                        teams[name] = {
+                            'abbr': game[side + 'TeamAbbr'],
+                            'city': game[side + 'CityState'].replace(' ' + name, ''),
+                            'name': name,
+                        }
+            except (KeyError, TypeError):
+                self.logger.error('get_teams: could not build the teams list')
+                return None
+
+            if len(teams) >= TEAM_COUNT:
+                break
+
+        if not teams:
+            return None
+
+        return OrderedDict((t, teams[t]) for t in sorted(teams))
+
+
     def _get_team_games_easy(self, team, season):
         """An OrderedDict of a team's games for a season and their game objects.
 
@@ -475,30 +654,16 @@ class data(object):
         See Also
         --------
         ``_get_team_games_hard()``
+        ``_get_team_detail_games()``
         """
-        url = self._store.gp_config['modules']['ROUTES_DATA_PROVIDERS']['team_detail']
-        team_seo_name = self._team_seo_name(team)
-        url = url.replace(':team', team_seo_name)
+        games_list = self._get_team_detail_games(team)
+        if games_list is None:
+            return None
 
         games_dict = OrderedDict()
         for st in ['pre', 'reg', 'post']:
             games_dict[st] = OrderedDict()
 
-        try:
-            r = self._store.s.get(url)
-            #self._log_request(r)
-            data = r.json()
-        except ValueError:
-            self.logger.error('_get_team_games_easy: server response is invalid')
-            return None
-
-        try:
-            games_list = data['modules']['gamesCurrentSeason']['content']
-            games_list = sorted(games_list, key=lambda x: x['gameDateTimeUtc'])
-        except KeyError:
-            self.logger.error('_get_week_games_easy: could not parse/build the games list')
-            return None
-
         for game in games_list:
             try:
                 if int(game['season']) == int(season):
@@ -514,6 +679,49 @@ class data(object):
         return games_dict
 
 
+    def _get_team_detail_games(self, team):
+        """The raw games of a team's ``team_detail`` payload.
+
+        Parameters
+        ----------
+        team : str
+            The name of the team (e.g. Dolphins).
+
+        Returns
+        -------
+        list
+            Of the raw game records of every season type, sorted by their
+            broadcast time and date. None if there was a failure.
+
+        Note
+        ----
+        The payload is large, so its games are cached for
+        ``settings.team_detail_ttl`` seconds.
+        """
+        team_seo_name = self._team_seo_name(team)
+        games_list = self._store.team_detail_cache.get(team_seo_name)
+        if games_list is not None:
+            return games_list
+
+        url = self._store.routes.url('team_detail', team=team_seo_name)
+
+        try:
+            data = self._get_json(url)
+        except ValueError:
+            self.logger.error('_get_team_detail_games: server response is invalid')
+            return None
+
+        try:
+            games_list = data['modules']['gamesCurrentSeason']['content']
+            games_list = sorted(games_list, key=lambda x: x['gameDateTimeUtc'])
+        except KeyError:
+            self.logger.error('_get_team_detail_games: could not parse/build the games list')
+            return None
+
+        self._store.team_detail_cache.set(team_seo_name, games_list)
+        return games_list
+
+
     def _get_team_games_hard(self, team, season):
         """An OrderedDict of a team's games for a season and their game objects.
 
@@ -560,6 +768,24 @@ class data(object):
         return games_dict
 
 
+    def _is_current_season(self, season):
+        """Whether a season is the current one. Only known once ``current``
+        has been populated; no request is made."""
+        try:
+            return int(season) == int(self._pigskin._current['season'])
+        except (KeyError, TypeError, ValueError):
+            return False
+
+
+    def _is_past_season(self, season):
+        """Whether a season is over. Only known once ``current`` has been
+        populated; no request is made."""
+        try:
+            return int(season) < int(self._pigskin._current['season'])
+        except (KeyError, TypeError, ValueError):
+            return False
+
+
     def _guess_show_season(self, episode_data):
         """The season a particular episode belongs to.
 
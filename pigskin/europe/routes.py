@@ -0,0 +1,232 @@
+"""
+The URLs of the Game Pass (Europe) config, compiled into templates with named
+parameters.
+"""
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+try:  # Python 2.7
+    string_types = basestring
+except NameError:
+    string_types = str
+
+# Placeholders are either ``:name`` (the gp_config routes) or ``{NAME}`` (the
+# DIVA config). A ``:name`` placeholder is the longest run of word characters,
+# so ``:seasonType`` is never mistaken for ``:season``.
+PLACEHOLDER = re.compile(r':([A-Za-z_]\w*)|\{([^{}]+)\}')
+
+# compiled templates kept by ``url_template.compile()``, at most
+MAX_COMPILED = 256
+
+# route name -> (path in gp_config['modules'], placeholders)
+ROUTES = OrderedDict([
+    ('games', (('ROUTES_DATA_PROVIDERS', 'games'), ())),
+    ('games_detail', (('ROUTES_DATA_PROVIDERS', 'games_detail'), ('season', 'seasonType', 'week'))),
+    ('team_detail', (('ROUTES_DATA_PROVIDERS', 'team_detail'), ('team',))),
+    ('network', (('ROUTES_DATA_PROVIDERS', 'network'), ())),
+    ('redzone', (('ROUTES_DATA_PROVIDERS', 'redzone'), ())),
+    ('network_episodes', (('API', 'NETWORK_EPISODES'), ('seasonSlug', 'tvShowSlug'))),
+    ('network_programs', (('API', 'NETWORK_PROGRAMS'), ())),
+    ('user_account', (('API', 'USER_ACCOUNT'), ())),
+    ('login', (('API', 'LOGIN'), ())),
+    ('logout', (('API', 'LOGOUT'), ())),
+    ('refresh_token', (('API', 'REFRESH_TOKEN'), ())),
+    ('diva_vod', (('DIVA', 'HTML5', 'SETTINGS', 'VodNoData'), ())),
+    ('diva_live', (('DIVA', 'HTML5', 'SETTINGS', 'LiveNoData'), ())),
+    ('diva_24x7', (('DIVA', 'HTML5', 'SETTINGS', 'Live24x7'), ())),
+])
+
+
+class url_template(object):
+    """A URL with named placeholders, split once into its parts.
+
+    Parameters
+    ----------
+    template : str
+        e.g. ``https://host/games/:season/:seasonType/:week``
+    """
+    _compiled = OrderedDict()  # an LRU of at most MAX_COMPILED templates
+    _compiled_lock = threading.Lock()
+
+    def __init__(self, template):
+        self.template = template
+
+        # alternating literal text and placeholder names, starting and ending
+        # with literal text
+        self._parts = []
+        pos = 0
+        for m in PLACEHOLDER.finditer(template):
+            self._parts.append(template[pos:m.start()])
+            self._parts.append(m.group(1) or m.group(2))
+            pos = m.end()
+        self._parts.append(template[pos:])
+
+        self.params = frozenset(self._parts[1::2])
+
+        # matches the URLs expanded from the template (without a query
+        # string); an optional path segment may be missing
+        pattern = [re.escape(self._parts[0])]
+        for i in range(2, len(self._parts), 2):
+            literal = self._parts[i]
+            if literal.startswith('/'):
+                pattern.append(r'(?:[^/?#]+/)?' + re.escape(literal[1:]))
+            else:
+                pattern.append(r'[^/?#]*' + re.escape(literal))
+        self._pattern = re.compile(''.join(pattern) + r'\Z')
+
+
+    @classmethod
+    def compile(cls, template):
+        """Return the template of a URL, compiling it only the first time.
+
+        Parameters
+        ----------
+        template : str
+
+        Returns
+        -------
+        url_template
+        """
+        with cls._compiled_lock:
+            compiled = cls._compiled.pop(template, None)
+            if compiled is None:
+                compiled = cls(template)
+            cls._compiled[template] = compiled
+            while len(cls._compiled) > MAX_COMPILED:
+                cls._compiled.popitem(last=False)
+
+        return compiled
+
+
+    def __eq__(self, other):
+        return isinstance(other, url_template) and other.template == self.template
+
+
+    def __ne__(self, other):
+        return not self == other
+
+
+    def __hash__(self):
+        return hash(self.template)
+
+
+    def matches(self, url):
+        """Whether a URL was expanded from the template.
+
+        Parameters
+        ----------
+        url : str
+            Its query string is ignored.
+
+        Returns
+        -------
+        bool
+        """
+        return self._pattern.match(url.split('?', 1)[0]) is not None
+
+
+    def expand(self, **params):
+        """Return the URL with its placeholders filled in.
+
+        Parameters
+        ----------
+        **params
+            A value for every placeholder; others are ignored. A value of None
+            drops the placeholder, along with the ``/`` following it (for
+            optional path segments).
+
+        Returns
+        -------
+        str
+
+        Raises
+        ------
+        KeyError
+            If a placeholder has no value.
+        """
+        url = [self._parts[0]]
+        for i in range(1, len(self._parts), 2):
+            value, literal = params[self._parts[i]], self._parts[i + 1]
+            if value is None:
+                value = ''
+                if literal.startswith('/'):
+                    literal = literal[1:]
+            elif not isinstance(value, string_types):
+                value = str(value)
+
+            url.append(value)
+            url.append(literal)
+
+        return ''.join(url)
+
+
+class routes(object):
+    """The routes of a gp_config, compiled and validated when it loads.
+
+    Parameters
+    ----------
+    gp_config : dict
+
+    Note
+    ----
+    Routes missing from the config, or whose placeholders are not the
+    expected ones, are logged when the config loads. Using a missing route
+    raises ``KeyError``, as looking it up in the config would have.
+    """
+    def __init__(self, gp_config):
+        self.logger = logging.getLogger(__name__)
+        self._templates = OrderedDict()
+
+        modules = (gp_config or {}).get('modules', {})
+        for name in ROUTES:
+            path, params = ROUTES[name]
+            try:
+                template = modules
+                for key in path:
+                    template = template[key]
+            except (KeyError, TypeError):
+                self.logger.error('routes: {0} is missing from the config'.format('/'.join(path)))
+                continue
+
+            compiled = url_template.compile(template)
+            if compiled.params != frozenset(params):
+                self.logger.error('routes: {0} has unexpected placeholders: {1}'.format(
+                    '/'.join(path), ', '.join(sorted(compiled.params)) or 'none'))
+
+            self._templates[name] = compiled
+
+
+    def __contains__(self, name):
+        return name in self._templates
+
+
+    def __iter__(self):
+        return iter(self._templates)
+
+
+    def __getitem__(self, name):
+        return self._templates[name]
+
+
+    def url(self, name, **params):
+        """Return the URL of a route.
+
+        Parameters
+        ----------
+        name : str
+            The name of the route (see ``ROUTES``).
+        **params
+            The values of the route's placeholders.
+
+        Returns
+        -------
+        str
+
+        Raises
+        ------
+        KeyError
+            If the route is missing from the config.
+        """
+        return self._templates[name].expand(**params)
@@ -1,13 +1,56 @@
 import logging
-import uuid
 import json
-import defusedxml.ElementTree as ET
 try:
     from urllib.parse import urlencode
 except ImportError:  # Python 2.7
     from urllib import urlencode
 
 from .. import settings
+from ..xmlstream import find_parameters, find_video_sources
+from .routes import url_template
+
+
+class playback_context(object):
+    """The parts of the processing URL payload which are the same for every
+    video source requested with the same tokens: the ``Other`` field, built
+    from the device id and the tokens, is encoded once.
+
+    Parameters
+    ----------
+    device_id : str
+    access_token : str
+    username : str
+
+    Note
+    ----
+    A context is only valid for the tokens it was built with (see
+    ``matches()``).
+    """
+    def __init__(self, device_id, access_token, username):
+        self.device_id = device_id
+        self.access_token = access_token
+        self.username = username
+
+        other = '{0}|{1}|web|{2}|undefined|{3}'.format(device_id, access_token, settings.user_agent, username)
+
+        # NOTE: the official web UI posts a bit more data, but it seems to have
+        #       no impact on the response.
+        self._parts = (
+            '{"AssetState": 3, "Other": ' + json.dumps(other) + ', "PlayerType": "HTML5", "Type": 1, "User": "", "VideoId": ',
+            ', "VideoKind": "", "VideoSource": ',
+            '}',
+        )
+
+
+    def matches(self, access_token, username):
+        """Whether the context was built with these tokens."""
+        return access_token == self.access_token and username == self.username
+
+
+    def payload(self, video_id, vs_url):
+        """Return the payload for a video source, as a JSON string."""
+        head, middle, tail = self._parts
+        return head + json.dumps(video_id) + middle + json.dumps(vs_url) + tail
 
 
 class video(object):
@@ -15,6 +58,8 @@ class video(object):
         self._pigskin = pigskin_obj
         self._store = self._pigskin._store
         self._auth = self._pigskin._auth
+        self._device_id = None
+        self._playback_context = None
         self.logger = logging.getLogger(__name__)
 
 
@@ -57,15 +102,95 @@ class video(object):
         dict
             with the stream format (hls, chromecast, etc) as the key and the
             stream content_url as the value. None if there was a failure.
+
+        Note
+        ----
+        Successfully resolved VOD streams are kept in the stream cache (see
+        ``settings.stream_cache_ttl``), which the prefetcher also fills.
         """
-        diva_config_url = self._store.gp_config['modules']['DIVA']['HTML5']['SETTINGS']['VodNoData']
-        if live:
-            diva_config_url = self._store.gp_config['modules']['DIVA']['HTML5']['SETTINGS']['LiveNoData']
+        # live streams are never cached; their URLs are short-lived
+        if not live:
+            streams = self._store.stream_cache.get(video_id)
+            if streams:
+                self.logger.debug('get_game_streams: using cached streams')
+                return streams
+
+        diva_config_url = self._store.routes.url('diva_live' if live else 'diva_vod')
 
         streams = self._get_diva_streams(video_id=video_id, diva_config_url=diva_config_url)
+
+        if streams and not live:
+            self._store.stream_cache.set(video_id, streams)
+
         return streams
 
 
+    def resolve_game_streams(self, video_ids, formats=None, live=False, max_workers=4):
+        """Resolve the streams of many games, concurrently.
+
+        The tokens are checked and the DIVA config is looked up once for the
+        whole batch, rather than once per video.
+
+        Parameters
+        ----------
+        video_ids : list
+            The video_ids to resolve.
+        formats : list
+            Only resolve these stream formats (e.g. ``['hls']``). All if None.
+        live : bool
+            Whether the games are live or not.
+        max_workers : int
+            The maximum number of videos resolved concurrently.
+
+        Yields
+        ------
+        tuple
+            ``(video_id, streams)``, in the order they complete. ``streams`` is
+            as returned by ``get_game_streams()``, limited to ``formats``; it is
+            None if there was a failure.
+
+        Note
+        ----
+        Only complete results (``formats`` is None) are added to the stream
+        cache, but cached streams are used for any request.
+        """
+        pending = []
+        for video_id in video_ids:
+            streams = None if live else self._store.stream_cache.get(video_id)
+            if streams:
+                yield video_id, self._filter_formats(streams, formats)
+            else:
+                pending.append(video_id)
+
+        if not pending:
+            return
+
+        self._auth.refresh_tokens_if_needed()
+        diva_config_url = self._store.routes.url('diva_live' if live else 'diva_vod')
+        diva_config = self._get_diva_config(diva_config_url)
+
+        def resolve(video_id):
+            try:
+                streams = self._resolve_diva_streams(video_id, diva_config, formats)
+            except Exception:
+                self.logger.exception('resolve_game_streams: failed to resolve {0}'.format(video_id))
+                return video_id, None
+
+            if streams and not live and formats is None:
+                self._store.stream_cache.set(video_id, streams)
+            return video_id, streams or None
+
+        from multiprocessing.pool import ThreadPool
+
+        pool = ThreadPool(max(1, min(int(max_workers), len(pending))))
+        try:
+            for result in pool.imap_unordered(resolve, pending):
+                yield result
+        finally:
+            pool.terminate()
+            pool.join()
+
+
     def is_on_air(self, name):
         """Return whether a live broadcast is currently on the air.
 
@@ -106,31 +231,25 @@ class video(object):
         str
             a JSON string (suitable for passing as a post payload)
 
+        Note
+        ----
+        The device id is kept for the life of the instance. The payload parts
+        built from it and the tokens are kept in a ``playback_context`` until
+        the tokens change.
+
         See Also
         --------
         ``_get_diva_streams()``
         """
-        # TODO: take a look at the official client and determine if we can move
-        # the unique_id gen to __init__, login(), or refresh_tokens() rather
-        # than regenerating for each request.
-        unique_id = str(uuid.uuid4())
-        other = '{0}|{1}|web|{2}|undefined|{3}'.format(unique_id, self._store.access_token, settings.user_agent, self._store.username)
+        if self._device_id is None:
+            import uuid
+            self._device_id = str(uuid.uuid4())
 
-        # NOTE: the official web UI posts a bit more data, but it seems to have
-        #       no impact on the response.
-        post_data = {
-            'AssetState': 3,
-            'Other': other,
-            'PlayerType': 'HTML5',
-            'Type': 1,
-            'User': '',
-            'VideoId': video_id,
-            'VideoKind': '',
-            'VideoSource': vs_url,
-        }
+        context = self._playback_context
+        if context is None or not context.matches(self._store.access_token, self._store.username):
+            context = self._playback_context = playback_context(self._device_id, self._store.access_token, self._store.username)
 
-        payload = json.dumps(post_data)
-        return payload
+        return context.payload(video_id, vs_url)
 
 
     def _get_diva_config(self, diva_config_url):
@@ -145,26 +264,42 @@ class video(object):
         -------
         dict
             with the keys ``processing_url`` and ``video_data_id`` set.
+
+        Note
+        ----
+        The DIVA config is account-independent, and is cached (see
+        ``settings.diva_config_ttl``).
         """
+        import defusedxml.ElementTree as ET
+
         url = diva_config_url.replace('device', 'html5')
-        diva_config = {}
+        diva_config = self._store.diva_config_cache.get(url)
+        if diva_config:
+            return diva_config
 
         try:
-            r = self._store.s.get(url)
+            r = self._store.s.get(url, stream=True)
             #self._log_request(r)
-            data = r.content
-            data_xml = ET.fromstring(data)
+            parameters = find_parameters(r, ['processingUrlCallPath', 'videoDataPath'])
         except (ET.ParseError, TypeError):
             self.logger.error('_get_diva_config: server response is invalid')
             return {}
 
         try:
-            diva_config['processing_url'] = data_xml.find(".//parameter[@name='processingUrlCallPath']").get('value')
-            diva_config['video_data_url'] = data_xml.find(".//parameter[@name='videoDataPath']").get('value')
-        except AttributeError:
+            diva_config = {
+                'processing_url': parameters['processingUrlCallPath'],
+                'video_data_url': parameters['videoDataPath'],
+            }
+        except KeyError:
             self.logger.error('_get_diva_config: unable to parse the diva XML')
             return {}
 
+        # each gets a circuit breaker of its own
+        for endpoint, key in [('diva_video_data', 'video_data_url'), ('diva_processing', 'processing_url')]:
+            if diva_config[key]:
+                self._store.circuit_breakers.add_endpoint(endpoint, url_template(diva_config[key]))
+
+        self._store.diva_config_cache.set(url, diva_config)
         return diva_config
 
 
@@ -184,10 +319,38 @@ class video(object):
             with the stream format (hls, chromecast, etc) as the key and the
             stream content_url as the value.
         """
-        streams = {}
-        self._auth.refresh_tokens() # determine when we actually need this. I'm guessing when we post
+        self._auth.refresh_tokens_if_needed()
 
         diva_config = self._get_diva_config(diva_config_url)
+        return self._resolve_diva_streams(video_id, diva_config)
+
+
+    def _resolve_diva_streams(self, video_id, diva_config, formats=None):
+        """Return a dict of available stream formats and their URLs, using an
+        already fetched DIVA config. Tokens are not refreshed.
+
+        Parameters
+        ----------
+        video_id : str
+            The video_id of a game/show
+        diva_config : dict
+            As returned by ``_get_diva_config()``.
+        formats : list
+            Only resolve these stream formats. All if None.
+
+        Returns
+        -------
+        dict
+            with the stream format (hls, chromecast, etc) as the key and the
+            stream content_url as the value.
+
+        See Also
+        --------
+        ``_get_diva_streams()``
+        """
+        import defusedxml.ElementTree as ET
+
+        streams = {}
         try:
             video_data_url = diva_config['video_data_url'].replace('{V.ID}', video_id)
             processing_url = diva_config['processing_url']
@@ -196,10 +359,9 @@ class video(object):
             return {}
 
         try:
-            r = self._store.s.get(video_data_url)
+            r = self._store.s.get(video_data_url, stream=True)
             #self._log_request(r)
-            akamai_data = r.content
-            akamai_xml = ET.fromstring(akamai_data)
+            video_sources = find_video_sources(r)
         except (ET.ParseError, TypeError):
             self.logger.error('_get_diva_streams: server response is invalid')
             return {}
@@ -210,14 +372,16 @@ class video(object):
             'Connection': 'keep-alive',
             'User-Agent': settings.user_agent
         }
-        for vs in akamai_xml.iter('videoSource'):
-            try:
-                vs_format = vs.attrib['name'].lower()
-                vs_url = vs.find('uri').text
-            except (KeyError, AttributeError):
+        for vs_name, vs_url in video_sources:
+            if vs_name is None or vs_url is None:
                 self.logger.warn('unable to extract stream info from akamai videoSource; skipping')
                 continue
 
+            vs_format = vs_name.lower()
+
+            if formats is not None and vs_format not in formats:
+                continue
+
             payload = self._build_processing_url_payload(video_id, vs_url)
 
             try:
@@ -237,6 +401,14 @@ class video(object):
         return streams
 
 
+    @staticmethod
+    def _filter_formats(streams, formats):
+        if formats is None:
+            return streams
+
+        return dict((f, streams[f]) for f in streams if f in formats)
+
+
     def _get_nfl_network_streams(self):
         """Return a dict of available stream formats and their URLs for NFL
         Network Live.
@@ -247,9 +419,9 @@ class video(object):
             with the stream format (hls, chromecast, etc) as the key and the
             stream content_url as the value. None if there was a failure.
         """
-        url = self._store.gp_config['modules']['ROUTES_DATA_PROVIDERS']['network']
-        diva_config_url = self._store.gp_config['modules']['DIVA']['HTML5']['SETTINGS']['Live24x7']
-        self._auth.refresh_tokens()  # we aren't even told about the live video unless we have up-to-date tokens
+        url = self._store.routes.url('network')
+        diva_config_url = self._store.routes.url('diva_24x7')
+        self._auth.refresh_tokens_if_needed()  # we aren't even told about the live video unless we have up-to-date tokens
 
         try:
             r = self._store.s.get(url)
@@ -281,8 +453,8 @@ class video(object):
             stream content_url as the value. None if there was a failure.
         """
         # TODO: do we need refresh_tokens() like get_nfl_network_streams()? likely
-        url = self._store.gp_config['modules']['ROUTES_DATA_PROVIDERS']['redzone']
-        diva_config_url = self._store.gp_config['modules']['DIVA']['HTML5']['SETTINGS']['Live24x7']
+        url = self._store.routes.url('redzone')
+        diva_config_url = self._store.routes.url('diva_24x7')
 
         try:
             r = self._store.s.get(url)
@@ -310,7 +482,7 @@ class video(object):
         bool
             Returns True if RedZone Live is broadcasting, False otherwise.
         """
-        url = self._store.gp_config['modules']['ROUTES_DATA_PROVIDERS']['redzone']
+        url = self._store.routes.url('redzone')
 
         try:
             r = self._store.s.get(url)
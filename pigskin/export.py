@@ -0,0 +1,322 @@
+"""
+Export Game Pass metadata (seasons, weeks, games, teams, and shows) to JSON
+Lines or CSV.
+
+Installed as the ``pigskin-export`` command::
+
+    pigskin-export games --seasons 2016 2017 --format csv -o games.csv
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import sys
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+from .files import read_checkpoint, write_checkpoint
+
+KINDS = ['seasons', 'weeks', 'games', 'teams', 'shows']
+FORMATS = ['jsonl', 'csv']
+SEASON_TYPES = ['pre', 'reg', 'post']
+
+COLUMNS = {
+    'seasons': ['season'],
+    'weeks': ['season', 'season_type', 'week', 'desc'],
+    'games': [
+        'season', 'season_type', 'week', 'game', 'start_time', 'phase', 'city', 'stadium',
+        'home', 'home_abbr', 'home_city', 'home_points',
+        'away', 'away_abbr', 'away_city', 'away_points',
+        'video_full', 'video_condensed', 'video_coach',
+    ],
+    'teams': ['season', 'name', 'abbr', 'city'],
+    'shows': ['name', 'slug', 'desc'],
+}
+
+
+class exporter(object):
+    """Stream metadata rows to a file, fetching concurrently.
+
+    The work is split into units (a week of games, or a season of weeks or
+    teams), which are fetched by a pool of workers and written in order as
+    soon as they are available. Progress is checkpointed next to the output
+    file, so an interrupted export resumes where it left off.
+
+    Parameters
+    ----------
+    pigskin_obj : pigskin
+    kind : str
+        One of ``seasons``, ``weeks``, ``games``, ``teams``, or ``shows``.
+    fmt : str
+        ``jsonl`` or ``csv``.
+    max_workers : int
+        The maximum number of units fetched concurrently.
+    retries : int
+        How many times a failing unit is retried before the export stops.
+
+    Note
+    ----
+    A unit is only checkpointed once its rows are written. One which could
+    not be fetched stops the export, and is fetched again when it is resumed.
+    Weeks after the current one are not exported, as they have no schedule
+    yet.
+    """
+    def __init__(self, pigskin_obj, kind, fmt='jsonl', max_workers=4, retries=2):
+        if kind not in KINDS:
+            raise ValueError('unknown kind: {0}'.format(kind))
+        if fmt not in FORMATS:
+            raise ValueError('unknown format: {0}'.format(fmt))
+
+        self._pigskin = pigskin_obj
+        self.kind = kind
+        self.fmt = fmt
+        self.max_workers = max(1, int(max_workers))
+        self.retries = retries
+        self.logger = logging.getLogger(__name__)
+
+
+    def export(self, path, seasons=None, season_types=None, resume=True):
+        """Export to a file.
+
+        Parameters
+        ----------
+        path : str
+            The output file.
+        seasons : list
+            The seasons to export. Defaults to all.
+        season_types : list
+            Any of ``pre``, ``reg``, and ``post``. Defaults to all.
+        resume : bool
+            Continue an interrupted export of the same kind, format, seasons,
+            and season types, rather than starting over.
+
+        Returns
+        -------
+        int
+            The number of rows written in this run.
+        """
+        checkpoint_path = path + '.checkpoint'
+        job = {
+            'kind': self.kind,
+            'format': self.fmt,
+            'seasons': None if seasons is None else [str(s) for s in seasons],
+            'season_types': None if season_types is None else sorted(season_types),
+        }
+        progress = {'done': [], 'offset': 0}
+        checkpoint = read_checkpoint(checkpoint_path, job, progress) if resume else dict(job, **progress)
+        if checkpoint['done']:
+            self.logger.debug('export: resuming after {0} units'.format(len(checkpoint['done'])))
+        done = set(checkpoint['done'])
+
+        if not os.path.exists(path):
+            checkpoint.update(done=[], offset=0)
+            done = set()
+
+        units = [u for u in self._units(seasons, season_types) if self._unit_key(u) not in done]
+        rows_written = 0
+        pool = ThreadPool(self.max_workers)
+
+        with _open(path, 'r+' if checkpoint['offset'] else 'w') as f:
+            f.seek(checkpoint['offset'])
+            f.truncate()
+
+            writer = None
+            if self.fmt == 'csv':
+                writer = csv.DictWriter(f, COLUMNS[self.kind], extrasaction='ignore', lineterminator='\n')
+                if not checkpoint['offset']:
+                    writer.writeheader()
+
+            try:
+                for i, rows in enumerate(pool.imap(self._fetch_unit, units)):
+                    unit = units[i]
+                    if rows is None:
+                        self.logger.error('export: unable to fetch {0}; stopping'.format(self._unit_key(unit)))
+                        break
+
+                    for row in rows:
+                        if writer is not None:
+                            writer.writerow(row)
+                        else:
+                            f.write(json.dumps(row, sort_keys=True) + '\n')
+                    f.flush()
+                    rows_written += len(rows)
+
+                    checkpoint['done'].append(self._unit_key(unit))
+                    checkpoint['offset'] = f.tell()
+                    write_checkpoint(checkpoint_path, checkpoint)
+                else:
+                    if os.path.exists(checkpoint_path):
+                        os.remove(checkpoint_path)
+            finally:
+                pool.terminate()
+                pool.join()
+
+        return rows_written
+
+
+    def _units(self, seasons, season_types):
+        """The units of work, in output order."""
+        if self.kind == 'shows':
+            return [('shows',)]
+
+        if seasons is None:
+            seasons = list(self._pigskin.seasons or [])
+        seasons = [str(s) for s in seasons]
+
+        if self.kind == 'seasons':
+            return [('seasons',)]
+        if self.kind in ['weeks', 'teams']:
+            return [(self.kind, s) for s in seasons]
+
+        # a unit per week; the weeks of each season are listed concurrently
+        pool = ThreadPool(min(self.max_workers, max(1, len(seasons))))
+        try:
+            weeks = pool.map(lambda s: self._pigskin.seasons[s].weeks, seasons)
+        finally:
+            pool.close()
+            pool.join()
+
+        current = self._pigskin.current
+        units = []
+        for s, season_weeks in zip(seasons, weeks):
+            for st in season_weeks or {}:
+                if season_types is None or st in season_types:
+                    units.extend(('games', s, st, w) for w in season_weeks[st] if not _is_future(current, s, st, w))
+
+        return units
+
+
+    @staticmethod
+    def _unit_key(unit):
+        return '/'.join(unit)
+
+
+    def _fetch_unit(self, unit):
+        """Return the rows of a unit of work, retrying on failure. None if
+        they could not be fetched."""
+        for attempt in range(self.retries + 1):
+            try:
+                rows = self._rows(unit)
+            except Exception:
+                self.logger.exception('export: failed to fetch {0} (attempt {1})'.format(self._unit_key(unit), attempt + 1))
+                continue
+
+            if rows is not None:
+                return rows
+            self.logger.warn('export: no data for {0} (attempt {1})'.format(self._unit_key(unit), attempt + 1))
+
+        return None
+
+
+    def _rows(self, unit):
+        gp = self._pigskin
+
+        if unit[0] == 'seasons':
+            return [{'season': s} for s in gp.seasons]
+
+        if unit[0] == 'shows':
+            shows = gp.shows
+            if shows is None:
+                return None
+            return [dict((k, shows[s]._show_info.get(k)) for k in COLUMNS['shows']) for s in shows]
+
+        season_obj = gp.seasons[unit[1]]
+
+        if unit[0] == 'weeks':
+            weeks = season_obj.weeks
+            if weeks is None:
+                return None
+            return [
+                OrderedDict([('season', unit[1]), ('season_type', st), ('week', w), ('desc', weeks[st][w].desc)])
+                for st in weeks for w in weeks[st]
+            ]
+
+        if unit[0] == 'teams':
+            teams = season_obj.teams
+            if teams is None:
+                return None
+            return [dict(teams[t]._team_info, season=unit[1]) for t in teams]
+
+        # the games are not kept on the week, so memory use stays flat
+        _, s, st, w = unit
+        games = season_obj.weeks[st][w]._fetch_games()
+        if games is None:
+            return None
+
+        return [self._game_row(s, st, w, g, games[g]._game_info) for g in games]
+
+
+    @staticmethod
+    def _game_row(season, season_type, week, name, info):
+        row = OrderedDict([
+            ('season', season),
+            ('season_type', season_type),
+            ('week', week),
+            ('game', name),
+        ])
+        for k in ['start_time', 'phase', 'city', 'stadium']:
+            row[k] = info[k]
+        for side in ['home', 'away']:
+            row[side] = info[side]['name']
+            row[side + '_abbr'] = info[side].get('abbr')
+            row[side + '_city'] = info[side]['city']
+            row[side + '_points'] = info[side]['points']
+        for v in ['full', 'condensed', 'coach']:
+            row['video_' + v] = info['versions'].get(v)
+
+        return row
+
+
+def _open(path, mode):
+    """Open the output file. Offsets (``tell()``) are in bytes, and newlines
+    are written as is, as the csv module expects."""
+    if sys.version_info[0] < 3:
+        return open(path, mode + 'b')
+
+    return io.open(path, mode, encoding='utf-8', newline='')
+
+
+def _is_future(current, season, season_type, week):
+    """Whether a week comes after the current one. False if either is
+    unknown."""
+    try:
+        return ((int(season), SEASON_TYPES.index(season_type), int(week))
+                > (int(current['season']), SEASON_TYPES.index(current['season_type']), int(current['week'])))
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+def main(argv=None):
+    """The ``pigskin-export`` command."""
+    parser = argparse.ArgumentParser(prog='pigskin-export', description='Export NFL Game Pass metadata.')
+    parser.add_argument('kind', choices=KINDS, help='what to export')
+    parser.add_argument('-o', '--output', required=True, help='the output file')
+    parser.add_argument('-f', '--format', choices=FORMATS, default='jsonl', help='the output format (default: jsonl)')
+    parser.add_argument('-s', '--seasons', nargs='+', help='the seasons to export (default: all)')
+    parser.add_argument('-t', '--season-types', nargs='+', choices=['pre', 'reg', 'post'], help='the season types to export (default: all)')
+    parser.add_argument('-w', '--workers', type=int, default=4, help='concurrent requests (default: 4)')
+    parser.add_argument('--restart', action='store_true', help='start over rather than resume an interrupted export')
+    parser.add_argument('--proxy', help='a proxy URL to send requests through')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    from .pigskin import pigskin
+
+    gp = pigskin(proxy_url=args.proxy)
+    e = exporter(gp, args.kind, args.format, args.workers)
+    rows = e.export(args.output, args.seasons, args.season_types, resume=not args.restart)
+
+    if os.path.exists(args.output + '.checkpoint'):
+        sys.stderr.write('pigskin-export: interrupted after {0} rows; run again to resume\n'.format(rows))
+        return 1
+
+    sys.stderr.write('pigskin-export: wrote {0} rows\n'.format(rows))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
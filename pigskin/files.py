@@ -0,0 +1,75 @@
+"""
+Helpers for the files pigskin writes (checkpoints, snapshots, schedules,
+credentials).
+"""
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def replace(src, dst):
+    """Rename ``src`` to ``dst``, replacing ``dst`` if it exists.
+
+    Parameters
+    ----------
+    src : str
+    dst : str
+
+    Note
+    ----
+    The rename is atomic, so an interrupted write (to ``src``) never leaves a
+    corrupt ``dst``; except on Python 2.7, which lacks ``os.replace()``.
+    """
+    try:
+        os.replace(src, dst)
+    except AttributeError:  # Python 2.7
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def read_checkpoint(path, job, progress):
+    """Return the checkpoint of an interrupted job, to resume it.
+
+    Parameters
+    ----------
+    path : str
+        The checkpoint file.
+    job : dict
+        What the job is; a checkpoint of any other job is ignored.
+    progress : dict
+        The progress of a job which has not started.
+
+    Returns
+    -------
+    dict
+        ``job``, along with the saved progress; or with ``progress`` if there
+        is no usable checkpoint of the same job.
+    """
+    checkpoint = dict(job, **progress)
+
+    try:
+        with open(path, 'r') as f:
+            saved = json.load(f)
+    except (IOError, OSError, ValueError):
+        return checkpoint
+
+    if not isinstance(saved, dict) or any(k not in saved for k in progress):
+        return checkpoint
+    if any(saved.get(k) != job[k] for k in job):
+        logger.info('{0} is for a different job; starting over'.format(path))
+        return checkpoint
+
+    checkpoint.update((k, saved[k]) for k in progress)
+    return checkpoint
+
+
+def write_checkpoint(path, checkpoint):
+    """Save a checkpoint (see ``read_checkpoint()``), atomically."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+
+    replace(tmp_path, path)
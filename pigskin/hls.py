@@ -0,0 +1,213 @@
+"""
+Helpers for HLS (m3u8) manifests and the streams pointing to them.
+"""
+import logging
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+try:
+    from urllib.parse import parse_qsl, urlencode, urljoin
+except ImportError:  # Python 2.7
+    from urllib import urlencode
+    from urlparse import parse_qsl, urljoin
+
+from . import settings
+from .cache import ttl_cache
+
+
+def stream_headers():
+    """The HTTP headers players are expected to send when fetching a stream.
+
+    Returns
+    -------
+    dict
+    """
+    # TODO: allow user-agent override
+    return {
+        'Connection': 'keep-alive',
+        'User-Agent': settings.user_agent
+    }
+
+
+def split_stream_url(stream_url):
+    """Split a ``url|headers`` stream string (as returned by
+    ``version.streams`` and ``m3u8_to_dict()``) into its parts.
+
+    Parameters
+    ----------
+    stream_url : str
+        A URL, optionally followed by ``|`` and urlencoded headers.
+
+    Returns
+    -------
+    tuple
+        The URL and a dict of headers (empty if there were none).
+    """
+    url, _, headers = stream_url.partition('|')
+    return url, dict(parse_qsl(headers))
+
+
+def variant_url(manifest_url, uri):
+    """Return the absolute URL of a playlist/segment referenced by a manifest.
+
+    Parameters
+    ----------
+    manifest_url : str
+        The URL of the manifest, including any query string.
+    uri : str
+        The (possibly relative) URI listed in the manifest.
+
+    Returns
+    -------
+    str
+        The absolute URL. The manifest's query string (which carries the
+        CDN's authorization) is carried over if ``uri`` has none of its own.
+    """
+    base, _, query = manifest_url.partition('?')
+
+    if '://' in uri:
+        url = uri
+    elif '/manifest' in base:
+        url = base[:base.rfind('/manifest') + 1] + uri
+    else:
+        url = urljoin(base, uri)
+
+    if query and '?' not in url:
+        url = url + '?' + query
+
+    return url
+
+
+class hls(object):
+    def __init__(self, pigskin_obj):
+        self._pigskin = pigskin_obj
+        self._store = self._pigskin._store
+        self.logger = logging.getLogger(__name__)
+
+        self._ladders = ttl_cache(settings.manifest_cache_ttl)
+
+
+    def fetch_playlist(self, url):
+        """Fetch and parse an m3u8 playlist.
+
+        Parameters
+        ----------
+        url : str
+            The URL of the master or variant playlist.
+
+        Returns
+        -------
+        m3u8.M3U8
+            The parsed playlist. None if there was a failure.
+        """
+        import m3u8
+
+        try:
+            r = self._store.s.get(url)
+            self._pigskin._log_request(r)
+            if not r.ok or not r.text.lstrip().startswith('#EXTM3U'):
+                raise ValueError('not an m3u8 playlist')
+            return m3u8.loads(r.text)
+        except ValueError:
+            self.logger.error('fetch_playlist: server response is invalid')
+            return None
+
+
+    def get_ladder(self, manifest_url, fetch_variants=False, max_workers=4):
+        """Return the bitrate ladder of a master manifest.
+
+        Parameters
+        ----------
+        manifest_url : str
+            The URL of the master manifest. A ``|headers`` suffix is accepted
+            and ignored.
+        fetch_variants : bool
+            Whether to also fetch every variant playlist (in parallel) to fill
+            in ``target_duration`` and ``segment_count``.
+        max_workers : int
+            The maximum number of variant playlists fetched concurrently.
+
+        Returns
+        -------
+        OrderedDict
+            With the bitrate (in kbps) as the key, sorted from low to high. Each
+            value is a dict with the keys ``bandwidth``, ``resolution`` (a
+            ``(width, height)`` tuple or None), ``codecs``, ``url``, ``stream``
+            (the URL with the headers a player should send appended), and
+            ``target_duration`` and ``segment_count`` (None unless the variants
+            were fetched, or if the variant could not be fetched). None if
+            there was a failure.
+
+        Note
+        ----
+        Ladders are cached per manifest URL, and shared between callers; they
+        should not be modified.
+        """
+        manifest_url, _ = split_stream_url(manifest_url)
+
+        ladder = self._ladders.get(manifest_url)
+        if ladder is None:
+            ladder = self._build_ladder(manifest_url)
+            if ladder is None:
+                return None
+            self._ladders.set(manifest_url, ladder)
+
+        if fetch_variants:
+            missing = [b for b in ladder if ladder[b]['segment_count'] is None]
+            if missing:
+                # the cached ladder is never modified; it is replaced by a
+                # filled in copy, once every variant has been fetched
+                details = self._fetch_variants([ladder[b]['url'] for b in missing], max_workers)
+                ladder = OrderedDict((b, dict(ladder[b])) for b in ladder)
+                for b, d in zip(missing, details):
+                    if d is not None:
+                        ladder[b].update(d)
+                if None not in details:
+                    self._ladders.set(manifest_url, ladder)
+
+        return ladder
+
+
+    def _build_ladder(self, manifest_url):
+        """Fetch a master manifest and build its (variant-less) ladder."""
+        m3u8_obj = self.fetch_playlist(manifest_url)
+        if m3u8_obj is None:
+            return None
+
+        suffix = '|' + urlencode(stream_headers())
+        rungs = []
+        for playlist in m3u8_obj.playlists:
+            try:
+                bandwidth = int(playlist.stream_info.bandwidth)
+            except (TypeError, ValueError):
+                self.logger.warn('get_ladder: variant without a bandwidth; skipping.')
+                continue
+
+            url = variant_url(manifest_url, playlist.uri)
+            rungs.append({
+                'bandwidth': bandwidth,
+                'resolution': playlist.stream_info.resolution,
+                'codecs': playlist.stream_info.codecs,
+                'url': url,
+                'stream': url + suffix,
+                'target_duration': None,
+                'segment_count': None,
+            })
+
+        rungs = sorted(rungs, key=lambda x: x['bandwidth'])
+        return OrderedDict((r['bandwidth'] / 1000, r) for r in rungs)
+
+
+    def _fetch_variants(self, urls, max_workers):
+        """Return the ``target_duration`` and ``segment_count`` of variant
+        playlists, as dicts (None for those which could not be fetched)."""
+        pool = ThreadPool(max(1, min(max_workers, len(urls))))
+        try:
+            playlists = pool.map(self.fetch_playlist, urls)
+        finally:
+            pool.close()
+            pool.join()
+
+        return [
+            None if p is None else {'target_duration': p.target_duration, 'segment_count': len(p.segments)}
+            for p in playlists
+        ]
@@ -4,61 +4,156 @@ A Python library for NFL Game Pass
 import json
 import logging
 from collections import OrderedDict
-try:
-    from urllib.parse import urlencode
-except ImportError:  # Python 2.7
-    from urllib import urlencode
 
 import requests
-import m3u8
 
 from . import settings
-from .europe.auth import auth
+from .cache import ttl_cache
+from .decoder import json_decoder
+from .transport import default_transport
 from .europe.data import data
+from .europe.routes import routes
 from .europe.utils import utils
-from .europe.video import video
 
 
 class store(object):
     def __init__(self):
         self.s = None  # a requests session
         self.gp_config = None
+        self.routes = None  # the URLs of gp_config, compiled
         self.access_token = None
         self.refresh_token = None
         self.username = None
+        self.token_expiry = None  # UNIX timestamp
+        self.auth_method = None  # the name of the last successful auth method
+        self.subscription = None
+        self.credential_store = None
+        self.stream_cache = None  # resolved VOD streams, keyed by video_id
+        self.diva_config_cache = None  # account-independent; may be shared
+        self.team_registry = None  # the teams of each season
+        self.negative_cache = None  # lookups which recently failed, or came back empty
+        self.team_detail_cache = None  # the games of team_detail payloads, by team
+        self.json_decoder = None  # also holds the decoded trees shared by URL
+        self.transport = None  # connection pools; may be shared by many instances
+        self.rate_limiter = None  # the transport's
+        self.circuit_breakers = None  # the transport's
 
 
 class pigskin(object):
     def __init__(
             self,
-            proxy_url=None
+            proxy_url=None,
+            credential_store=None,
+            snapshot_path=None,
+            transport=None,
+            session=None,
+            decoder=None
         ):
         self.logger = logging.getLogger(__name__)
         self.ch = logging.StreamHandler()
         self.ch.setLevel(logging.INFO)
         self.logger.addHandler(self.ch)
 
+        # every instance shares the default transport's connection pools,
+        # unless given its own
         self._store = store()
-        self._store.s = requests.Session()
-        self._store.s.proxies['http'] = proxy_url
-        self._store.s.proxies['https'] = proxy_url
-        self._store.gp_config = self._populate_config()
-
+        self._store.transport = transport or default_transport()
+        self._store.rate_limiter = self._store.transport.rate_limiter
+        self._store.circuit_breakers = self._store.transport.circuit_breakers
+        if session is not None:
+            self._store.s = self._store.transport.mount(session)
+            if proxy_url is not None:
+                self._store.s.proxies['http'] = proxy_url
+                self._store.s.proxies['https'] = proxy_url
+        else:
+            self._store.s = self._store.transport.session(proxy_url)
+
+        # a snapshot of an earlier instance spares fetching what is still fresh
+        self._snapshot_path = snapshot_path
+        snapshot_obj = snapshot_data = None
+        if snapshot_path is not None:
+            from .snapshot import snapshot
+            snapshot_obj = snapshot(self)
+            snapshot_data = snapshot_obj.read(snapshot_path)
+
+        if snapshot_data is None or not snapshot_obj.restore_config(snapshot_data):
+            self._store.gp_config = self._populate_config()
+
+        self._store.routes = routes(self._store.gp_config)
+        for name in self._store.routes:
+            self._store.circuit_breakers.add_endpoint(name, self._store.routes[name])
         self._store.access_token = None
         self._store.refresh_token = None
         self._store.subscription = None
+        self._store.credential_store = credential_store
+        self._store.stream_cache = ttl_cache(settings.stream_cache_ttl)
+        self._store.diva_config_cache = ttl_cache(settings.diva_config_ttl)
+        self._store.team_registry = ttl_cache(settings.teams_ttl)
+        self._store.negative_cache = ttl_cache(settings.negative_cache_ttl)
+        self._store.team_detail_cache = ttl_cache(settings.team_detail_ttl)
+        self._store.json_decoder = decoder or json_decoder(settings.json_decoder)
 
         self._broadcast = None
         self._current = None
+        self._hls_proxy = None
+        self._prefetcher = None
+        self._restored_seasons = {}  # past seasons from a stale snapshot
+        self._schedule = None
         self._seasons = None
         self._shows = None
         self.nfln_shows = {}
         self.episode_list = []
 
-        self._auth = auth(self)
+        # auth, video, and hls (and their dependencies) are only imported when
+        # first used. See the ``_auth``, ``_video``, and ``_hls`` properties.
+        self._auth_backend = None
+        self._hls_backend = None
+        self._schedule_index = None
+        self._video_backend = None
         self._data = data(self)
         self._utils = utils()
-        self._video = video(self)
+
+        if snapshot_data is not None:
+            snapshot_obj.restore(snapshot_data)
+
+        if self._store.credential_store is not None:
+            self._auth.restore_credentials()
+
+
+    @property
+    def _auth(self):
+        if self._auth_backend is None:
+            from .europe.auth import auth
+            self._auth_backend = auth(self)
+
+        return self._auth_backend
+
+
+    @property
+    def _hls(self):
+        if self._hls_backend is None:
+            from .hls import hls
+            self._hls_backend = hls(self)
+
+        return self._hls_backend
+
+
+    @property
+    def _index(self):
+        if self._schedule_index is None:
+            from .schedule import schedule_index
+            self._schedule_index = schedule_index()
+
+        return self._schedule_index
+
+
+    @property
+    def _video(self):
+        if self._video_backend is None:
+            from .europe.video import video
+            self._video_backend = video(self)
+
+        return self._video_backend
 
 
     @property
@@ -81,13 +176,9 @@ class pigskin(object):
 
         if self._broadcast is None:
             self.logger.debug('``broadcast`` not set. attempting to populate')
-            self._broadcast = OrderedDict()
-            for name in ['nfl_network', 'redzone']:
-                try:
-                    self._broadcast[name] = broadcast(self, name)
-                except Exception:
-                    self._broadcast[name] = None
-
+            # no request is made; failed lookups of a broadcast's streams are
+            # remembered by ``broadcast.streams``
+            self._broadcast = OrderedDict((name, broadcast(self, name)) for name in ['nfl_network', 'redzone'])
             self.logger.debug('``broadcast`` ready')
 
         return self._broadcast
@@ -126,7 +217,7 @@ class pigskin(object):
         if self._seasons is None:
             self.logger.debug('``seasons`` not set. attempting to populate')
             seasons_list = self._data.get_seasons()
-            self._seasons = OrderedDict((s, season(self, s)) for s in seasons_list)
+            self._seasons = OrderedDict((s, self._restored_seasons.get(s) or season(self, s)) for s in seasons_list)
             self.logger.debug('``seasons`` ready')
 
         return self._seasons
@@ -176,6 +267,11 @@ class pigskin(object):
         granted (i.e. has a valid subscription). Use ``subscription``
         to determine if a valid subscription (and thus access) is been granted.
 
+        When a ``credential_store`` is passed to ``pigskin()``, the tokens,
+        subscription, and session cookies are saved, and restored by new
+        instances. Logging in with restored credentials then costs a token
+        refresh at most.
+
         See Also
         --------
         ``subscription``
@@ -210,6 +306,7 @@ class pigskin(object):
         if self._store.subscription is None:
             self.logger.debug('``subscription`` not set. attempting to populate')
             self._store.subscription = self._auth.get_subscription()
+            self._auth.save_credentials()
             self.logger.debug('``subscription`` ready')
 
         return self._store.subscription
@@ -231,30 +328,482 @@ class pigskin(object):
         return self._auth.refresh_tokens()
 
 
+    def download(self, version_obj, path, bitrate=None, max_workers=4, progress=None):
+        """Download a game version (e.g. a condensed game or coaches tape) to
+        disk.
+
+        Parameters
+        ----------
+        version_obj : version
+            The version to download (e.g. ``game.versions['coach']``).
+        path : str
+            Where to write the MPEG-TS file.
+        bitrate : int or float
+            A bitrate (key) from ``m3u8_to_dict()``. Defaults to the highest
+            available.
+        max_workers : int
+            The maximum number of segments downloaded concurrently.
+        progress : callable
+            Called with the stats dict (see Returns) after every segment.
+
+        Returns
+        -------
+        dict
+            With the keys ``segments``, ``segment_count``, ``bytes``,
+            ``seconds``, and ``throughput`` (bytes per second). None if there
+            was a failure.
+
+        Note
+        ----
+        Progress is checkpointed to ``path + '.checkpoint'``; calling
+        ``download()`` again with the same arguments resumes an interrupted
+        download.
+        """
+        from .download import downloader
+
+        return downloader(self, max_workers).download(version_obj, path, bitrate, progress)
+
+
+    def iter_games(self, seasons=None, season_types=None, read_ahead=False, cache=True):
+        """Iterate over the games of seasons, a week at a time.
+
+        Games are yielded as soon as their week has been fetched, rather than
+        after every season has been populated.
+
+        Parameters
+        ----------
+        seasons : list
+            The seasons to walk, in order. Defaults to all seasons, from most to
+            least recent.
+        season_types : list
+            Any of ``pre``, ``reg``, and ``post``. Defaults to all.
+        read_ahead : bool
+            Fetch the next week in a background thread while the games of the
+            current one are being consumed.
+        cache : bool
+            Keep the fetched games on their ``week`` objects (as
+            ``week.games`` does). Disable to walk many seasons without holding
+            on to all of them.
+
+        Yields
+        ------
+        game
+        """
+        def weeks():
+            for s in (self.seasons if seasons is None else seasons):
+                season_obj = self.seasons[str(s)]
+                for st in season_obj.weeks:
+                    if season_types is None or st in season_types:
+                        for w in season_obj.weeks[st]:
+                            yield season_obj.weeks[st][w]
+
+        def fetch(week_obj):
+            if cache or week_obj._games is not None:
+                return week_obj.games
+            return week_obj._fetch_games()
+
+        for games in self._iter_pages(weeks(), fetch, read_ahead):
+            for g in games or {}:
+                yield games[g]
+
+
+    def iter_episodes(self, show_obj, seasons=None, read_ahead=False):
+        """Iterate over the episodes of a show.
+
+        Parameters
+        ----------
+        show_obj : show or str
+            A ``show`` (e.g. ``gp.shows['Hard Knocks']``) or its name.
+        seasons : list
+            Walk the episodes of these seasons, one season at a time. Defaults
+            to fetching all episodes at once.
+        read_ahead : bool
+            Fetch the next season in a background thread while the episodes of
+            the current one are being consumed.
+
+        Yields
+        ------
+        episode
+        """
+        if not isinstance(show_obj, show):
+            show_obj = self.shows[show_obj]
+
+        def fetch(s):
+            return self._data.get_show_episodes(show_obj._show_info['slug'], s)
+
+        for episodes in self._iter_pages([None] if seasons is None else seasons, fetch, read_ahead):
+            for e in episodes or []:
+                yield episode(show_obj, e)
+
+
+    def live_games(self, now=None):
+        """Return the games being played.
+
+        Parameters
+        ----------
+        now : int or float
+            A UNIX timestamp. Defaults to the current time.
+
+        Returns
+        -------
+        list
+            Of ``game`` objects, sorted by start time.
+
+        Note
+        ----
+        Only the current week, and weeks whose games have been accessed, are
+        searched.
+        """
+        self._index_current_week()
+        return self._index.live(now)
+
+
+    def upcoming_games(self, hours=6, now=None):
+        """Return the games kicking off within a number of hours.
+
+        Parameters
+        ----------
+        hours : int or float
+        now : int or float
+            A UNIX timestamp. Defaults to the current time.
+
+        Returns
+        -------
+        list
+            Of ``game`` objects, sorted by start time.
+
+        See Also
+        --------
+        ``live_games()``
+        """
+        self._index_current_week()
+        return self._index.upcoming(hours, now)
+
+
+    def recent_games(self, hours=24, now=None):
+        """Return the games that started within a number of hours, and are no
+        longer being played.
+
+        Parameters
+        ----------
+        hours : int or float
+        now : int or float
+            A UNIX timestamp. Defaults to the current time.
+
+        Returns
+        -------
+        list
+            Of ``game`` objects, sorted by start time.
+
+        See Also
+        --------
+        ``live_games()``
+        """
+        self._index_current_week()
+        return self._index.recent(hours, now)
+
+
     def m3u8_to_dict(self, manifest_url):
         """Return a dict of available bitrates and their respective stream. This
         is especially useful if you need to pass a URL to a player that doesn't
         support adaptive streaming."""
-        streams = {}
-        m3u8_header = {
-            'Connection': 'keep-alive',
-            'User-Agent': settings.user_agent
+        ladder = self._hls.get_ladder(manifest_url)
+        if ladder is None:
+            self.logger.error('m3u8_to_dict: server response is invalid')
+            return None
+
+        return dict((bitrate, ladder[bitrate]['stream']) for bitrate in ladder)
+
+
+    def m3u8_ladder(self, manifest_url, fetch_variants=False, max_workers=4):
+        """Return the bitrate ladder of a master manifest, so a player can
+        choose a rendition without extra round-trips of its own.
+
+        Parameters
+        ----------
+        manifest_url : str
+            The URL of the master manifest (e.g. one of ``version.streams``).
+        fetch_variants : bool
+            Whether to also fetch all variant playlists, in parallel, to report
+            their target duration and segment count.
+        max_workers : int
+            The maximum number of variant playlists fetched concurrently.
+
+        Returns
+        -------
+        OrderedDict
+            With the bitrate (in kbps) as the key, sorted from low to high, and
+            a dict with the keys ``bandwidth``, ``resolution``, ``codecs``,
+            ``url``, ``stream``, ``target_duration``, and ``segment_count`` as
+            the value. None if there was a failure.
+
+        Note
+        ----
+        Ladders are cached per manifest URL (see
+        ``settings.manifest_cache_ttl``).
+
+        See Also
+        --------
+        ``m3u8_to_dict()``
+        """
+        return self._hls.get_ladder(manifest_url, fetch_variants, max_workers)
+
+
+    def resolve_streams(self, videos, formats=None, live=False, max_workers=4):
+        """Resolve the streams of many game versions at once.
+
+        Parameters
+        ----------
+        videos : list
+            Of ``version`` objects or video ids.
+        formats : list
+            Only resolve these stream formats (e.g. ``['hls']``). All if None.
+        live : bool
+            Whether the games are live or not.
+        max_workers : int
+            The maximum number of videos resolved concurrently.
+
+        Yields
+        ------
+        tuple
+            ``(video_id, streams)``, in the order they complete. ``streams`` is
+            None if there was a failure.
+
+        Note
+        ----
+        The tokens are checked and the DIVA config is looked up once for the
+        whole batch. Complete results land in the stream cache, so
+        ``version.streams`` reuses them.
+        """
+        video_ids = [getattr(v, '_video_id', v) for v in videos]
+        return self._video.resolve_game_streams(video_ids, formats, live, max_workers)
+
+
+    def start_hls_proxy(self, host='127.0.0.1', port=0, prefetch=3,
+                        max_workers=3, cache_size=256 * 1024 * 1024, cache_dir=None):
+        """Start a local HLS proxy which buffers upcoming segments for players.
+
+        Parameters
+        ----------
+        host : str
+            The address to listen on (and to hand out in URLs).
+        port : int
+            The port to listen on. 0 picks a free port.
+        prefetch : int
+            How many segments ahead of the player to buffer.
+        max_workers : int
+            The maximum number of segments downloaded concurrently.
+        cache_size : int
+            The maximum size of the segment buffer, in bytes.
+        cache_dir : str
+            If set, buffer segments on disk in this directory rather than in
+            memory.
+
+        Returns
+        -------
+        hls_proxy
+            The running proxy. Use its ``url_for()`` to turn a stream (e.g. from
+            ``version.streams`` or ``m3u8_to_dict()``) into a local URL.
+
+        See Also
+        --------
+        ``stop_hls_proxy()``
+        """
+        from .proxy import hls_proxy
+
+        self.stop_hls_proxy()
+
+        self._hls_proxy = hls_proxy(self, host, port, prefetch, max_workers, cache_size, cache_dir)
+        self._hls_proxy.start()
+
+        return self._hls_proxy
+
+
+    def stop_hls_proxy(self):
+        """Stop the local HLS proxy (if running).
+
+        See Also
+        --------
+        ``start_hls_proxy()``
+        """
+        if self._hls_proxy is not None:
+            self._hls_proxy.stop()
+            self._hls_proxy = None
+
+
+    def start_prefetch(self, max_workers=2, max_games=16, interval=300):
+        """Start resolving the streams of the current week's games in the
+        background, as soon as they become available.
+
+        Parameters
+        ----------
+        max_workers : int
+            The maximum number of streams resolved concurrently.
+        max_games : int
+            The maximum number of games resolved per poll.
+        interval : int or float
+            Seconds to wait between polls of the current week.
+
+        Returns
+        -------
+        prefetcher
+            The running prefetcher.
+
+        Note
+        ----
+        You must be logged in for streams to be resolved. Any previously started
+        prefetcher is stopped first.
+
+        See Also
+        --------
+        ``stop_prefetch()``
+        """
+        from .prefetch import prefetcher
+
+        self.stop_prefetch()
+
+        self._prefetcher = prefetcher(self, max_workers, max_games, interval)
+        self._prefetcher.start()
+
+        return self._prefetcher
+
+
+    def stop_prefetch(self):
+        """Stop the background stream prefetcher (if running).
+
+        See Also
+        --------
+        ``start_prefetch()``
+        """
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+            self._prefetcher = None
+
+
+    def metrics(self):
+        """Return the state of the request layer.
+
+        Returns
+        -------
+        dict
+            With the keys ``circuit_breakers``, a dict with the endpoint as the
+            key, and ``rate_limits``, a dict with the host as the key. See
+            ``circuit_breaker.stats()`` and ``rate_limiter.stats()``.
+        """
+        return {
+            'circuit_breakers': self._store.circuit_breakers.stats(),
+            'rate_limits': dict((h, self._store.rate_limiter.stats(h)) for h in self._store.rate_limiter.hosts),
         }
 
+
+    def load_schedule(self, path):
+        """Read the weeks and games of the seasons in a schedule file from it,
+        rather than from the network.
+
+        Parameters
+        ----------
+        path : str
+            A file written by ``save_schedule()``.
+
+        Returns
+        -------
+        bool
+            True if successful, False otherwise.
+
+        Note
+        ----
+        The file is memory-mapped, and games are only read when their week is
+        accessed. Worker processes can share one file.
+        """
+        from .schedule import schedule_store
+
         try:
-            r = self._store.s.get(manifest_url)
-            self._log_request(r)
-            m3u8_manifest = r.content
-        except ValueError:
-            self.logger.error('m3u8_to_dict: server response is invalid')
+            schedule = schedule_store(path)
+        except (IOError, OSError, ValueError):
+            self.logger.error('load_schedule: unable to read {0}'.format(path))
+            return False
+
+        if self._schedule is not None:
+            self._schedule.close()
+        self._schedule = schedule
+
+        return True
+
+
+    def save_schedule(self, path, seasons=None):
+        """Save the weeks and games of seasons to a compact schedule file.
+
+        Parameters
+        ----------
+        path : str
+            Where to save the schedule.
+        seasons : list
+            The seasons to save. Defaults to every season before the current
+            one, as their schedules no longer change.
+
+        Returns
+        -------
+        int
+            The number of games saved. None if there was a failure.
+
+        See Also
+        --------
+        ``load_schedule()``
+        """
+        from .schedule import schedule_store
+
+        if seasons is None:
+            try:
+                seasons = [s for s in self.seasons if int(s) < int(self.current['season'])]
+            except (KeyError, TypeError, ValueError):
+                self.logger.error('save_schedule: unable to determine the past seasons')
+                return None
+
+        weeks = []
+        for s in seasons:
+            season_obj = self.seasons[str(s)]
+            for st in season_obj.weeks:
+                for w in season_obj.weeks[st]:
+                    week_obj = season_obj.weeks[st][w]
+                    games = OrderedDict((g, week_obj.games[g]._game_info) for g in week_obj.games)
+                    weeks.append((s, st, w, week_obj.desc, games))
+
+        try:
+            return schedule_store.write(path, weeks)
+        except (IOError, OSError, ValueError):
+            self.logger.exception('save_schedule: unable to write {0}'.format(path))
             return None
 
-        m3u8_obj = m3u8.loads(m3u8_manifest)
-        for playlist in m3u8_obj.playlists:
-            bitrate = int(playlist.stream_info.bandwidth) / 1000
-            streams[bitrate] = manifest_url[:manifest_url.rfind('/manifest') + 1] + playlist.uri + '?' + manifest_url.split('?')[1] + '|' + urlencode(m3u8_header)
 
-        return streams
+    def save_snapshot(self, path=None):
+        """Save the populated state (seasons, weeks, games, teams, shows, and
+        resolved streams) to a file, for a later instance to start warm.
+
+        Parameters
+        ----------
+        path : str
+            Where to save the snapshot. Defaults to the ``snapshot_path`` the
+            instance was created with.
+
+        Returns
+        -------
+        bool
+            True if successful, False otherwise.
+
+        Note
+        ----
+        Login state is not part of the snapshot; use a ``credential_store`` for
+        that. Stale entries are dropped when a snapshot is loaded, and fetched
+        again on first access.
+        """
+        from .snapshot import snapshot
+
+        path = path or self._snapshot_path
+        if path is None:
+            self.logger.error('save_snapshot: no path given')
+            return False
+
+        return snapshot(self).save(path)
 
 
     def nfldate_to_datetime(self, nfldate, localize=False):
@@ -275,6 +824,45 @@ class pigskin(object):
         return self._utils.nfldate_to_datetime(nfldate, localize)
 
 
+    def _index_current_week(self):
+        """Make sure the games of the current week are in the index."""
+        try:
+            current = self.current
+            week_obj = self.seasons[str(current['season'])].weeks[current['season_type']][str(current['week'])]
+        except (KeyError, TypeError):
+            self.logger.error('unable to find the current week')
+            return False
+
+        return week_obj.games is not None
+
+
+    @staticmethod
+    def _iter_pages(items, fetch, read_ahead=False):
+        """Yield ``fetch(item)`` for each item, in order. With ``read_ahead``,
+        the next item is fetched in a background thread meanwhile."""
+        if not read_ahead:
+            for item in items:
+                yield fetch(item)
+            return
+
+        from multiprocessing.pool import ThreadPool
+
+        pool = ThreadPool(1)
+        try:
+            pending = None
+            for item in items:
+                job = pool.apply_async(fetch, (item,))
+                if pending is not None:
+                    yield pending.get()
+                pending = job
+
+            if pending is not None:
+                yield pending.get()
+        finally:
+            pool.terminate()
+            pool.join()
+
+
     def _log_request(self, r):
         """Log (at the debug level) everything about a provided HTTP request.
 
@@ -383,7 +971,11 @@ class season(object):
         """
         if self._weeks is None:
             self.logger.debug('``weeks`` not set. attempting to populate')
-            weeks_dict = self._data.get_weeks(self._season)
+            weeks_dict = None
+            if self._pigskin._schedule is not None:
+                weeks_dict = self._pigskin._schedule.weeks(self._season)
+            if weeks_dict is None:
+                weeks_dict = self._data.get_weeks(self._season)
 
             for st in weeks_dict:
                 weeks_dict[st] = OrderedDict((w, week(self, st, w, weeks_dict[st][w])) for w in weeks_dict[st])
@@ -445,9 +1037,17 @@ class team(object):
         """
         # NOTE: Currently this only fetches once.
         if self._games is None:
+            negative_key = ('team_games', self._season, self.name)
+            if negative_key in self._pigskin._store.negative_cache:
+                return None
+
             self.logger.debug('``games`` not set. attempting to populate')
 
             games_dict = self._data.get_team_games(self.name, self._season)
+            if games_dict is None:
+                self._pigskin._store.negative_cache.set(negative_key, True)
+                return None
+
             for st in games_dict:
                 games_dict[st] = OrderedDict((g, game(self, games_dict[st][g])) for g in games_dict[st])
 
@@ -517,16 +1117,43 @@ class week(object):
         # every time. That info should be grabbed from the parent pigskin
         # instance, where it is cached.
         if self._games is None:
+            negative_key = ('week_games', self._season, self._season_type, self._week)
+            if negative_key in self._pigskin._store.negative_cache:
+                return None
+
             self.logger.debug('``games`` not set. attempting to populate')
+            games_dict = self._fetch_games()
+            if games_dict is None:
+                self._pigskin._store.negative_cache.set(negative_key, True)
+                return None
 
-            games_dict = self._data.get_week_games(self._season, self._season_type, self._week)
-            games_dict = OrderedDict((g, game(self, games_dict[g])) for g in games_dict)
             self._games = games_dict
+            self._pigskin._index.add_week(self._season, self._season_type, self._week, self._games)
             self.logger.debug('``games`` ready')
 
         return self._games
 
 
+    def _fetch_games(self):
+        """Return the week's games, from the schedule file or the network.
+
+        Returns
+        -------
+        OrderedDict
+            With the game name as the key and a game object as the value. None
+            if there was a failure.
+        """
+        games_dict = None
+        if self._pigskin._schedule is not None:
+            games_dict = self._pigskin._schedule.games(self._season, self._season_type, self._week)
+        if games_dict is None:
+            games_dict = self._data.get_week_games(self._season, self._season_type, self._week)
+        if games_dict is None:
+            return None
+
+        return OrderedDict((g, game(self, games_dict[g])) for g in games_dict)
+
+
 class game(object):
     def __init__(self, week_obj, game_info):
         self._pigskin = week_obj._pigskin
@@ -550,7 +1177,7 @@ class game(object):
         Returns
         -------
         dict
-            With the keys ``name``, ``city``, and ``points``.
+            With the keys ``name``, ``abbr``, ``city``, and ``points``.
         """
         # TODO: perhaps it's better to return a ``team`` object here with all
         # team info and move the points to different property.
@@ -575,7 +1202,7 @@ class game(object):
         Returns
         -------
         dict
-            With the keys ``name``, ``city``, and ``points``.
+            With the keys ``name``, ``abbr``, ``city``, and ``points``.
         """
         # TODO: perhaps it's better to return a ``team`` object here with all
         # team info and move the points to different property.
@@ -639,7 +1266,6 @@ class game(object):
 class version(object):
     def __init__(self, game_obj, desc_key, video_id):
         self._pigskin = game_obj._pigskin
-        self._video = self._pigskin._video
         self._desc_key = desc_key
         self._video_id = video_id
 
@@ -669,7 +1295,7 @@ class version(object):
         if self._streams is None:
             self.logger.debug('``streams`` not set. attempting to populate')
             # TODO: support live streams
-            self._streams = self._video.get_game_streams(self._video_id, live=False)
+            self._streams = self._pigskin._video.get_game_streams(self._video_id, live=False)
             self.logger.debug('``streams`` ready')
 
         return self._streams
@@ -721,10 +1347,73 @@ class show(object):
         return self._seasons
 
 
+class episode(object):
+    def __init__(self, show_obj, episode_info):
+        self._pigskin = show_obj._pigskin
+        self._show = show_obj
+        self._episode_info = episode_info
+
+        self.logger = logging.getLogger(__name__)
+
+
+    @property
+    def air_date(self):
+        """The UTC date and time the episode aired.
+
+        Returns
+        -------
+        str
+            None if unknown.
+
+        See Also
+        --------
+        nfldate_to_datetime()
+        """
+        return self._episode_info['air_date']
+
+
+    @property
+    def desc(self):
+        return self._episode_info['desc']
+
+
+    @property
+    def duration(self):
+        """The length of the episode, in seconds.
+
+        Returns
+        -------
+        float
+            None if unknown.
+        """
+        return self._episode_info['duration']
+
+
+    @property
+    def season(self):
+        """The season the episode (most likely) belongs to.
+
+        Returns
+        -------
+        str
+            None if it could not be determined.
+        """
+        return self._episode_info['season']
+
+
+    @property
+    def title(self):
+        return self._episode_info['title']
+
+
+    @property
+    def video_id(self):
+        return self._episode_info['video_id']
+
+
 class broadcast(object):
     def __init__(self, pigskin_obj, name):
         self._pigskin = pigskin_obj
-        self._video = self._pigskin._video
         self._name = name
 
         self.logger = logging.getLogger(__name__)
@@ -757,14 +1446,20 @@ class broadcast(object):
 
     @property
     def on_air(self):
-        return self._video.is_on_air(self._name)
+        return self._pigskin._video.is_on_air(self._name)
 
 
     @property
     def streams(self):
         if self._streams is None:
+            negative_key = ('broadcast_streams', self._name)
+            if negative_key in self._pigskin._store.negative_cache:
+                return None
+
             self.logger.debug('``streams`` not set. attempting to populate')
-            self._streams = self._video.get_broadcast_streams(self._name)
+            self._streams = self._pigskin._video.get_broadcast_streams(self._name)
+            if self._streams is None:
+                self._pigskin._store.negative_cache.set(negative_key, True)
             self.logger.debug('``streams`` ready')
 
         return self._streams
@@ -0,0 +1,303 @@
+"""
+Serve several Game Pass accounts from one process.
+
+Public, account-independent data (the config, seasons, weeks, games, shows,
+and the DIVA config) is fetched and cached once, by a shared ``pigskin``
+instance. Each account gets a lightweight ``session`` handle which holds only
+its own tokens, subscription, and cookies.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from . import settings
+from .cache import ttl_cache
+from .europe.auth import auth
+from .europe.video import video
+from .pigskin import store
+
+
+class session(object):
+    """The per-account state of a shared ``pigskin`` instance.
+
+    Parameters
+    ----------
+    pigskin_obj : pigskin
+        The shared instance, which provides all public data.
+    username : str
+        The account's NFL Game Pass username.
+    password : str
+        The account's password.
+    credential_store : credential_store
+        Where to persist this account's login state (optional).
+
+    Note
+    ----
+    The HTTP session of a handle shares its connection pools with the shared
+    instance, but keeps its own cookies.
+    """
+    def __init__(self, pigskin_obj, username, password, credential_store=None):
+        self._pigskin = pigskin_obj
+        self.logger = logging.getLogger(__name__)
+        self.username = username
+        self._password = password
+
+        shared = self._pigskin._store
+        self._store = store()
+        self._store.transport = shared.transport
+        self._store.s = shared.transport.session()
+        self._store.s.proxies = dict(shared.s.proxies)
+
+        self._store.gp_config = shared.gp_config
+        self._store.routes = shared.routes
+        self._store.diva_config_cache = shared.diva_config_cache
+        self._store.rate_limiter = shared.rate_limiter
+        self._store.circuit_breakers = shared.circuit_breakers
+        self._store.credential_store = credential_store
+        self._store.stream_cache = ttl_cache(settings.stream_cache_ttl)
+
+        self._auth = auth(self)
+        self._video = video(self)
+
+        self._auth.restore_credentials()
+
+
+    @property
+    def subscription(self):
+        """The subscription type of the account.
+
+        Returns
+        -------
+        str
+            None if false.
+        """
+        if self._store.subscription is None:
+            self._store.subscription = self._auth.get_subscription()
+            self._auth.save_credentials()
+
+        return self._store.subscription
+
+
+    def login(self, force=False):
+        """Login the account.
+
+        Parameters
+        ----------
+        force : bool
+            Skip checking if access is already granted, and instead always
+            authenticate.
+
+        Returns
+        -------
+        bool
+            True if successful, False otherwise.
+        """
+        if not self._auth.login(self.username, self._password, force):
+            return False
+
+        if not self.subscription:
+            self.logger.warn('{0} has no active subscription'.format(self.username))
+
+        return True
+
+
+    def logout(self):
+        """Logout the account.
+
+        Returns
+        -------
+        bool
+            True if successful, False otherwise.
+        """
+        return self._auth.logout()
+
+
+    def refresh_tokens(self):
+        """Refresh the account's tokens.
+
+        Returns
+        -------
+        bool
+            True if successful, False otherwise.
+        """
+        return self._auth.refresh_tokens()
+
+
+    def broadcast_streams(self, name):
+        """Return the streams of a broadcast, for this account.
+
+        Parameters
+        ----------
+        name : str
+            ``nfl_network`` or ``redzone``.
+
+        Returns
+        -------
+        dict
+            with the stream format (hls, chromecast, etc) as the key and the
+            stream content_url as the value. None if there was a failure.
+        """
+        return self._video.get_broadcast_streams(name)
+
+
+    def streams(self, version_obj, live=False):
+        """Return the streams of a game version, for this account.
+
+        Parameters
+        ----------
+        version_obj : version or str
+            A ``version`` (of the shared instance's games) or a video id.
+        live : bool
+            Whether the game is live or not.
+
+        Returns
+        -------
+        dict
+            with the stream format (hls, chromecast, etc) as the key and the
+            stream content_url as the value. None if there was a failure.
+        """
+        video_id = getattr(version_obj, '_video_id', version_obj)
+        return self._video.get_game_streams(video_id, live)
+
+
+    def resolve_streams(self, videos, formats=None, live=False, max_workers=4):
+        """Resolve the streams of many game versions at once, for this account.
+
+        See ``pigskin.resolve_streams()``.
+        """
+        video_ids = [getattr(v, '_video_id', v) for v in videos]
+        return self._video.resolve_game_streams(video_ids, formats, live, max_workers)
+
+
+class session_pool(object):
+    """A pool of per-account ``session`` handles, sharing one ``pigskin``
+    instance.
+
+    Parameters
+    ----------
+    pigskin_obj : pigskin
+        The shared instance, which provides all public data.
+    max_checkouts : int
+        How many times each account may be checked out at once.
+
+    Examples
+    --------
+    >>> pool = session_pool(pigskin())
+    >>> pool.add_account('user1', 'secret1')
+    >>> pool.add_account('user2', 'secret2')
+    >>> with pool.checkout() as s:
+    ...     streams = s.streams(game.versions['full'])
+    """
+    def __init__(self, pigskin_obj, max_checkouts=1):
+        self._pigskin = pigskin_obj
+        self.max_checkouts = max(1, int(max_checkouts))
+        self.logger = logging.getLogger(__name__)
+
+        self._sessions = {}
+        self._checkouts = {}
+        self._order = deque()  # usernames, in round-robin order
+        self._cond = threading.Condition()
+
+
+    @property
+    def accounts(self):
+        """The usernames of the accounts in the pool.
+
+        Returns
+        -------
+        list
+        """
+        with self._cond:
+            return sorted(self._sessions)
+
+
+    def add_account(self, username, password, credential_store=None):
+        """Add an account to the pool.
+
+        Parameters
+        ----------
+        username : str
+            The account's NFL Game Pass username.
+        password : str
+            The account's password.
+        credential_store : credential_store
+            Where to persist the account's login state (optional).
+        """
+        handle = session(self._pigskin, username, password, credential_store)
+
+        with self._cond:
+            if username not in self._sessions:
+                self._order.append(username)
+            self._sessions[username] = handle
+            self._checkouts.setdefault(username, 0)
+            self._cond.notify_all()
+
+
+    def acquire(self, username=None, timeout=None):
+        """Check out a logged in handle. It must be handed back with
+        ``release()``; ``checkout()`` does so automatically.
+
+        Parameters
+        ----------
+        username : str
+            The account to check out. Any account if None; accounts are then
+            handed out round-robin.
+        timeout : int or float
+            Seconds to wait for a handle to become available. None waits
+            indefinitely.
+
+        Returns
+        -------
+        session
+            None if no handle became available, or if it could not login.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+
+        with self._cond:
+            while True:
+                available = [u for u in self._order if username in [None, u] and self._checkouts[u] < self.max_checkouts]
+                if available:
+                    chosen = available[0]
+                    self._checkouts[chosen] += 1
+                    self._order.remove(chosen)
+                    self._order.append(chosen)
+                    handle = self._sessions[chosen]
+                    break
+
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    self.logger.warn('session_pool: no handle became available')
+                    return None
+
+                self._cond.wait(remaining)
+
+        if not handle.login():
+            self.logger.error('session_pool: could not login {0}'.format(handle.username))
+            self.release(handle)
+            return None
+
+        return handle
+
+
+    def release(self, handle):
+        """Return a checked out handle to the pool."""
+        with self._cond:
+            self._checkouts[handle.username] -= 1
+            self._cond.notify_all()
+
+
+    @contextmanager
+    def checkout(self, username=None, timeout=None):
+        """Check out a logged in handle for the duration of a ``with`` block.
+
+        See ``acquire()`` for the parameters. The handle is None if none could
+        be checked out.
+        """
+        handle = self.acquire(username, timeout)
+        try:
+            yield handle
+        finally:
+            if handle is not None:
+                self.release(handle)
@@ -0,0 +1,156 @@
+"""
+Background resolution of game streams, ahead of demand.
+"""
+import logging
+import threading
+
+
+class prefetcher(object):
+    """Watch the current week and resolve the streams of games as soon as
+    their versions (full, condensed, coach) become available.
+
+    Resolved streams land in the stream cache, so the first ``version.streams``
+    request by a user is served without a round-trip to the processing URL.
+
+    Parameters
+    ----------
+    pigskin_obj : pigskin
+        The (logged in) pigskin instance to resolve streams with.
+    max_workers : int
+        The maximum number of streams resolved concurrently.
+    max_games : int
+        The maximum number of games resolved per poll. The most recently
+        started games are resolved first.
+    interval : int or float
+        Seconds to wait between polls of the current week.
+    """
+    def __init__(self, pigskin_obj, max_workers=2, max_games=16, interval=300):
+        self._pigskin = pigskin_obj
+        self._data = self._pigskin._data
+        self._store = self._pigskin._store
+        self._video = self._pigskin._video
+
+        self.max_workers = max(1, int(max_workers))
+        self.max_games = max(1, int(max_games))
+        self.interval = interval
+
+        self.logger = logging.getLogger(__name__)
+        self._stop = threading.Event()
+        self._thread = None
+
+
+    @property
+    def running(self):
+        """Whether the background thread is running.
+
+        Returns
+        -------
+        bool
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+
+    def start(self):
+        """Start polling in a background (daemon) thread.
+
+        Returns
+        -------
+        bool
+            True if the thread was started, False if it was already running.
+        """
+        if self.running:
+            return False
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='pigskin-prefetch')
+        self._thread.daemon = True
+        self._thread.start()
+
+        self.logger.debug('prefetcher started')
+        return True
+
+
+    def stop(self, timeout=None):
+        """Stop the background thread.
+
+        Parameters
+        ----------
+        timeout : int or float
+            Seconds to wait for an in-progress poll to finish. ``None`` waits
+            indefinitely.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+        self.logger.debug('prefetcher stopped')
+
+
+    def run_once(self):
+        """Poll the current week once and resolve any pending streams.
+
+        Returns
+        -------
+        int
+            The number of videos whose streams were resolved.
+        """
+        current = self._data.get_current_season_and_week()
+        if not current:
+            self.logger.warn('prefetch: could not determine the current week')
+            return 0
+
+        games = self._data.get_week_games(current['season'], current['season_type'], current['week'])
+        if not games:
+            return 0
+
+        video_ids = self._pending_video_ids(games)
+        if not video_ids:
+            return 0
+
+        self.logger.debug('prefetch: resolving {0} videos'.format(len(video_ids)))
+        results = self._video.resolve_game_streams(video_ids, max_workers=self.max_workers)
+
+        return sum(1 for _, streams in results if streams)
+
+
+    def _pending_video_ids(self, games):
+        """The video ids of games which have versions, but no cached streams.
+
+        Parameters
+        ----------
+        games : OrderedDict
+            As returned by ``data.get_week_games()``.
+
+        Returns
+        -------
+        list
+            Video ids, ordered by the start time of their game (most recent
+            first) and limited to ``max_games`` games.
+        """
+        video_ids = []
+        game_count = 0
+
+        # the games which started last are the ones which just finished
+        ordered = sorted(games.values(), key=lambda g: g['start_time'], reverse=True)
+        for game_info in ordered:
+            pending = [v for v in game_info['versions'].values() if v not in self._store.stream_cache]
+            if not pending:
+                continue
+
+            video_ids.extend(pending)
+            game_count += 1
+            if game_count >= self.max_games:
+                break
+
+        return video_ids
+
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                self.logger.exception('prefetch: poll failed')
+
+            self._stop.wait(self.interval)
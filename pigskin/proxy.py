@@ -0,0 +1,365 @@
+"""
+A local HLS proxy which buffers upcoming segments for players on slow links.
+"""
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:  # Python 2.7
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+try:
+    from urllib.parse import urlparse
+except ImportError:  # Python 2.7
+    from urlparse import urlparse
+
+from .cache import bytes_lru_cache
+from .hls import split_stream_url, variant_url
+
+# segments whose followers are remembered for prefetching, at most; live
+# playlists keep adding new ones
+MAX_SEGMENTS = 4096
+
+
+class _threading_http_server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class hls_proxy(object):
+    """Serve HLS streams to local players from an in-memory (or disk) buffer.
+
+    Playlists are fetched from the CDN on every request (so live streams keep
+    working) and rewritten to point at the proxy. When a player requests a
+    segment, the next ``prefetch`` segments of that playlist are downloaded in
+    the background, so several local devices watching the same game share a
+    single download.
+
+    Parameters
+    ----------
+    pigskin_obj : pigskin
+        The pigskin instance whose HTTP session is used for the CDN.
+    host : str
+        The address to listen on. Use ``0.0.0.0`` to serve other devices on the
+        local network.
+    port : int
+        The port to listen on. 0 picks a free port.
+    prefetch : int
+        How many segments ahead of the player to buffer.
+    max_workers : int
+        The maximum number of segments downloaded concurrently.
+    cache_size : int
+        The maximum size of the segment buffer, in bytes.
+    cache_dir : str
+        If set, buffer segments on disk in this directory rather than in
+        memory.
+
+    Note
+    ----
+    Only URLs the proxy issued itself (from ``url_for()`` and the playlists it
+    rewrote) are served; they are signed with a key of the instance. So,
+    listening on ``0.0.0.0``, it is not an open relay for the session.
+    """
+    def __init__(self, pigskin_obj, host='127.0.0.1', port=0, prefetch=3,
+                 max_workers=3, cache_size=256 * 1024 * 1024, cache_dir=None):
+        self._pigskin = pigskin_obj
+        self._store = self._pigskin._store
+        self.logger = logging.getLogger(__name__)
+
+        self.host = host
+        self.port = port
+        self.prefetch = prefetch
+        self.max_workers = max(1, int(max_workers))
+
+        self._cache = bytes_lru_cache(cache_size, cache_dir)
+        self._pending = {}  # segment token -> threading.Event, while downloading
+        self._pending_lock = threading.Lock()
+        self._next_segments = OrderedDict()  # segment token -> tokens of the segments after it; LRU
+        self._next_segments_lock = threading.Lock()
+        self._key = os.urandom(32)  # signs the tokens of the URLs the proxy issues
+
+        self._pool = None
+        self._server = None
+        self._thread = None
+
+
+    @property
+    def base_url(self):
+        """The URL the proxy is reachable at.
+
+        Returns
+        -------
+        str
+            None if the proxy is not running.
+        """
+        if self._server is None:
+            return None
+
+        return 'http://{0}:{1}'.format(self.host, self._server.server_address[1])
+
+
+    def start(self):
+        """Start serving in a background (daemon) thread.
+
+        Returns
+        -------
+        str
+            The ``base_url`` of the proxy.
+        """
+        if self._server is not None:
+            return self.base_url
+
+        proxy = self
+
+        class handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                proxy._handle(self)
+
+            def log_message(self, format, *args):
+                proxy.logger.debug('hls_proxy: ' + format % args)
+
+        self._pool = ThreadPool(self.max_workers)
+        self._server = _threading_http_server((self.host, self.port), handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name='pigskin-hls-proxy')
+        self._thread.daemon = True
+        self._thread.start()
+
+        self.logger.debug('hls_proxy: listening on {0}'.format(self.base_url))
+        return self.base_url
+
+
+    def stop(self):
+        """Stop serving, and drop the segment buffer."""
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._pool.close()
+        self._pool.join()
+
+        self._server = None
+        self._thread = None
+        self._pool = None
+        self._cache.clear()
+        with self._next_segments_lock:
+            self._next_segments.clear()
+
+
+    def url_for(self, stream_url):
+        """Return the proxy URL a player should use for a stream.
+
+        Parameters
+        ----------
+        stream_url : str
+            A master or variant playlist URL, optionally with a ``|headers``
+            suffix (e.g. a value of ``version.streams`` or ``m3u8_to_dict()``).
+
+        Returns
+        -------
+        str
+            The local URL of the (rewritten) playlist.
+        """
+        if self._server is None:
+            self.start()
+
+        return self._local_url('playlist', stream_url)
+
+
+    def _local_url(self, kind, stream_url):
+        return '{0}/{1}/{2}'.format(self.base_url, kind, self._encode_token(stream_url))
+
+
+    def _signature(self, data):
+        return hmac.new(self._key, data, hashlib.sha256).hexdigest()[:32]
+
+
+    def _encode_token(self, stream_url):
+        data = stream_url.encode('utf-8')
+        return base64.urlsafe_b64encode(data).decode('ascii') + '.' + self._signature(data)
+
+
+    def _decode_token(self, token):
+        """Return the stream URL of a token.
+
+        Raises
+        ------
+        ValueError
+            If the token was not issued by this proxy.
+        """
+        token = token.split('?')[0]
+        encoded, _, signature = token.rpartition('.')
+
+        # the padding is kept when encoding, but be lenient towards players
+        encoded += '=' * (-len(encoded) % 4)
+        data = base64.urlsafe_b64decode(encoded.encode('ascii'))
+        if not hmac.compare_digest(signature, self._signature(data)):
+            raise ValueError('the token was not issued by this proxy')
+
+        return data.decode('utf-8')
+
+
+    def _handle(self, request):
+        try:
+            kind, token = request.path.lstrip('/').split('/', 1)
+            stream_url = self._decode_token(token)
+        except (TypeError, ValueError, UnicodeError):
+            request.send_error(404)
+            return
+
+        if kind == 'playlist':
+            body = self._get_playlist(stream_url)
+            content_type = 'application/vnd.apple.mpegurl'
+        elif kind == 'segment':
+            body = self._get_segment(token, stream_url)
+            content_type = 'video/MP2T'
+        else:
+            request.send_error(404)
+            return
+
+        if body is None:
+            request.send_error(502)
+            return
+
+        request.send_response(200)
+        request.send_header('Content-Type', content_type)
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+
+    def _fetch(self, stream_url):
+        """Fetch a URL from the CDN, with the headers of the stream string.
+
+        Returns
+        -------
+        requests.models.Response
+            None if there was a failure.
+        """
+        url, headers = split_stream_url(stream_url)
+
+        try:
+            r = self._store.s.get(url, headers=headers)
+        except Exception:
+            self.logger.exception('hls_proxy: unable to fetch {0}'.format(url))
+            return None
+
+        if not r.ok:
+            self.logger.error('hls_proxy: {0} returned {1}'.format(url, r.status_code))
+            return None
+
+        return r
+
+
+    def _get_playlist(self, stream_url):
+        """Fetch a playlist and rewrite its URIs to point at the proxy.
+
+        Returns
+        -------
+        bytes
+            The rewritten playlist. None if there was a failure.
+        """
+        r = self._fetch(stream_url)
+        if r is None:
+            return None
+
+        playlist_url, _, headers = stream_url.partition('|')
+        suffix = '|' + headers if headers else ''
+        is_master = '#EXT-X-STREAM-INF' in r.text
+
+        def local(uri, kind):
+            return self._local_url(kind, variant_url(playlist_url, uri) + suffix)
+
+        lines = []
+        segment_tokens = []
+        for line in r.text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+
+            if line.startswith('#'):
+                # keys, init segments, alternate renditions and I-frame
+                # playlists are referenced from URI attributes
+                is_playlist = line.startswith('#EXT-X-MEDIA:') or line.startswith('#EXT-X-I-FRAME-STREAM-INF:')
+                kind = 'playlist' if is_playlist else 'segment'
+                line = re.sub(r'URI="([^"]+)"', lambda m: 'URI="{0}"'.format(local(m.group(1), kind)), line)
+            elif is_master:
+                line = local(line, 'playlist')
+            else:
+                line = local(line, 'segment')
+                segment_tokens.append(line.rsplit('/', 1)[1])
+
+            lines.append(line)
+
+        # remember which segments follow which, for prefetching
+        with self._next_segments_lock:
+            for i, token in enumerate(segment_tokens):
+                self._next_segments.pop(token, None)
+                self._next_segments[token] = segment_tokens[i + 1:i + 1 + self.prefetch]
+            while len(self._next_segments) > MAX_SEGMENTS:
+                self._next_segments.popitem(last=False)
+
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+    def _get_segment(self, token, stream_url):
+        """Return a segment from the buffer (downloading it if needed), and
+        start buffering the segments that follow it.
+
+        Returns
+        -------
+        bytes
+            The segment. None if there was a failure.
+        """
+        with self._next_segments_lock:
+            next_tokens = self._next_segments.get(token, [])
+
+        for next_token in next_tokens:
+            if next_token not in self._cache and next_token not in self._pending:
+                self._pool.apply_async(self._download, (next_token, self._decode_token(next_token)))
+
+        return self._download(token, stream_url)
+
+
+    def _download(self, token, stream_url):
+        """Download a segment into the buffer. Concurrent requests for the same
+        segment wait for a single download."""
+        body = self._cache.get(token)
+        if body is not None:
+            return body
+
+        with self._pending_lock:
+            event = self._pending.get(token)
+            owner = event is None
+            if owner:
+                event = self._pending[token] = threading.Event()
+
+        if not owner:
+            event.wait()
+            body = self._cache.get(token)
+            if body is not None:
+                return body
+            # it was evicted already (or failed); fetch it ourselves
+
+        try:
+            # a slow segment is no sign of an overloaded CDN
+            self._store.rate_limiter.add_streaming_host(urlparse(split_stream_url(stream_url)[0]).netloc)
+            r = self._fetch(stream_url)
+            body = r.content if r is not None else None
+            if body is not None:
+                self._cache.set(token, body)
+        finally:
+            if owner:
+                with self._pending_lock:
+                    del self._pending[token]
+                event.set()
+
+        return body
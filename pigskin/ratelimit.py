@@ -0,0 +1,293 @@
+"""
+Client-side rate limiting and adaptive concurrency control for requests to
+Game Pass.
+"""
+import logging
+import threading
+import time
+try:
+    from urllib.parse import urlparse
+except ImportError:  # Python 2.7
+    from urlparse import urlparse
+
+from requests.adapters import HTTPAdapter
+
+
+class token_bucket(object):
+    """A token bucket: allows ``rate`` requests per second on average, with
+    bursts of up to ``burst`` requests.
+
+    Parameters
+    ----------
+    rate : int or float
+        Tokens added per second.
+    burst : int
+        The capacity of the bucket.
+    """
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.time()
+        self._paused_until = 0
+        self._lock = threading.Lock()
+
+
+    @property
+    def tokens(self):
+        """The number of tokens currently available."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+    def acquire(self):
+        """Take a token, waiting as long as needed."""
+        while True:
+            with self._lock:
+                self._refill()
+                now = time.time()
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+
+            time.sleep(wait)
+
+
+    def pause(self, seconds):
+        """Hand out no tokens for a while (e.g. after a Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.time() + seconds)
+
+
+    def _refill(self):
+        """Add the tokens accrued since the last refill. The caller must hold
+        the lock."""
+        now = time.time()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class adaptive_limit(object):
+    """A concurrency limit which adapts to the health of the server.
+
+    The limit grows by one for every ``limit`` healthy responses (additive
+    increase), and is halved on a 429 or 5xx response, a connection failure,
+    or a response much slower than usual (multiplicative decrease).
+
+    Parameters
+    ----------
+    initial : int
+        The starting limit.
+    minimum : int
+    maximum : int
+    latency_factor : int or float
+        How many times slower than the average a response must be to count as
+        unhealthy. None to never count slow responses as unhealthy.
+    """
+    def __init__(self, initial=4, minimum=1, maximum=16, latency_factor=3):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.latency_factor = latency_factor
+
+        self._limit = float(min(self.maximum, max(self.minimum, initial)))
+        self._in_flight = 0
+        self._latency = None  # a moving average of healthy responses, in seconds
+        self._cond = threading.Condition()
+
+
+    @property
+    def limit(self):
+        """The current concurrency limit.
+
+        Returns
+        -------
+        int
+        """
+        return int(self._limit)
+
+
+    @property
+    def in_flight(self):
+        """The number of requests in flight."""
+        return self._in_flight
+
+
+    def acquire(self):
+        """Wait until a request may be sent."""
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+
+    def release(self, status=None, latency=None):
+        """Record the outcome of a request, and adapt the limit.
+
+        Parameters
+        ----------
+        status : int
+            The HTTP status code. None if the request failed.
+        latency : int or float
+            Seconds the request took.
+        """
+        with self._cond:
+            self._in_flight -= 1
+
+            slow = (latency is not None and self._latency is not None and self.latency_factor is not None
+                    and latency > self._latency * self.latency_factor)
+            if status is None or status == 429 or status >= 500 or slow:
+                self._limit = max(self.minimum, self._limit / 2)
+            else:
+                self._limit = min(self.maximum, self._limit + 1 / self._limit)
+                if latency is not None:
+                    self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+
+            self._cond.notify_all()
+
+
+class rate_limiter(object):
+    """A token bucket and an adaptive concurrency limit per host.
+
+    Parameters
+    ----------
+    rate : int or float
+        Requests per second allowed to each host, on average.
+    burst : int
+        Requests allowed to each host in a burst.
+    max_concurrency : int
+        The upper bound of the adaptive concurrency limit of each host.
+    initial_concurrency : int
+        The concurrency limit each host starts with.
+
+    Note
+    ----
+    One limiter is shared by every HTTP session mounting its
+    ``rate_limited_adapter`` (e.g. all the sessions of a ``session_pool``).
+
+    Hosts which serve media segments (see ``add_streaming_host()``) are only
+    backed off on errors: a segment takes longer the bigger it is, so a slow
+    one says little about the health of the CDN.
+    """
+    def __init__(self, rate=10, burst=20, max_concurrency=8, initial_concurrency=4):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.initial_concurrency = initial_concurrency
+        self.logger = logging.getLogger(__name__)
+
+        self._hosts = {}  # host -> (token_bucket, adaptive_limit)
+        self._streaming_hosts = set()
+        self._lock = threading.Lock()
+
+
+    @property
+    def hosts(self):
+        """The hosts requested so far."""
+        with self._lock:
+            return list(self._hosts)
+
+
+    def add_streaming_host(self, host):
+        """Mark a host as serving media segments (e.g. a CDN), so slow
+        responses do not cut its concurrency limit.
+
+        Parameters
+        ----------
+        host : str
+            The host, with its port if any (as in a URL).
+        """
+        with self._lock:
+            self._streaming_hosts.add(host)
+            if host in self._hosts:
+                self._hosts[host][1].latency_factor = None
+
+
+    def acquire(self, host):
+        """Wait until a request to a host may be sent."""
+        bucket, limit = self._host(host)
+        limit.acquire()
+        bucket.acquire()
+
+
+    def release(self, host, status=None, latency=None, retry_after=None):
+        """Record the outcome of a request to a host.
+
+        Parameters
+        ----------
+        host : str
+        status : int
+            The HTTP status code. None if the request failed.
+        latency : int or float
+            Seconds the request took.
+        retry_after : int or float
+            Seconds the server asked to wait before the next request.
+        """
+        bucket, limit = self._host(host)
+        limit.release(status, latency)
+
+        if retry_after:
+            self.logger.warn('rate_limiter: {0} asked to wait {1}s'.format(host, retry_after))
+            bucket.pause(retry_after)
+
+
+    def stats(self, host):
+        """The state of a host's limits.
+
+        Returns
+        -------
+        dict
+            With the keys ``tokens``, ``limit``, and ``in_flight``.
+        """
+        bucket, limit = self._host(host)
+        return {'tokens': bucket.tokens, 'limit': limit.limit, 'in_flight': limit.in_flight}
+
+
+    def _host(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = (
+                    token_bucket(self.rate, self.burst),
+                    adaptive_limit(self.initial_concurrency, 1, self.max_concurrency,
+                                   None if host in self._streaming_hosts else 3),
+                )
+            return self._hosts[host]
+
+
+class rate_limited_adapter(HTTPAdapter):
+    """A requests transport adapter which sends every request through a
+    ``rate_limiter``.
+
+    Parameters
+    ----------
+    limiter : rate_limiter
+    """
+    def __init__(self, limiter, **kwargs):
+        self.limiter = limiter
+        super(rate_limited_adapter, self).__init__(**kwargs)
+
+
+    def send(self, request, **kwargs):
+        host = urlparse(request.url).netloc
+        self.limiter.acquire(host)
+
+        start = time.time()
+        status = retry_after = None
+        try:
+            response = super(rate_limited_adapter, self).send(request, **kwargs)
+            status = response.status_code
+            if status == 429 or status == 503:
+                retry_after = _retry_after(response.headers.get('Retry-After'))
+            return response
+        finally:
+            self.limiter.release(host, status, time.time() - start, retry_after)
+
+
+def _retry_after(value):
+    """The seconds of a Retry-After header. Dates are not supported."""
+    try:
+        return max(0, float(value))
+    except (TypeError, ValueError):
+        return None
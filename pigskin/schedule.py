@@ -0,0 +1,502 @@
+"""
+A compact, memory-mapped store of (historical) season schedules, and an index
+of games by start time.
+"""
+import bisect
+import calendar
+import logging
+import mmap
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from . import settings
+
+from .europe.utils import utils
+from .files import replace
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_MAGIC = b'PSKSCHED'
+SCHEDULE_VERSION = 1
+
+NFLDATE_FORMAT = '%Y-%m-%dT%H:%M:%S.000Z'
+VERSION_TYPES = ['condensed', 'coach', 'full']
+
+NULL = 0xffffffff  # string index of a missing value
+NO_POINTS = -1
+
+_header = struct.Struct('<8sHHIII')  # magic, version, reserved, strings, weeks, games
+
+# (name, struct format) of each column. Strings are indexes into the string
+# table.
+WEEK_COLUMNS = [
+    ('season', 'I'),
+    ('season_type', 'I'),
+    ('week', 'I'),
+    ('desc', 'I'),
+    ('first_game', 'I'),
+    ('game_count', 'I'),
+]
+GAME_COLUMNS = [
+    ('name', 'I'),
+    ('city', 'I'),
+    ('stadium', 'I'),
+    ('phase', 'I'),
+    ('start_time', 'q'),  # UNIX timestamp
+    ('home_name', 'I'),
+    ('home_abbr', 'I'),
+    ('home_city', 'I'),
+    ('home_points', 'i'),
+    ('away_name', 'I'),
+    ('away_abbr', 'I'),
+    ('away_city', 'I'),
+    ('away_points', 'i'),
+] + [('video_' + v, 'I') for v in VERSION_TYPES]
+
+
+class schedule_store(object):
+    """Read games from a schedule file, without loading it into memory.
+
+    A schedule file holds the weeks and games of any number of seasons in a
+    columnar layout: every string (team names, cities, stadiums, video ids,
+    etc) is stored once in a string table, and each game field is a
+    fixed-width column. The file is memory-mapped read-only, so several worker
+    processes opening the same file share its pages.
+
+    Parameters
+    ----------
+    path : str
+        A file written by ``schedule_store.write()``.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a schedule file of a supported version.
+
+    Note
+    ----
+    Start times are stored with second precision, and are returned in the
+    ``2017-09-10T17:00:00.000Z`` format.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, _, string_count, week_count, game_count = _header.unpack_from(self._mmap, 0)
+        except struct.error:
+            magic, version = None, None
+        if magic != SCHEDULE_MAGIC or version != SCHEDULE_VERSION:
+            self.close()
+            raise ValueError('{0} is not a supported schedule file'.format(path))
+
+        offset = _header.size
+        self._string_offsets = struct.unpack_from('<{0}I'.format(string_count + 1), self._mmap, offset)
+        offset += (string_count + 1) * 4
+        self._strings_start = offset
+        offset += self._string_offsets[-1]
+        self._strings = {}
+
+        self._game_count = game_count
+        self._game_columns = OrderedDict()
+        week_columns = OrderedDict()
+        for name, fmt in WEEK_COLUMNS:
+            week_columns[name] = struct.unpack_from('<{0}{1}'.format(week_count, fmt), self._mmap, offset)
+            offset += week_count * struct.calcsize(fmt)
+        for name, fmt in GAME_COLUMNS:
+            self._game_columns[name] = (offset, fmt)
+            offset += game_count * struct.calcsize(fmt)
+
+        # the week table is small, so it is read up front; games are only read
+        # when their week is requested
+        self._weeks = OrderedDict()
+        for i in range(week_count):
+            key = tuple(self._string(week_columns[c][i]) for c in ['season', 'season_type', 'week'])
+            self._weeks[key] = (self._string(week_columns['desc'][i]), week_columns['first_game'][i], week_columns['game_count'][i])
+
+
+    def __contains__(self, key):
+        """Whether the store holds the games of a ``(season, season_type,
+        week)``."""
+        season, season_type, week = key
+        return (str(season), season_type, str(week)) in self._weeks
+
+
+    def __len__(self):
+        return self._game_count
+
+
+    @property
+    def seasons(self):
+        """The seasons in the store.
+
+        Returns
+        -------
+        list
+            Sorted from most to least recent.
+        """
+        return sorted(set(k[0] for k in self._weeks), reverse=True)
+
+
+    def close(self):
+        """Unmap the file."""
+        self._mmap.close()
+
+
+    def weeks(self, season):
+        """Return the weeks of a season.
+
+        Parameters
+        ----------
+        season : str or int
+
+        Returns
+        -------
+        OrderedDict
+            Like ``data.get_weeks()``: with the keys ``pre``, ``reg``, and
+            ``post``, each an OrderedDict of week numbers and descriptions. None
+            if the season is not in the store.
+        """
+        season = str(season)
+        if season not in self.seasons:
+            return None
+
+        weeks = OrderedDict((st, OrderedDict()) for st in ['pre', 'reg', 'post'])
+        for s, st, w in self._weeks:
+            if s == season:
+                weeks.setdefault(st, OrderedDict())[w] = self._weeks[(s, st, w)][0]
+
+        return weeks
+
+
+    def games(self, season, season_type, week):
+        """Return the games of a week.
+
+        Parameters
+        ----------
+        season : str or int
+        season_type : str
+            ``pre``, ``reg``, or ``post``.
+        week : str or int
+
+        Returns
+        -------
+        OrderedDict
+            Like ``data.get_week_games()``: with the game name (e.g.
+            Packers@Bears) as the key and the game info as the value. None if
+            the week is not in the store.
+        """
+        try:
+            _, first, count = self._weeks[(str(season), season_type, str(week))]
+        except KeyError:
+            return None
+
+        columns = {}
+        for name in self._game_columns:
+            offset, fmt = self._game_columns[name]
+            size = struct.calcsize(fmt)
+            columns[name] = struct.unpack_from('<{0}{1}'.format(count, fmt), self._mmap, offset + first * size)
+
+        games = OrderedDict()
+        for i in range(count):
+            games[self._string(columns['name'][i])] = self._game_info(columns, i)
+
+        return games
+
+
+    @staticmethod
+    def write(path, weeks):
+        """Write a schedule file.
+
+        Parameters
+        ----------
+        path : str
+        weeks : iterable
+            Of ``(season, season_type, week, desc, games)`` tuples, where
+            ``games`` is an OrderedDict of game names and game infos (as
+            returned by ``data.get_week_games()``).
+
+        Returns
+        -------
+        int
+            The number of games written. Games which cannot be stored (such
+            as those without a valid start time) are skipped, with a warning.
+        """
+        strings = OrderedDict()
+
+        def string_index(s):
+            if s is None:
+                return NULL
+            return strings.setdefault(s, len(strings))
+
+        week_columns = OrderedDict((name, []) for name, _ in WEEK_COLUMNS)
+        game_columns = OrderedDict((name, []) for name, _ in GAME_COLUMNS)
+        game_count = 0
+
+        for season, season_type, week, desc, games in weeks:
+            rows = []
+            for g in games:
+                try:
+                    rows.append(schedule_store._row(g, games[g], string_index))
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.warning('schedule_store: skipping {0} ({1} {2} week {3}): {4}'.format(
+                        g, season, season_type, week, e))
+
+            for name, value in [('season', string_index(str(season))), ('season_type', string_index(season_type)),
+                                ('week', string_index(str(week))), ('desc', string_index(desc or '')),
+                                ('first_game', game_count), ('game_count', len(rows))]:
+                week_columns[name].append(value)
+
+            for row in rows:
+                for name in game_columns:
+                    game_columns[name].append(row[name])
+                game_count += 1
+
+        encoded = [s.encode('utf-8') for s in strings]
+        string_offsets = [0]
+        for s in encoded:
+            string_offsets.append(string_offsets[-1] + len(s))
+
+        parts = [
+            _header.pack(SCHEDULE_MAGIC, SCHEDULE_VERSION, 0, len(encoded), len(week_columns['season']), game_count),
+            struct.pack('<{0}I'.format(len(string_offsets)), *string_offsets),
+            b''.join(encoded),
+        ]
+        for columns, layout in [(week_columns, WEEK_COLUMNS), (game_columns, GAME_COLUMNS)]:
+            for name, fmt in layout:
+                parts.append(struct.pack('<{0}{1}'.format(len(columns[name]), fmt), *columns[name]))
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(b''.join(parts))
+
+        replace(tmp_path, path)
+
+        return game_count
+
+
+    @staticmethod
+    def _row(name, info, string_index):
+        """Return the columns of a game, from its game info.
+
+        Raises
+        ------
+        ValueError
+            If its start time is not a valid NFL date, or its points are not
+            numbers (KeyError or TypeError if a key is missing).
+        """
+        # the start time first, so nothing is added to the string table for a
+        # game which is then skipped
+        row = {'start_time': _nfldate_to_timestamp(info['start_time'])}
+        points = dict((side, info[side]['points']) for side in ['home', 'away'])
+        for side in points:
+            row[side + '_points'] = NO_POINTS if points[side] is None else int(points[side])
+
+        row['name'] = string_index(name)
+        row['city'] = string_index(info['city'])
+        row['stadium'] = string_index(info['stadium'])
+        row['phase'] = string_index(info['phase'])
+        for side in ['home', 'away']:
+            row[side + '_name'] = string_index(info[side]['name'])
+            row[side + '_abbr'] = string_index(info[side].get('abbr'))
+            row[side + '_city'] = string_index(info[side]['city'])
+        for v in VERSION_TYPES:
+            row['video_' + v] = string_index(info['versions'].get(v))
+
+        return row
+
+
+    def _string(self, index):
+        if index == NULL:
+            return None
+
+        try:
+            return self._strings[index]
+        except KeyError:
+            start = self._strings_start + self._string_offsets[index]
+            end = self._strings_start + self._string_offsets[index + 1]
+            value = self._strings[index] = self._mmap[start:end].decode('utf-8')
+            return value
+
+
+    def _game_info(self, columns, i):
+        """Rebuild a game info dict from row ``i`` of the read columns."""
+        def team(side):
+            info = {
+                'name': self._string(columns[side + '_name'][i]),
+                'abbr': self._string(columns[side + '_abbr'][i]),
+                'city': self._string(columns[side + '_city'][i]),
+                'points': None if columns[side + '_points'][i] == NO_POINTS else columns[side + '_points'][i],
+            }
+            return info
+
+        return {
+            'city': self._string(columns['city'][i]),
+            'stadium': self._string(columns['stadium'][i]),
+            'start_time': time.strftime(NFLDATE_FORMAT, time.gmtime(columns['start_time'][i])),
+            'phase': self._string(columns['phase'][i]),
+            'home': team('home'),
+            'away': team('away'),
+            'versions': dict(
+                (v, self._string(columns['video_' + v][i])) for v in VERSION_TYPES
+                if columns['video_' + v][i] != NULL
+            ),
+        }
+
+
+class schedule_index(object):
+    """An index of games by their UTC start time.
+
+    Games are added a week at a time, as weeks are populated (or refreshed);
+    adding a week again replaces its games. Queries are answered with a binary
+    search, without parsing any dates.
+
+    Note
+    ----
+    Only the games of weeks that have been added are known to the index.
+    """
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._entries = []  # sorted (start, season, season_type, week, name)
+        self._games = {}  # (season, season_type, week, name) -> game
+        self._weeks = {}  # (season, season_type, week) -> its entries
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def add_week(self, season, season_type, week, games):
+        """Add (or replace) the games of a week.
+
+        Parameters
+        ----------
+        season : str or int
+        season_type : str
+        week : str or int
+        games : OrderedDict
+            Of game names and ``game`` objects (e.g. ``week.games``).
+        """
+        week_key = (str(season), season_type, str(week))
+        entries = []
+        for name in games:
+            try:
+                start = _nfldate_to_timestamp(games[name].start_time)
+            except (KeyError, TypeError, ValueError):
+                self.logger.warn('schedule_index: {0} has no valid start time'.format(name))
+                continue
+            entries.append((start,) + week_key + (name,))
+
+        with self._lock:
+            for entry in self._weeks.pop(week_key, []):
+                i = bisect.bisect_left(self._entries, entry)
+                if i < len(self._entries) and self._entries[i] == entry:
+                    del self._entries[i]
+                del self._games[entry[1:]]
+
+            for entry in entries:
+                bisect.insort(self._entries, entry)
+                self._games[entry[1:]] = games[entry[-1]]
+            self._weeks[week_key] = entries
+
+
+    def between(self, start, end):
+        """Return the games starting in a time range.
+
+        Parameters
+        ----------
+        start : int or float
+            A UNIX timestamp (inclusive).
+        end : int or float
+            A UNIX timestamp (exclusive).
+
+        Returns
+        -------
+        list
+            Of ``game`` objects, sorted by start time.
+        """
+        with self._lock:
+            lo = bisect.bisect_left(self._entries, (start,))
+            hi = bisect.bisect_left(self._entries, (end,))
+            return [self._games[e[1:]] for e in self._entries[lo:hi]]
+
+
+    def live(self, now=None):
+        """Return the games being played.
+
+        A game is considered live from its start time until it is final, or
+        until ``settings.game_duration`` seconds have passed.
+
+        Parameters
+        ----------
+        now : int or float
+            A UNIX timestamp. Defaults to the current time.
+
+        Returns
+        -------
+        list
+            Of ``game`` objects, sorted by start time.
+        """
+        now = time.time() if now is None else now
+        games = self.between(now - settings.game_duration, now + 1)
+        return [g for g in games if not _is_final(g)]
+
+
+    def upcoming(self, hours=6, now=None):
+        """Return the games kicking off within a number of hours.
+
+        Parameters
+        ----------
+        hours : int or float
+        now : int or float
+            A UNIX timestamp. Defaults to the current time.
+
+        Returns
+        -------
+        list
+            Of ``game`` objects, sorted by start time.
+        """
+        now = time.time() if now is None else now
+        return self.between(now + 1, now + hours * 3600 + 1)
+
+
+    def recent(self, hours=24, now=None):
+        """Return the games that started within a number of hours, and are no
+        longer live.
+
+        Parameters
+        ----------
+        hours : int or float
+        now : int or float
+            A UNIX timestamp. Defaults to the current time.
+
+        Returns
+        -------
+        list
+            Of ``game`` objects, sorted by start time.
+        """
+        now = time.time() if now is None else now
+        live = self.live(now)
+        return [g for g in self.between(now - hours * 3600, now + 1) if g not in live]
+
+
+def _is_final(game_obj):
+    try:
+        return game_obj.phase.startswith('FINAL')
+    except (AttributeError, KeyError):
+        return False
+
+
+def _nfldate_to_timestamp(nfldate):
+    """Return the UNIX timestamp of an NFL Game Pass date string."""
+    dt = utils().nfldate_to_datetime(nfldate)
+    if dt is None:
+        raise ValueError('unable to parse the nfldate string {0!r}'.format(nfldate))
+
+    return calendar.timegm(dt.timetuple())
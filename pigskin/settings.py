@@ -1,3 +1,27 @@
 base_url = 'https://www.nflgamepass.com'
 gigya_auth_url = 'https://accounts.us1.gigya.com/accounts.login'
 user_agent = 'Firefox'
+stream_cache_ttl = 1800  # seconds a resolved stream URL is reused
+manifest_cache_ttl = 1800  # seconds a parsed HLS bitrate ladder is reused
+diva_config_ttl = 3600  # seconds a parsed DIVA config is reused
+snapshot_ttl = 900  # seconds snapshot data that may change (e.g. the current week) is reused
+snapshot_static_ttl = 86400  # seconds a snapshot's config, seasons, and shows are reused (past seasons: always)
+game_duration = 14400  # seconds after its start time a game is assumed to be over
+teams_ttl = 86400  # seconds the teams of the current season are reused; past seasons never expire
+rate_limit = 10  # requests per second to each host, on average
+rate_limit_burst = 20  # requests to each host allowed in a burst
+max_concurrency = 8  # concurrent requests to each host, at most
+breaker_failure_threshold = 5  # consecutive failures after which requests to an endpoint fail fast
+breaker_reset_timeout = 30  # seconds before a failing endpoint is probed again
+breaker_fallback_bytes = 8 * 1024 * 1024  # total size of the last good responses kept as fallbacks
+negative_cache_ttl = 60  # seconds a failed or empty lookup is remembered, rather than retried
+team_detail_ttl = 300  # seconds the games of a team_detail payload are reused
+pool_connections = 10  # hosts whose connections are pooled
+pool_maxsize = 16  # connections kept open to each host
+pool_block = False  # wait for a pooled connection, rather than open an extra one
+keep_alive = True  # reuse connections between requests
+compression = True  # ask for compressed responses
+transport_backend = 'requests'  # or 'httpx', which multiplexes requests over HTTP/2
+json_decoder = None  # orjson, ujson, or json; None picks the fastest installed
+json_shared_ttl = 60  # seconds a decoded JSON body is shared by every consumer of its URL
+xml_drain_bytes = 64 * 1024  # bytes of an XML body still read once parsing stops early, so its connection is reused
@@ -0,0 +1,264 @@
+"""
+Save and restore the populated state of a pigskin instance, so short-lived
+processes can start warm.
+"""
+import json
+import logging
+import time
+import zlib
+from collections import OrderedDict
+
+from . import settings
+from .files import replace
+
+SNAPSHOT_FORMAT = 'pigskin-snapshot'
+SNAPSHOT_VERSION = 1
+
+SEASON_TYPES = ['pre', 'reg', 'post']
+
+
+class snapshot(object):
+    """Serialize a pigskin instance's state to a compact, versioned file, and
+    restore it.
+
+    The file is zlib-compressed JSON. Everything that has been populated is
+    saved: the config, the current season and week, seasons, weeks, games,
+    teams (and their games), shows, and the stream cache.
+
+    On restore, entries that could have changed since the snapshot was taken
+    are dropped, so they are fetched again on first access. The weeks, games,
+    and teams of past seasons never go stale; once the list of seasons has
+    been fetched again, they are used for the seasons in it. The config,
+    seasons, shows, and the weeks of the current season are kept for
+    ``settings.snapshot_static_ttl`` seconds (along with the games of its past
+    weeks), and everything else for ``settings.snapshot_ttl`` seconds. Streams
+    are kept until they expire.
+    """
+    def __init__(self, pigskin_obj):
+        self._pigskin = pigskin_obj
+        self._store = self._pigskin._store
+        self.logger = logging.getLogger(__name__)
+
+
+    def save(self, path):
+        """Save the state to a file.
+
+        Parameters
+        ----------
+        path : str
+
+        Returns
+        -------
+        bool
+            True if successful, False otherwise.
+        """
+        data = self._dump()
+        blob = zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        tmp_path = path + '.tmp'
+
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(blob)
+            replace(tmp_path, path)
+        except (IOError, OSError):
+            self.logger.exception('unable to save the snapshot')
+            return False
+
+        return True
+
+
+    def read(self, path):
+        """Read a snapshot file.
+
+        Returns
+        -------
+        dict
+            The snapshot. None if it is missing, corrupt, or of another format
+            version.
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+        except (IOError, OSError):
+            return None
+        except (ValueError, zlib.error):
+            self.logger.error('snapshot: {0} is corrupt; ignoring'.format(path))
+            return None
+
+        if data.get('format') != SNAPSHOT_FORMAT or data.get('version') != SNAPSHOT_VERSION:
+            self.logger.info('snapshot: {0} is of an unsupported version; ignoring'.format(path))
+            return None
+
+        return data
+
+
+    def restore_config(self, data):
+        """Restore the config, if it is still fresh.
+
+        Returns
+        -------
+        bool
+            True if the config was restored.
+        """
+        if data.get('gp_config') and self._age(data) < settings.snapshot_static_ttl:
+            self._store.gp_config = data['gp_config']
+            return True
+
+        return False
+
+
+    def restore(self, data):
+        """Restore the object graph and stream cache from a snapshot.
+
+        Note
+        ----
+        The config is restored separately by ``restore_config()``, as it is
+        needed before anything else.
+        """
+        from .pigskin import game, season, show, team, week
+
+        gp = self._pigskin
+        age = self._age(data)
+        volatile = age < settings.snapshot_ttl
+        static = age < settings.snapshot_static_ttl
+
+        # the current week tells which data can no longer change
+        current = data.get('current')
+        if current and volatile:
+            gp._current = current
+
+        now = time.time()
+        for video_id, streams, expires in data.get('streams', []):
+            if expires > now:
+                self._store.stream_cache.set(video_id, streams, ttl=expires - now)
+
+        if data.get('shows') is not None and static:
+            gp._shows = OrderedDict((name, show(gp, info)) for name, info in data['shows'])
+            for name, show_seasons in data.get('show_seasons', []):
+                if name in gp._shows:
+                    gp._shows[name]._seasons = OrderedDict((s, '') for s in show_seasons)
+
+        if data.get('seasons') is None:
+            return
+
+        seasons = OrderedDict((s, season(gp, s)) for s in data['seasons'])
+        for s, season_data in data.get('season_data', []):
+            if s not in seasons:
+                continue
+            season_obj = seasons[s]
+            past_season = self._is_past(current, s)
+
+            if season_data.get('teams') is not None and (past_season or volatile):
+                season_obj._teams = OrderedDict((name, team(season_obj, info)) for name, info in season_data['teams'])
+                for name, games in season_data.get('team_games', []):
+                    if name in season_obj._teams and (past_season or volatile):
+                        season_obj._teams[name]._games = OrderedDict(
+                            (st, OrderedDict((g, game(season_obj._teams[name], info)) for g, info in st_games))
+                            for st, st_games in games
+                        )
+
+            if season_data.get('weeks') is None or not (past_season or static):
+                continue
+
+            season_obj._weeks = OrderedDict()
+            for st, weeks in season_data['weeks']:
+                season_obj._weeks[st] = OrderedDict()
+                for w, desc, games in weeks:
+                    week_obj = week(season_obj, st, w, desc)
+                    if games is not None and (volatile or self._is_past(current, s, st, w)):
+                        week_obj._games = OrderedDict((g, game(week_obj, info)) for g, info in games)
+                        gp._index.add_week(s, st, w, week_obj._games)
+                    season_obj._weeks[st][w] = week_obj
+
+        if static:
+            gp._seasons = seasons
+        else:
+            # a season may have been added since, but past ones are unchanged
+            gp._restored_seasons = OrderedDict((s, seasons[s]) for s in seasons if self._is_past(current, s))
+
+
+    def _dump(self):
+        """Return the state as a JSON-serializable dict."""
+        gp = self._pigskin
+        data = {
+            'format': SNAPSHOT_FORMAT,
+            'version': SNAPSHOT_VERSION,
+            'created': time.time(),
+            'gp_config': self._store.gp_config,
+            'current': gp._current,
+            'streams': [list(e) for e in self._store.stream_cache.items()],
+            'shows': None,
+            'show_seasons': [],
+            'seasons': None,
+            'season_data': [],
+        }
+
+        if gp._shows is not None:
+            data['shows'] = [(name, gp._shows[name]._show_info) for name in gp._shows]
+            data['show_seasons'] = [(name, list(gp._shows[name]._seasons)) for name in gp._shows if gp._shows[name]._seasons is not None]
+
+        if gp._seasons is None:
+            return data
+
+        data['seasons'] = list(gp._seasons)
+        for s in gp._seasons:
+            season_obj = gp._seasons[s]
+            season_data = {'teams': None, 'team_games': [], 'weeks': None}
+
+            if season_obj._teams is not None:
+                teams = season_obj._teams
+                season_data['teams'] = [(name, teams[name]._team_info) for name in teams]
+                season_data['team_games'] = [
+                    (name, [(st, [(g, teams[name]._games[st][g]._game_info) for g in teams[name]._games[st]]) for st in teams[name]._games])
+                    for name in teams if teams[name]._games is not None
+                ]
+
+            if season_obj._weeks is not None:
+                weeks = season_obj._weeks
+                season_data['weeks'] = [
+                    (st, [(w, weeks[st][w]._description, self._dump_week_games(weeks[st][w])) for w in weeks[st]])
+                    for st in weeks
+                ]
+
+            if season_data['teams'] is not None or season_data['weeks'] is not None:
+                data['season_data'].append((s, season_data))
+
+        return data
+
+
+    @staticmethod
+    def _dump_week_games(week_obj):
+        if week_obj._games is None:
+            return None
+
+        return [(g, week_obj._games[g]._game_info) for g in week_obj._games]
+
+
+    @staticmethod
+    def _age(data):
+        return time.time() - data.get('created', 0)
+
+
+    @staticmethod
+    def _is_past(current, season, season_type=None, week=None):
+        """Whether a season (or a week of it) is over, relative to the current
+        season and week.
+
+        Returns
+        -------
+        bool
+            False if the current season and week are unknown.
+        """
+        try:
+            if int(season) != int(current['season']):
+                return int(season) < int(current['season'])
+            if season_type is None:
+                return False
+
+            current_st = SEASON_TYPES.index(current['season_type'])
+            if SEASON_TYPES.index(season_type) != current_st:
+                return SEASON_TYPES.index(season_type) < current_st
+
+            return int(week) < int(current['week'])
+        except (KeyError, TypeError, ValueError):
+            return False
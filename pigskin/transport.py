@@ -0,0 +1,520 @@
+"""
+The HTTP transport of pigskin: connection pools, rate limiting, and circuit
+breakers, which may be shared by any number of ``pigskin`` instances.
+
+Requests are sent by a backend:
+
+``requests``
+    The default.
+``httpx``
+    Multiplexes requests to a host over HTTP/2 connections. Install it with
+    ``pip install pigskin[http2]``.
+``stub_backend``
+    Answers from canned responses, without any network; for tests and
+    benchmarks.
+
+Every backend's sessions offer the part of the ``requests.Session`` API that
+pigskin uses (``get()``, ``post()``, ``headers``, ``proxies``, and
+``cookies``), and their responses that of ``requests.Response``, so swapping
+backends changes no parsing code.
+"""
+import json
+import logging
+import threading
+import time
+try:
+    from urllib.parse import urlparse
+except ImportError:  # Python 2.7
+    from urlparse import urlparse
+
+import requests
+
+from . import settings
+from .breaker import circuit_breaker_adapter, circuit_breakers
+from .ratelimit import _retry_after, rate_limiter
+
+BACKENDS = ['requests', 'httpx']
+
+
+class transport(object):
+    """Connection pools, and the request layer around them, for HTTP sessions.
+
+    Every session created by (or mounted on) a transport sends its requests
+    through the same connection pools, rate limiter, and circuit breakers, so
+    many ``pigskin`` instances in one process reuse their TLS connections to
+    Game Pass, and are limited together.
+
+    Parameters
+    ----------
+    pool_connections : int
+        The number of hosts whose connections are pooled.
+    pool_maxsize : int
+        The maximum number of connections kept open to each host. This also
+        caps how many requests to a host can be in flight, unless
+        ``pool_block`` is False.
+    pool_block : bool
+        Whether to wait for a pooled connection when all are in use, rather
+        than open (and then discard) an extra one.
+    keep_alive : bool
+        Whether to keep connections open between requests.
+    compression : bool
+        Whether to ask for compressed responses. Brotli is asked for too, if
+        urllib3 can decode it.
+    backend : str or object
+        ``requests``, ``httpx``, or a backend instance (e.g. a
+        ``stub_backend``).
+
+    Note
+    ----
+    Sessions keep their own cookies and proxies; only the connections and the
+    request layer are shared.
+    """
+    def __init__(
+            self,
+            pool_connections=settings.pool_connections,
+            pool_maxsize=settings.pool_maxsize,
+            pool_block=settings.pool_block,
+            keep_alive=settings.keep_alive,
+            compression=settings.compression,
+            backend=settings.transport_backend,
+        ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.compression = compression
+        self.logger = logging.getLogger(__name__)
+
+        self.rate_limiter = rate_limiter(settings.rate_limit, settings.rate_limit_burst, settings.max_concurrency)
+        self.circuit_breakers = circuit_breakers(
+            settings.breaker_failure_threshold,
+            settings.breaker_reset_timeout,
+            settings.breaker_fallback_bytes,
+        )
+
+        if backend == 'requests':
+            backend = requests_backend(self)
+        elif backend == 'httpx':
+            backend = httpx_backend(self)
+        elif not hasattr(backend, 'session'):
+            raise ValueError('unknown transport backend: {0}'.format(backend))
+        self.backend = backend
+
+
+    def session(self, proxy_url=None):
+        """Return a new HTTP session which uses this transport.
+
+        Parameters
+        ----------
+        proxy_url : str
+            A proxy to send the session's requests through.
+
+        Returns
+        -------
+        requests.Session
+            Or a session of the backend, with the same interface.
+        """
+        s = self.backend.session(proxy_url)
+        s.headers['Accept-Encoding'] = self._accept_encoding()
+        if not self.keep_alive:
+            s.headers['Connection'] = 'close'
+
+        return s
+
+
+    def mount(self, s):
+        """Make an existing ``requests`` session use this transport.
+
+        Parameters
+        ----------
+        s : requests.Session
+
+        Returns
+        -------
+        requests.Session
+            ``s``, for convenience.
+
+        Raises
+        ------
+        ValueError
+            If the backend is not ``requests``.
+        """
+        if not isinstance(self.backend, requests_backend):
+            raise ValueError('only a requests backend can mount a requests session')
+
+        self.backend.mount(s)
+        s.headers['Accept-Encoding'] = self._accept_encoding()
+        if not self.keep_alive:
+            s.headers['Connection'] = 'close'
+
+        return s
+
+
+    def close(self):
+        """Close every pooled connection."""
+        self.backend.close()
+
+
+    def _accept_encoding(self):
+        if not self.compression:
+            return 'identity'
+
+        try:
+            from urllib3.response import brotli
+        except ImportError:
+            brotli = None
+
+        return 'gzip, deflate, br' if brotli is not None else 'gzip, deflate'
+
+
+class requests_backend(object):
+    """Send requests with ``requests``, through a shared adapter which applies
+    the transport's rate limiter and circuit breakers.
+
+    Parameters
+    ----------
+    transport_obj : transport
+    """
+    def __init__(self, transport_obj):
+        self.adapter = circuit_breaker_adapter(
+            transport_obj.rate_limiter,
+            transport_obj.circuit_breakers,
+            pool_connections=transport_obj.pool_connections,
+            pool_maxsize=transport_obj.pool_maxsize,
+            pool_block=transport_obj.pool_block,
+        )
+
+
+    def session(self, proxy_url=None):
+        s = self.mount(requests.Session())
+        s.proxies['http'] = proxy_url
+        s.proxies['https'] = proxy_url
+        return s
+
+
+    def mount(self, s):
+        for prefix in ['https://', 'http://']:
+            s.mount(prefix, self.adapter)
+        return s
+
+
+    def close(self):
+        self.adapter.close()
+
+
+class httpx_backend(object):
+    """Send requests with ``httpx``, multiplexed over HTTP/2 connections
+    where the server supports it.
+
+    Parameters
+    ----------
+    transport_obj : transport
+
+    Raises
+    ------
+    ImportError
+        If httpx is not installed.
+
+    Note
+    ----
+    HTTP/2 needs the ``h2`` package; without it, HTTP/1.1 is used.
+    """
+    def __init__(self, transport_obj):
+        import httpx
+
+        self._httpx = httpx
+        self._transport = transport_obj
+        self.logger = logging.getLogger(__name__)
+
+        self._pools = {}  # proxy_url -> a guarded httpx transport
+        self._lock = threading.Lock()
+
+
+    def session(self, proxy_url=None):
+        return httpx_session(self._httpx.Client(
+            transport=self._pool(proxy_url),
+            cookies=requests.cookies.RequestsCookieJar(),
+            follow_redirects=True,
+        ), proxy_url)
+
+
+    def close(self):
+        with self._lock:
+            for pool in self._pools.values():
+                pool.close_pool()
+            self._pools.clear()
+
+
+    def _pool(self, proxy_url):
+        """The connection pool shared by the sessions using a proxy (or
+        none)."""
+        with self._lock:
+            if proxy_url not in self._pools:
+                httpx = self._httpx
+                limits = httpx.Limits(
+                    max_connections=self._transport.pool_connections * self._transport.pool_maxsize,
+                    max_keepalive_connections=self._transport.pool_maxsize if self._transport.keep_alive else 0,
+                )
+                kwargs = {'limits': limits}
+                if proxy_url:
+                    kwargs['proxy'] = proxy_url
+
+                try:
+                    pool = httpx.HTTPTransport(http2=True, **kwargs)
+                except ImportError:
+                    self.logger.warn('httpx_backend: h2 is not installed; using HTTP/1.1')
+                    pool = httpx.HTTPTransport(**kwargs)
+
+                self._pools[proxy_url] = _guarded_httpx_transport(httpx, pool, self._transport)
+
+            return self._pools[proxy_url]
+
+
+def _guarded_httpx_transport(httpx, pool, transport_obj):
+    """Wrap an httpx transport with the rate limiter and circuit breakers of a
+    pigskin transport."""
+    class guarded_transport(httpx.BaseTransport):
+        def handle_request(self, request):
+            url = str(request.url)
+            host = urlparse(url).netloc
+            breakers = transport_obj.circuit_breakers
+            limiter = transport_obj.rate_limiter
+            endpoint = breakers.endpoint(url)
+
+            if not breakers[endpoint].allow():
+                body = breakers.stale(endpoint, request.method, url)
+                if body is not None:
+                    return httpx.Response(200, headers={'X-Pigskin-Stale': '1'}, content=body, request=request)
+                return httpx.Response(503, content=b'', request=request)
+
+            limiter.acquire(host)
+            start = time.time()
+            status = retry_after = None
+            try:
+                response = pool.handle_request(request)
+                response.read()
+                status = response.status_code
+                if status == 429 or status == 503:
+                    retry_after = _retry_after(response.headers.get('Retry-After'))
+            except Exception:
+                breakers.record(endpoint, False)
+                raise
+            finally:
+                limiter.release(host, status, time.time() - start, retry_after)
+
+            breakers.record(endpoint, status < 500)
+            if 200 <= status < 400:
+                breakers.keep(request.method, url, request.headers, response.headers, response.content)
+
+            return response
+
+        def close(self):
+            # the pool is shared by many clients; the backend closes it
+            pass
+
+        def close_pool(self):
+            pool.close()
+
+    return guarded_transport()
+
+
+class httpx_session(object):
+    """The ``requests.Session`` interface pigskin uses, over an
+    ``httpx.Client``.
+
+    Parameters
+    ----------
+    client : httpx.Client
+    proxy_url : str
+    """
+    def __init__(self, client, proxy_url=None):
+        self._client = client
+        self.headers = client.headers
+        self.proxies = {'http': proxy_url, 'https': proxy_url}
+
+
+    @property
+    def cookies(self):
+        """A ``requests.cookies.RequestsCookieJar``."""
+        return self._client.cookies.jar
+
+
+    def request(self, method, url, params=None, data=None, headers=None, timeout=None, **kwargs):
+        r = self._client.request(method, url, params=params, data=data, headers=headers, timeout=timeout)
+        return response(r.status_code, r.content, r.headers, str(r.url), r.reason_phrase)
+
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+
+    def post(self, url, data=None, **kwargs):
+        return self.request('POST', url, data=data, **kwargs)
+
+
+    def close(self):
+        self._client.close()
+
+
+class stub_backend(object):
+    """Answer requests from canned responses, without any network.
+
+    Parameters
+    ----------
+    responses : dict
+        With the URL as the key, and as the value: the body (``bytes``,
+        ``str``, or a ``dict`` or ``list``, which is encoded as JSON), a
+        ``(status_code, body)`` tuple, or a function called with ``(method,
+        url, data)`` which returns either.
+
+    Note
+    ----
+    Every request is recorded in ``requests``, as a ``(method, url)`` tuple.
+    Unknown URLs get a 404.
+    """
+    def __init__(self, responses=None):
+        self.responses = dict(responses or {})
+        self.requests = []
+        self._lock = threading.Lock()
+
+
+    def session(self, proxy_url=None):
+        return stub_session(self, proxy_url)
+
+
+    def close(self):
+        pass
+
+
+    def respond(self, method, url, data=None):
+        """Return the canned response to a request."""
+        with self._lock:
+            self.requests.append((method, url))
+
+        canned = self.responses.get(url)
+        if callable(canned):
+            canned = canned(method, url, data)
+        if canned is None:
+            return response(404, b'', {}, url, 'Not Found')
+
+        status, body = canned if isinstance(canned, tuple) else (200, canned)
+        headers = {}
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8')
+
+        return response(status, body, headers, url)
+
+
+class stub_session(object):
+    """The ``requests.Session`` interface pigskin uses, over a
+    ``stub_backend``."""
+    def __init__(self, backend, proxy_url=None):
+        self._backend = backend
+        self.headers = requests.structures.CaseInsensitiveDict()
+        self.proxies = {'http': proxy_url, 'https': proxy_url}
+        self.cookies = requests.cookies.RequestsCookieJar()
+
+
+    def request(self, method, url, params=None, data=None, **kwargs):
+        if params:
+            url = requests.Request(method, url, params=params).prepare().url
+        return self._backend.respond(method, url, data)
+
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+
+    def post(self, url, data=None, **kwargs):
+        return self.request('POST', url, data=data, **kwargs)
+
+
+    def close(self):
+        pass
+
+
+class response(object):
+    """The ``requests.Response`` interface pigskin uses, for backends other
+    than ``requests``.
+
+    Parameters
+    ----------
+    status_code : int
+    content : bytes
+    headers : dict
+    url : str
+    reason : str
+    """
+    def __init__(self, status_code, content, headers, url, reason=''):
+        self.status_code = status_code
+        self.content = content
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.url = url
+        self.reason = reason
+
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', 'replace')
+
+
+    def json(self, **kwargs):
+        """Decode the body as JSON.
+
+        Raises
+        ------
+        ValueError
+            If the body is not JSON.
+        """
+        return json.loads(self.text, **kwargs)
+
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+
+    def close(self):
+        pass
+
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.exceptions.HTTPError('{0} {1} for url: {2}'.format(self.status_code, self.reason, self.url), response=self)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_transport():
+    """Return the transport shared by every ``pigskin`` instance that was not
+    given one. It is created on first use, with the settings' defaults.
+
+    Returns
+    -------
+    transport
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = transport()
+        return _default
+
+
+def reset_default_transport():
+    """Forget the default transport, so the next ``default_transport()``
+    creates a new one (e.g. with changed settings, or with fresh rate limits
+    and circuit breakers). Instances already using the old one keep it.
+    """
+    global _default
+    with _default_lock:
+        _default = None
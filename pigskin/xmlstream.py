@@ -0,0 +1,126 @@
+"""
+Incremental parsing of XML response bodies, which stops reading a body as soon
+as what is wanted has been found in it.
+"""
+from . import settings
+
+CHUNK_SIZE = 4096
+
+
+class _chunk_reader(object):
+    """A file-like object over the body of a response, read one chunk at a
+    time."""
+    def __init__(self, r, chunk_size=CHUNK_SIZE):
+        self._chunks = r.iter_content(chunk_size)
+
+
+    def read(self, size=-1):
+        # iterparse keeps reading until it gets nothing, so a chunk at a time
+        # is enough, however much it asks for
+        for chunk in self._chunks:
+            if chunk:
+                return chunk
+        return b''
+
+
+    def release(self, r):
+        """Close the response. The rest of a short body is read and dropped,
+        so its connection goes back to the pool; a long one is closed with its
+        connection."""
+        drained = 0
+        for chunk in self._chunks:
+            drained += len(chunk)
+            if drained > settings.xml_drain_bytes:
+                break
+
+        r.close()
+
+
+def _iterparse(reader):
+    import defusedxml.ElementTree as ET
+
+    for _, elem in ET.iterparse(reader, events=('end',)):
+        yield elem
+
+
+def find_parameters(r, names):
+    """Return the values of the named ``<parameter>`` elements of an XML
+    response (such as a DIVA config).
+
+    Parameters
+    ----------
+    r : requests.Response
+        Preferably requested with ``stream=True``.
+    names : list
+        The ``name`` attributes of the parameters.
+
+    Returns
+    -------
+    dict
+        With the parameter name as the key, and its ``value`` attribute as
+        the value. Parameters which were not found are missing; of a repeated
+        parameter, the first is used.
+
+    Raises
+    ------
+    xml.etree.ElementTree.ParseError
+        If the body is not valid XML, up to the last parameter.
+
+    Note
+    ----
+    The body is read only until every parameter has been found.
+    """
+    wanted = set(names)
+    found = {}
+    reader = _chunk_reader(r)
+    try:
+        for elem in _iterparse(reader):
+            name = elem.get('name')
+            if elem.tag == 'parameter' and name in wanted and name not in found:
+                found[name] = elem.get('value')
+                if len(found) == len(wanted):
+                    break
+            elem.clear()
+    finally:
+        reader.release(r)
+
+    return found
+
+
+def find_video_sources(r):
+    """Return the ``<videoSource>`` entries of an Akamai video data XML
+    response.
+
+    Parameters
+    ----------
+    r : requests.Response
+        Preferably requested with ``stream=True``.
+
+    Returns
+    -------
+    list
+        Of ``(name, uri)`` tuples, in document order. Either is None if the
+        entry lacks it.
+
+    Raises
+    ------
+    xml.etree.ElementTree.ParseError
+        If the body is not valid XML, up to the end of ``<videoSources>``.
+
+    Note
+    ----
+    The body is read only until the end of ``<videoSources>``.
+    """
+    sources = []
+    reader = _chunk_reader(r)
+    try:
+        for elem in _iterparse(reader):
+            if elem.tag == 'videoSource':
+                sources.append((elem.get('name'), elem.findtext('uri')))
+                elem.clear()
+            elif elem.tag == 'videoSources':
+                break
+    finally:
+        reader.release(r)
+
+    return sources
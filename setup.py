@@ -46,6 +46,16 @@ setuptools.setup(
         'requests',
         'm3u8',
     ],
+    entry_points = {
+        'console_scripts': [
+            'pigskin-export = pigskin.export:main',
+        ],
+    },
+    extras_require = {
+        'analytics': ['numpy'],
+        'http2': ['httpx[http2]'],
+        'speedups': ['orjson'],
+    },
     tests_require = [
         'pyflakes',
         'pytest',
@@ -3,13 +3,29 @@ import pytest
 import json
 import re
 import socket
+import threading
 import vcr
 from hashlib import sha256
 from pigskin.pigskin import pigskin
+from pigskin.transport import reset_default_transport
 try:
     from urllib.parse import quote
 except ImportError:  # Python 2.7
     from urllib import quote
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:  # Python 2.7
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+
+@pytest.fixture(scope='class', autouse=True)
+def default_transport():
+    """Start every test class with a new default transport, so requests which
+    failed in one (e.g. missing from a cassette) cannot open the circuit
+    breakers of the next."""
+    reset_default_transport()
 
 
 @pytest.fixture(scope='class')
@@ -17,6 +33,70 @@ def gp():
     with vcr.use_cassette('public_API/europe_gp.yaml'):
         return pigskin()
 
+def build_hls_files(segment_count=6):
+    """A small VOD: a master manifest with two variants and their segments."""
+    files = {
+        '/vod/manifest.m3u8': (
+            '#EXTM3U\n'
+            '#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360,CODECS="avc1.4d401e,mp4a.40.2"\n'
+            'low/index.m3u8\n'
+            '#EXT-X-STREAM-INF:BANDWIDTH=3000000,RESOLUTION=1280x720,CODECS="avc1.4d401f,mp4a.40.2"\n'
+            'high/index.m3u8\n'
+        ),
+    }
+
+    for variant in ['low', 'high']:
+        playlist = '#EXTM3U\n#EXT-X-TARGETDURATION:4\n#EXT-X-MEDIA-SEQUENCE:0\n'
+        for i in range(segment_count):
+            playlist += '#EXTINF:4.0,\nseg{0}.ts\n'.format(i)
+            files['/vod/{0}/seg{1}.ts'.format(variant, i)] = '{0}-segment-{1};'.format(variant, i) * 100
+        playlist += '#EXT-X-ENDLIST\n'
+        files['/vod/{0}/index.m3u8'.format(variant)] = playlist
+
+    return dict((k, files[k].encode()) for k in files)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture()
+def hls_server():
+    """Serve ``build_hls_files()`` from a local HTTP server. The server
+    records every requested path in ``server.requested``."""
+    files = build_hls_files()
+    requested = []
+
+    class handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            requested.append(path)
+            if path not in files:
+                self.send_error(404)
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(files[path])))
+            self.end_headers()
+            self.wfile.write(files[path])
+
+        def log_message(self, *args):
+            pass
+
+    server = _ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.files = files
+    server.requested = requested
+    server.base_url = 'http://127.0.0.1:{0}'.format(server.server_address[1])
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
 pytest.gp_username = os.getenv('PIGSKIN_USER', '')
 pytest.gp_password = os.getenv('PIGSKIN_PASS', '')
 scrub_list = []
@@ -1,7 +1,18 @@
+import json
+import time
+from collections import OrderedDict
+
 import pytest
 import vcr
 
-from pigskin.pigskin import pigskin
+from pigskin import settings
+from pigskin.cache import ttl_cache
+from pigskin.pigskin import game, pigskin, season, week
+from pigskin.transport import response
+
+
+def json_response(url, data):
+    return response(200, json.dumps(data).encode(), {'Content-Type': 'application/json'}, url)
 
 
 @pytest.fixture(scope='class')
@@ -31,3 +42,136 @@ class TestEuropeData(object):
             games = gp._data._get_team_games_easy(t, season)
             assert games['reg']
             assert len(games['reg']) == 16
+
+
+def fake_games_list(week, team_count=32):
+    """The raw games of a week, where week ``n`` is missing ``n - 1`` games."""
+    return [{
+        'homeNickName': 'Home{0}'.format(i), 'homeTeamAbbr': 'H{0}'.format(i), 'homeCityState': 'City{0}'.format(i),
+        'visitorNickName': 'Away{0}'.format(i), 'visitorTeamAbbr': 'A{0}'.format(i), 'visitorCityState': 'City{0}'.format(i),
+    } for i in range(team_count // 2) if i >= int(week) - 1]
+
+
+class TestTeamRegistry(object):
+    @staticmethod
+    def test_scan(gp, monkeypatch):
+        fetched = []
+        monkeypatch.setattr(gp._data, '_fetch_games_list', lambda s, st, w: fetched.append(w) or fake_games_list(w))
+        monkeypatch.setattr(gp._store, 'team_registry', ttl_cache())
+        monkeypatch.setattr(gp, '_current', {'season': 2018, 'season_type': 'reg', 'week': '3'})
+
+        # week 2 has no more teams than week 1, but week 1 had them all
+        teams = gp._data.get_teams(2010)
+        assert len(teams) == 32
+        assert fetched == ['1']
+        assert teams['Home3'] == {'abbr': 'H3', 'city': 'City3', 'name': 'Home3'}
+
+        # cached permanently, as the season is over
+        assert gp._data.get_teams('2010') == teams
+        assert fetched == ['1']
+        assert gp._store.team_registry.items()[0][2] == float('inf')
+
+
+    @staticmethod
+    def test_scan_combines_weeks(gp, monkeypatch):
+        fetched = []
+
+        def fetch(s, st, w):
+            fetched.append(w)
+            games = fake_games_list(1)
+            return games[1:] if w == '1' else games[:1]
+
+        monkeypatch.setattr(gp._data, '_fetch_games_list', fetch)
+        monkeypatch.setattr(gp._store, 'team_registry', ttl_cache())
+
+        # no week has every team, but together they do
+        assert len(gp._data.get_teams(2017)) == 32
+        assert fetched == ['1', '2']
+
+
+    @staticmethod
+    def test_scan_partial(gp, monkeypatch):
+        # every week but the last fails, and it is missing a few games
+        monkeypatch.setattr(gp._data, '_fetch_games_list', lambda s, st, w: fake_games_list(4) if w == '17' else [])
+        monkeypatch.setattr(gp._store, 'team_registry', ttl_cache())
+
+        assert len(gp._data.get_teams(2010)) == 26
+
+        # the gaps are not kept for long, even for a past season
+        assert gp._store.team_registry.items()[0][2] <= time.time() + settings.negative_cache_ttl
+
+
+    @staticmethod
+    def test_crawled(gp, monkeypatch):
+        season_obj = season(gp, '2015')
+        week_obj = week(season_obj, 'reg', '1', '')
+        week_obj._games = OrderedDict()
+        for g in fake_games_list(1):
+            home = {'name': g['homeNickName'], 'abbr': g['homeTeamAbbr'], 'city': g['homeCityState'], 'points': None}
+            away = {'name': g['visitorNickName'], 'abbr': g['visitorTeamAbbr'], 'city': g['visitorCityState'], 'points': None}
+            week_obj._games[away['name'] + '@' + home['name']] = game(week_obj, {'home': home, 'away': away})
+        season_obj._weeks = OrderedDict([('reg', OrderedDict([('1', week_obj)]))])
+
+        monkeypatch.setattr(gp, '_seasons', OrderedDict([('2015', season_obj)]))
+        monkeypatch.setattr(gp._data, '_fetch_games_list', lambda *args: pytest.fail('scanned weeks'))
+        monkeypatch.setattr(gp._store, 'team_registry', ttl_cache())
+
+        assert len(gp._data.get_teams(2015)) == 32
+
+
+class TestTeamGames(object):
+    @staticmethod
+    def fake_paths(gp, monkeypatch):
+        calls = []
+        monkeypatch.setattr(gp._store, 'negative_cache', ttl_cache(60))
+        monkeypatch.setattr(gp._data, '_get_team_games_easy', lambda t, s: calls.append(('easy', s)) or OrderedDict())
+        monkeypatch.setattr(gp._data, '_get_team_games_hard', lambda t, s: calls.append(('hard', s)) or OrderedDict([('reg', {'Bears@Packers': {}})]))
+        return calls
+
+
+    @staticmethod
+    def test_routed_by_current_season(gp, monkeypatch):
+        calls = TestTeamGames.fake_paths(gp, monkeypatch)
+        monkeypatch.setattr(gp, '_current', {'season': 2018, 'season_type': 'reg', 'week': '3'})
+
+        assert list(gp._data.get_team_games('Bears', 2016)) == ['reg']
+        assert calls == [('hard', 2016)]
+
+        gp._data.get_team_games('Bears', '2018')
+        assert calls[1:] == [('easy', '2018'), ('hard', '2018')]
+
+
+    @staticmethod
+    def test_easy_unsupported_season(gp, monkeypatch):
+        calls = TestTeamGames.fake_paths(gp, monkeypatch)
+        monkeypatch.setattr(gp, '_current', None)
+
+        def fail():
+            raise AssertionError('the current season was fetched')
+
+        # the current season is not fetched just to route the request
+        monkeypatch.setattr(gp._data, 'get_current_season_and_week', fail)
+
+        for _ in range(2):
+            assert list(gp._data.get_team_games('Bears', 2016)) == ['reg']
+        assert calls == [('easy', 2016), ('hard', 2016), ('hard', 2016)]
+        assert gp._store.negative_cache.items()[0][2] <= time.time() + 60
+
+
+    @staticmethod
+    def test_team_detail_cached(gp, monkeypatch):
+        fetched = []
+        records = [
+            {'season': 2018, 'seasonType': st, 'gameDateTimeUtc': d, 'visitorNickName': 'Bears', 'homeNickName': h}
+            for st, d, h in [('REG', '2018-09-09', 'Packers'), ('PRE', '2018-08-09', 'Broncos')]
+        ]
+
+        body = {'modules': {'gamesCurrentSeason': {'content': records}}}
+        monkeypatch.setattr(gp._store.s, 'get', lambda url: fetched.append(url) or json_response(url, body))
+        monkeypatch.setattr(gp._store, 'team_detail_cache', ttl_cache(60))
+        monkeypatch.setattr(gp._data, '_extract_game_info', lambda g: g['gameDateTimeUtc'])
+
+        games = gp._data._get_team_games_easy('Bears', 2018)
+        assert games == OrderedDict([('pre', {'Bears@Broncos': '2018-08-09'}), ('reg', {'Bears@Packers': '2018-09-09'})])
+        assert gp._data._get_team_games_easy('Bears', 2017) == OrderedDict()
+        assert len(fetched) == 1
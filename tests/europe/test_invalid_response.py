@@ -2,6 +2,7 @@ import pytest
 import vcr
 import requests
 
+from pigskin.europe.routes import routes
 from pigskin.pigskin import pigskin
 from pigskin import settings
 
@@ -15,6 +16,7 @@ def gp():
 def set_all_config_urls(gp, junk_url):
     gp._store.gp_config['modules']['API'] = {key: junk_url for key in gp._store.gp_config['modules']['API']}
     gp._store.gp_config['modules']['ROUTES_DATA_PROVIDERS'] = {key: junk_url for key in gp._store.gp_config['modules']['ROUTES_DATA_PROVIDERS']}
+    gp._store.routes = routes(gp._store.gp_config)
 
 
 class TestInvalidResponseData(object):
@@ -0,0 +1,69 @@
+import pytest
+
+from pigskin.europe.routes import MAX_COMPILED, routes, url_template
+
+
+class TestUrlTemplate(object):
+    @staticmethod
+    def test_expand():
+        t = url_template('https://gp.invalid/games/:season/:seasonType/:week/list')
+        assert t.params == frozenset(['season', 'seasonType', 'week'])
+        assert t.expand(season=2017, seasonType='reg', week='3') == 'https://gp.invalid/games/2017/reg/3/list'
+
+        with pytest.raises(KeyError):
+            t.expand(season=2017, week=3)
+
+
+    @staticmethod
+    def test_optional_segment():
+        t = url_template('https://gp.invalid/network/:seasonSlug/:tvShowSlug/list')
+        assert t.expand(seasonSlug=None, tvShowSlug='total-access') == 'https://gp.invalid/network/total-access/list'
+        assert t.expand(seasonSlug='season-2017', tvShowSlug='total-access') == 'https://gp.invalid/network/season-2017/total-access/list'
+
+
+    @staticmethod
+    def test_braces():
+        t = url_template.compile('https://video.invalid/{V.ID}.xml')
+        assert t.expand(**{'V.ID': 'abc'}) == 'https://video.invalid/abc.xml'
+        assert url_template.compile('https://video.invalid/{V.ID}.xml') is t
+
+
+    @staticmethod
+    def test_compiled_bounded():
+        first = url_template.compile('https://gp.invalid/0')
+        for i in range(1, MAX_COMPILED + 1):
+            url_template.compile('https://gp.invalid/{0}'.format(i))
+
+        assert len(url_template._compiled) <= MAX_COMPILED
+        assert url_template.compile('https://gp.invalid/0') is not first
+        assert url_template.compile('https://gp.invalid/0') == first
+
+
+    @staticmethod
+    def test_matches():
+        t = url_template('https://gp.invalid/network/:seasonSlug/:tvShowSlug/list')
+        assert t.matches('https://gp.invalid/network/season-2017/total-access/list')
+        assert t.matches('https://gp.invalid/network/total-access/list?page=2')
+        assert not t.matches('https://gp.invalid/network/data')
+        assert not t.matches('https://gp.invalid/network/a/b/c/list')
+
+        assert url_template('https://video.invalid/{V.ID}').matches('https://video.invalid/abc')
+
+
+class TestRoutes(object):
+    @staticmethod
+    def test_config(gp):
+        r = gp._store.routes
+        assert 'games_detail' in r
+        assert r.url('games_detail', season='2017', seasonType='post', week=22).endswith('/2017/post/22/list')
+
+
+    @staticmethod
+    def test_missing(caplog):
+        r = routes({'modules': {'ROUTES_DATA_PROVIDERS': {'games': 'https://gp.invalid/games'}}})
+        assert r.url('games') == 'https://gp.invalid/games'
+
+        with pytest.raises(KeyError):
+            r.url('team_detail', team='bears')
+
+        assert 'ROUTES_DATA_PROVIDERS/team_detail is missing' in caplog.text
@@ -1,7 +1,11 @@
+import json
 import pytest
 import vcr
 
+from pigskin import settings
+from pigskin.europe.video import playback_context
 from pigskin.pigskin import pigskin
+from pigskin.transport import response
 
 
 @pytest.fixture(scope='class')
@@ -49,3 +53,55 @@ class TestEuropeVideoAuth(object):
         assert response
         for i in [video_id, vs_url, gp._store.access_token]:
             assert i in response
+
+
+class TestPlaybackContext(object):
+    @staticmethod
+    def test_payload():
+        context = playback_context('a_device_id', 'an_access_token', 'alice')
+        payload = json.loads(context.payload('a_video_id', 'https://host/"quoted".m3u8'))
+
+        assert payload == {
+            'AssetState': 3,
+            'Other': 'a_device_id|an_access_token|web|{0}|undefined|alice'.format(settings.user_agent),
+            'PlayerType': 'HTML5',
+            'Type': 1,
+            'User': '',
+            'VideoId': 'a_video_id',
+            'VideoKind': '',
+            'VideoSource': 'https://host/"quoted".m3u8',
+        }
+
+
+    @staticmethod
+    def test_rebuilt_on_new_tokens(gp):
+        gp._store.access_token, gp._store.username = 'first_token', 'alice'
+        first = json.loads(gp._video._build_processing_url_payload('video_1', 'vs_url'))
+        second = json.loads(gp._video._build_processing_url_payload('video_2', 'vs_url'))
+
+        # the device id is kept for the session
+        assert first['Other'] == second['Other']
+        assert second['VideoId'] == 'video_2'
+
+        gp._store.access_token = 'second_token'
+        third = json.loads(gp._video._build_processing_url_payload('video_1', 'vs_url'))
+
+        # only the token part changes; the device id is kept
+        assert third['Other'] == first['Other'].replace('first_token', 'second_token')
+
+
+class TestDivaStreams(object):
+    @staticmethod
+    def test_video_data_url(gp, monkeypatch):
+        # only {V.ID} is substituted; the rest of the URL is the server's
+        requested = []
+
+        def get(url, **kwargs):
+            requested.append(url)
+            return response(200, b'<video><videoSources /></video>', {}, url)
+
+        monkeypatch.setattr(gp._store.s, 'get', get)
+        diva_config = {'video_data_url': 'https://video.invalid/{V.ID}.xml?x=a:b&y={Z}', 'processing_url': 'https://video.invalid/open'}
+
+        assert gp._video._resolve_diva_streams('abc', diva_config) == {}
+        assert requested == ['https://video.invalid/abc.xml?x=a:b&y={Z}']
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+
+import pytest
+
+from pigskin.pigskin import season
+
+np = pytest.importorskip('numpy')
+from pigskin.analytics import schedule_stats  # noqa: E402
+
+
+# (season, week, away, home, away points, home points)
+SCORES = [
+    ('2016', '1', 'Bears', 'Packers', 10, 27),
+    ('2016', '1', 'Lions', 'Vikings', 20, 20),
+    ('2016', '2', 'Packers', 'Bears', 14, 17),
+    ('2016', '2', 'Vikings', 'Lions', 21, 3),
+    ('2017', '1', 'Packers', 'Bears', 24, 23),
+    ('2017', '2', 'Bears', 'Lions', None, None),
+]
+
+
+def fake_seasons(gp, monkeypatch):
+    def get_week_games(s, st, w):
+        games = OrderedDict()
+        for score in SCORES:
+            if score[:2] == (s, w):
+                games['{0}@{1}'.format(score[2], score[3])] = {
+                    'city': '', 'stadium': '', 'phase': 'FINAL',
+                    'start_time': '2016-09-11T17:00:00.000Z',
+                    'home': {'name': score[3], 'city': '', 'points': score[5]},
+                    'away': {'name': score[2], 'city': '', 'points': score[4]},
+                    'versions': {},
+                }
+        return games
+
+    monkeypatch.setattr(gp, '_seasons', OrderedDict((s, season(gp, s)) for s in ['2017', '2016']))
+    monkeypatch.setattr(gp, '_schedule_index', None)
+    monkeypatch.setattr(gp._data, 'get_weeks', lambda s: OrderedDict([('reg', OrderedDict([('1', ''), ('2', '')]))]))
+    monkeypatch.setattr(gp._data, 'get_week_games', get_week_games)
+
+
+class TestScheduleStats(object):
+    @staticmethod
+    def test_aggregates(gp, monkeypatch):
+        fake_seasons(gp, monkeypatch)
+        stats = schedule_stats(gp, ['2016', '2017'])
+
+        assert len(stats) == 6
+        assert stats.teams == ['Bears', 'Lions', 'Packers', 'Vikings']
+
+        season_2016 = stats.aggregates('2016')
+        assert season_2016['Bears'] == {
+            'games': 2, 'wins': 1, 'losses': 1, 'ties': 0,
+            'points_for': 27, 'points_against': 41, 'margin': -14,
+        }
+        assert season_2016['Vikings']['ties'] == 1
+
+        # unplayed games are left out
+        everything = stats.aggregates()
+        assert everything[('2017', 'Bears')]['games'] == 1
+        assert ('2017', 'Lions') not in everything
+        assert len(stats.games_of('Lions', 2017)) == 1
+
+
+    @staticmethod
+    def test_standings(gp, monkeypatch):
+        fake_seasons(gp, monkeypatch)
+        stats = schedule_stats(gp, ['2016'])
+
+        standings = stats.standings(2016)
+        assert [t for t, _ in standings] == ['Vikings', 'Packers', 'Bears', 'Lions']
+        assert standings[0][1]['win_pct'] == 0.75
+
+
+    @staticmethod
+    def test_head_to_head(gp, monkeypatch):
+        fake_seasons(gp, monkeypatch)
+        stats = schedule_stats(gp, ['2016', '2017'])
+
+        record = stats.head_to_head('Packers', 'Bears')
+        assert record['games'] == 3
+        assert (record['wins'], record['losses'], record['ties']) == (2, 1, 0)
+        assert (record['points_for'], record['points_against']) == (65, 50)
+        assert [g.home['name'] for g in record['matchups']] == ['Packers', 'Bears', 'Bears']
+
+        with pytest.raises(KeyError):
+            stats.head_to_head('Packers', 'Jets')
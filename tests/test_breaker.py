@@ -0,0 +1,131 @@
+import requests
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+
+from pigskin.breaker import circuit_breaker, circuit_breaker_adapter, circuit_breakers
+from pigskin.europe.routes import url_template
+from pigskin.ratelimit import rate_limiter
+
+
+class TestCircuitBreaker(object):
+    @staticmethod
+    def test_states(monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr('pigskin.breaker.time.time', lambda: now[0])
+        breaker = circuit_breaker(failure_threshold=2, reset_timeout=30)
+
+        assert breaker.allow()
+        breaker.record(False)
+        assert breaker.state == 'closed'
+        assert breaker.allow()
+        breaker.record(False)
+        assert breaker.state == 'open'
+        assert not breaker.allow()
+
+        # half-open: a single probe; a failed probe opens the breaker again
+        now[0] += 30
+        assert breaker.state == 'half_open'
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record(False)
+        assert breaker.state == 'open'
+
+        now[0] += 30
+        assert breaker.allow()
+        breaker.record(True)
+        assert breaker.state == 'closed'
+        assert breaker.stats() == {'state': 'closed', 'failures': 0, 'rejected': 2, 'served_stale': 0}
+
+
+def fake_send(statuses, sent):
+    def send(self, request, **kwargs):
+        sent.append(request.url)
+        status = statuses.pop(0)
+        if status is None:
+            raise requests.exceptions.ConnectionError('down')
+
+        response = Response()
+        response.status_code = status
+        response.headers['Content-Type'] = 'application/json'
+        response._content = b'{"week": 1}'
+        response.url = request.url
+        return response
+
+    return send
+
+
+class TestCircuitBreakerAdapter(object):
+    @staticmethod
+    def test_fallback(monkeypatch):
+        sent = []
+        monkeypatch.setattr(HTTPAdapter, 'send', fake_send([200, 500, None], sent))
+
+        breakers = circuit_breakers(failure_threshold=2, reset_timeout=60)
+        breakers.add_endpoint('api', url_template('https://api.invalid/:name'))
+        s = requests.Session()
+        s.mount('https://', circuit_breaker_adapter(rate_limiter(), breakers))
+
+        assert s.get('https://api.invalid/weeks').json() == {'week': 1}
+        assert s.get('https://api.invalid/weeks').status_code == 500
+        try:
+            s.get('https://api.invalid/weeks')
+            assert False, 'expected a ConnectionError'
+        except requests.exceptions.ConnectionError:
+            pass
+
+        # open: nothing more is sent; the last good response is served
+        r = s.get('https://api.invalid/weeks')
+        assert r.json() == {'week': 1}
+        assert r.headers['X-Pigskin-Stale'] == '1'
+
+        assert s.get('https://api.invalid/shows').status_code == 503
+        assert s.post('https://api.invalid/weeks').status_code == 503
+        assert len(sent) == 3
+
+        stats = breakers.stats()['api']
+        assert stats['state'] == 'open'
+        assert stats['rejected'] == 3
+        assert stats['served_stale'] == 1
+
+
+    @staticmethod
+    def test_endpoints(monkeypatch):
+        sent = []
+        monkeypatch.setattr(HTTPAdapter, 'send', fake_send([500, 500, 200], sent))
+
+        breakers = circuit_breakers(failure_threshold=2, reset_timeout=60)
+        breakers.add_endpoint('team_detail', url_template('https://api.invalid/teams/:team/videos'))
+        s = requests.Session()
+        s.mount('https://', circuit_breaker_adapter(rate_limiter(), breakers))
+
+        s.get('https://api.invalid/teams/bears/videos')
+        s.get('https://api.invalid/teams/lions/videos')
+        assert breakers['team_detail'].state == 'open'
+        assert s.get('https://api.invalid/teams/packers/videos').status_code == 503
+
+        # another endpoint of the same host is unaffected
+        assert s.get('https://api.invalid/config').status_code == 200
+        assert breakers.endpoint('https://api.invalid/config?x=1') == 'api.invalid/config'
+        assert len(sent) == 3
+
+
+    @staticmethod
+    def test_keep():
+        breakers = circuit_breakers()
+        json_headers = {'Content-Type': 'application/json'}
+
+        for request_headers in [{'Authorization': 'Bearer abc'}, {'Cookie': 'session=abc'}]:
+            breakers.keep('GET', 'https://api.invalid/account', request_headers, json_headers, b'{}')
+            assert breakers.stale('account', 'GET', 'https://api.invalid/account') is None
+
+        breakers.keep('GET', 'https://api.invalid/weeks', {}, json_headers, b'{}')
+        assert breakers.stale('weeks', 'GET', 'https://api.invalid/weeks') == b'{}'
+
+
+    @staticmethod
+    def test_metrics(gp):
+        assert isinstance(gp._store.s.get_adapter('https://api.invalid/'), circuit_breaker_adapter)
+        metrics = gp.metrics()
+        assert set(metrics) == set(['circuit_breakers', 'rate_limits'])
+        for host in metrics['circuit_breakers']:
+            assert metrics['circuit_breakers'][host]['state'] == 'closed'
@@ -1,6 +1,9 @@
 import pytest
 import vcr
 
+from pigskin.cache import ttl_cache
+from pigskin.pigskin import broadcast
+
 
 try:  # Python 2.7
     # requests's ``json()`` function returns strings as unicode (as per the
@@ -93,3 +96,20 @@ class TestBroadcastAuth(object):
 
 
     # TODO: test for nfl network not being on air
+
+
+class TestFailedStreams(object):
+    @staticmethod
+    def test_remembered(gp, monkeypatch):
+        fetched = []
+        monkeypatch.setattr(gp._store, 'negative_cache', ttl_cache(60))
+        monkeypatch.setattr(gp._video, 'get_broadcast_streams', lambda name: fetched.append(name))
+
+        rz = broadcast(gp, 'redzone')
+        assert rz.streams is None
+        assert rz.streams is None
+        assert fetched == ['redzone']
+
+        gp._store.negative_cache.clear()
+        assert rz.streams is None
+        assert fetched == ['redzone', 'redzone']
@@ -0,0 +1,69 @@
+import time
+
+from pigskin.cache import bytes_lru_cache, ttl_cache
+
+
+class TestTTLCache(object):
+    @staticmethod
+    def test_get_set():
+        cache = ttl_cache(ttl=60)
+
+        assert cache.get('missing') is None
+        assert cache.get('missing', 'default') == 'default'
+
+        cache.set('key', 'value')
+        assert cache.get('key') == 'value'
+        assert 'key' in cache
+        assert len(cache) == 1
+
+        cache.delete('key')
+        assert 'key' not in cache
+
+
+    @staticmethod
+    def test_expiry():
+        cache = ttl_cache(ttl=60)
+
+        cache.set('short', 'value', ttl=0.01)
+        cache.set('long', 'value')
+        time.sleep(0.02)
+
+        assert cache.get('short') is None
+        assert cache.get('long') == 'value'
+        assert len(cache) == 1
+
+        cache.clear()
+        assert len(cache) == 0
+
+
+class TestBytesLRUCache(object):
+    @staticmethod
+    def test_eviction():
+        cache = bytes_lru_cache(max_bytes=10)
+
+        cache.set('a', b'aaaa')
+        cache.set('b', b'bbbb')
+        assert cache.get('a') == b'aaaa'  # 'b' is now the least recently used
+
+        cache.set('c', b'cccc')
+        assert 'b' not in cache
+        assert cache.get('a') == b'aaaa'
+        assert cache.get('c') == b'cccc'
+        assert cache.size == 8
+
+        # too large to ever fit
+        assert not cache.set('d', b'd' * 11)
+
+
+    @staticmethod
+    def test_directory(tmpdir):
+        cache = bytes_lru_cache(max_bytes=10, directory=str(tmpdir.join('segments')))
+
+        cache.set('a', b'aaaa')
+        cache.set('b', b'bbbbbbbb')
+        assert 'a' not in cache
+        assert cache.get('b') == b'bbbbbbbb'
+        assert len(tmpdir.join('segments').listdir()) == 1
+
+        cache.clear()
+        assert len(tmpdir.join('segments').listdir()) == 0
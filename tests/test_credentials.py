@@ -0,0 +1,119 @@
+import json
+import os
+import time
+
+import pytest
+import vcr
+
+from pigskin.credentials import file_credential_store, memory_credential_store
+from pigskin.pigskin import pigskin
+
+
+def new_gp(credential_store):
+    with vcr.use_cassette('public_API/europe_gp.yaml'):
+        return pigskin(credential_store=credential_store)
+
+
+def fake_tokens(n):
+    return {'access_token': 'access-{0}'.format(n), 'refresh_token': 'refresh-{0}'.format(n), 'expires_in': 3600}
+
+
+class TestCredentialStore(object):
+    @staticmethod
+    def test_file_store(tmpdir):
+        path = str(tmpdir.join('credentials.json'))
+        store = file_credential_store(path)
+
+        assert store.load() is None
+
+        store.save({'username': 'user', 'refresh_token': 'secret'})
+        assert store.load() == {'username': 'user', 'refresh_token': 'secret'}
+        assert os.stat(path).st_mode & 0o077 == 0
+
+        with open(path, 'w') as f:
+            f.write('not json')
+        assert store.load() is None
+
+        store.clear()
+        assert not os.path.exists(path)
+
+
+    @staticmethod
+    def test_warm_start(monkeypatch):
+        store = memory_credential_store()
+        calls = []
+
+        gp = new_gp(store)
+        monkeypatch.setattr(gp._auth, '_gp_auth', lambda u, p: calls.append('_gp_auth') or {})
+        monkeypatch.setattr(gp._auth, '_gigya_auth', lambda u, p: calls.append('_gigya_auth') or fake_tokens(1))
+        monkeypatch.setattr(gp._auth, 'get_subscription', lambda: 'gp_pro')
+        gp._store.s.cookies.set('session', 'cookie', domain='.nflgamepass.com', path='/')
+
+        assert gp.login('user', 'pass')
+        assert calls == ['_gp_auth', '_gigya_auth']
+        assert gp.subscription == 'gp_pro'
+
+        saved = store.load()
+        assert saved['auth_method'] == '_gigya_auth'
+        assert saved['refresh_token'] == 'refresh-1'
+        assert saved['subscription'] == 'gp_pro'
+        assert saved['token_expiry'] > time.time()
+        assert json.dumps(saved)
+
+        # a new instance starts authenticated, without any auth requests
+        gp = new_gp(store)
+        monkeypatch.setattr(gp._auth, '_gp_auth', lambda u, p: pytest.fail('login should be skipped'))
+        assert gp._store.access_token == 'access-1'
+        assert gp._store.s.cookies.get('session') == 'cookie'
+        assert gp.subscription == 'gp_pro'
+        assert gp.login('user', 'pass')
+
+
+    @staticmethod
+    def test_expired_tokens(monkeypatch):
+        store = memory_credential_store()
+        store.save({
+            'username': 'user',
+            'access_token': 'access-1',
+            'refresh_token': 'refresh-1',
+            'token_expiry': time.time() - 10,
+            'auth_method': '_gigya_auth',
+            'subscription': 'gp_pro',
+        })
+
+        gp = new_gp(store)
+        monkeypatch.setattr(gp._auth, '_refresh_tokens', lambda: False)
+        calls = []
+        monkeypatch.setattr(gp._auth, '_gp_auth', lambda u, p: calls.append('_gp_auth') or fake_tokens(3))
+        monkeypatch.setattr(gp._auth, '_gigya_auth', lambda u, p: calls.append('_gigya_auth') or fake_tokens(2))
+
+        # the refresh fails, so a full login is needed; the method which
+        # worked last time is tried first
+        assert gp.login('user', 'pass')
+        assert calls == ['_gigya_auth']
+        assert store.load()['access_token'] == 'access-2'
+
+        # a different user never reuses the stored credentials
+        assert gp.login('someone_else', 'pass')
+        assert calls == ['_gigya_auth', '_gigya_auth']
+        assert store.load()['username'] == 'someone_else'
+
+
+    @staticmethod
+    def test_refresh_tokens_if_needed(monkeypatch):
+        gp = new_gp(None)
+        refreshed = []
+        monkeypatch.setattr(gp._auth, '_refresh_tokens', lambda: refreshed.append(1) or True)
+
+        gp._store.token_expiry = time.time() + 3600
+        assert gp._auth.refresh_tokens_if_needed()
+        assert not refreshed
+
+        gp._store.token_expiry = time.time() - 10
+        assert gp._auth.refresh_tokens_if_needed()
+        assert len(refreshed) == 1
+
+        # tokens of unknown age are refreshed, to be safe
+        gp._store.token_expiry = None
+        assert gp._auth.refresh_tokens_if_needed()
+        assert len(refreshed) == 2
@@ -0,0 +1,86 @@
+import copy
+
+import pytest
+import vcr
+
+from pigskin import settings
+from pigskin.decoder import DECODERS, _load_decoder, freeze, json_decoder
+from pigskin.pigskin import pigskin
+
+
+class TestJsonDecoder(object):
+    @staticmethod
+    @pytest.mark.parametrize('name', DECODERS)
+    def test_decode(name):
+        if _load_decoder(name) is None:
+            pytest.skip('{0} is not installed'.format(name))
+
+        decoder = json_decoder(name)
+        assert decoder.name == name
+        assert decoder.decode(b'{"season": 2017, "weeks": [1, 2], "desc": "\\u00e9"}') == {'season': 2017, 'weeks': [1, 2], 'desc': u'é'}
+
+        for invalid in [b'', b'<html>', b'{"season":']:
+            with pytest.raises(ValueError):
+                decoder.decode(invalid)
+
+
+    @staticmethod
+    def test_fastest():
+        installed = [n for n in DECODERS if _load_decoder(n) is not None]
+        assert json_decoder().name == installed[0]
+
+        with pytest.raises(ValueError):
+            json_decoder('simplejson')
+
+
+    @staticmethod
+    def test_shared(gp, monkeypatch):
+        fetched = []
+        body = b'{"modules": {"meta": {"currentContext": {"currentSeason": 2017, "currentSeasonType": "reg", "currentWeek": 8}}, "mainMenu": {"seasonStructureList": [{"season": 2017}, {"season": 2016}]}}}'
+
+        class response(object):
+            content = body
+
+        monkeypatch.setattr(gp._store.s, 'get', lambda url: fetched.append(url) or response())
+        monkeypatch.setattr(gp._store, 'json_decoder', json_decoder())
+
+        assert gp._data.get_current_season_and_week() == {'season': 2017, 'season_type': 'reg', 'week': '8'}
+        assert gp._data.get_seasons() == ['2017', '2016']
+        assert len(fetched) == 1
+
+        # the shared tree is read-only
+        tree = gp._store.json_decoder.shared.items()[0][1]
+        with pytest.raises(TypeError):
+            tree['modules']['meta'] = None
+
+
+    @staticmethod
+    def test_freeze():
+        tree = freeze({'weeks': [{'week': 1}], 'season': 2017})
+        assert tree == {'weeks': [{'week': 1}], 'season': 2017}
+
+        for modify in [
+            lambda: tree.update(season=2018),
+            lambda: tree.pop('season'),
+            lambda: tree['weeks'].append({'week': 2}),
+            lambda: tree['weeks'][0].__setitem__('week', 2),
+        ]:
+            with pytest.raises(TypeError):
+                modify()
+
+        # copies can be modified
+        mutable = copy.deepcopy(tree)
+        mutable['weeks'].append({'week': 2})
+        assert type(mutable) is dict
+        assert len(tree['weeks']) == 1
+
+
+    @staticmethod
+    def test_chosen(monkeypatch):
+        monkeypatch.setattr(settings, 'json_decoder', 'json')
+        with vcr.use_cassette('public_API/europe_gp.yaml'):
+            assert pigskin()._store.json_decoder.name == 'json'
+
+        decoder = json_decoder('json')
+        with vcr.use_cassette('public_API/europe_gp.yaml'):
+            assert pigskin(decoder=decoder)._store.json_decoder is decoder
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+
+class fake_version(object):
+    """Stands in for a ``version`` whose streams are already resolved."""
+    def __init__(self, stream_url):
+        self._video_id = 'this_is_a_video_id'
+        self.streams = {'hls': stream_url}
+
+
+class interrupted(Exception):
+    pass
+
+
+class TestDownload(object):
+    @staticmethod
+    def test_download(gp, hls_server, tmpdir):
+        version = fake_version(hls_server.base_url + '/vod/manifest.m3u8?token=abc|User-Agent=Firefox')
+        path = str(tmpdir.join('condensed.ts'))
+        expected = b''.join(hls_server.files['/vod/low/seg{0}.ts'.format(i)] for i in range(6))
+
+        stats = gp.download(version, path, bitrate=800, max_workers=3)
+
+        assert stats['segments'] == stats['segment_count'] == 6
+        assert stats['bytes'] == len(expected)
+        assert stats['throughput'] > 0
+        with open(path, 'rb') as f:
+            assert f.read() == expected
+        assert not os.path.exists(path + '.checkpoint')
+
+        # slow segments do not back off the CDN
+        assert gp._store.rate_limiter._hosts[hls_server.base_url.split('//')[1]][1].latency_factor is None
+
+
+    @staticmethod
+    def test_resume(gp, hls_server, tmpdir):
+        version = fake_version(hls_server.base_url + '/vod/manifest.m3u8?token=resume')
+        path = str(tmpdir.join('coach.ts'))
+        segments = [hls_server.files['/vod/high/seg{0}.ts'.format(i)] for i in range(6)]
+
+        def interrupt(stats):
+            if stats['segments'] == 2:
+                raise interrupted()
+
+        # the highest bitrate is the default
+        with pytest.raises(interrupted):
+            gp.download(version, path, progress=interrupt)
+        assert os.path.exists(path + '.checkpoint')
+
+        stats = gp.download(version, path)
+        assert stats['segments'] == 6
+        assert stats['bytes'] == len(b''.join(segments[2:]))
+        with open(path, 'rb') as f:
+            assert f.read() == b''.join(segments)
+
+
+    @staticmethod
+    def test_unknown_bitrate(gp, hls_server, tmpdir):
+        version = fake_version(hls_server.base_url + '/vod/manifest.m3u8')
+
+        assert gp.download(version, str(tmpdir.join('x.ts')), bitrate=1) is None
+
+
+    @staticmethod
+    def test_init_section(gp, hls_server, tmpdir):
+        hls_server.files['/vod/low/init.mp4'] = b'init-section;'
+        hls_server.files['/vod/low/index.m3u8'] = hls_server.files['/vod/low/index.m3u8'].replace(
+            b'#EXT-X-MEDIA-SEQUENCE:0\n', b'#EXT-X-MEDIA-SEQUENCE:0\n#EXT-X-MAP:URI="init.mp4"\n')
+        version = fake_version(hls_server.base_url + '/vod/manifest.m3u8?token=fmp4')
+        path = str(tmpdir.join('condensed.mp4'))
+
+        stats = gp.download(version, path, bitrate=800)
+
+        assert stats['segment_count'] == 7
+        with open(path, 'rb') as f:
+            assert f.read() == b'init-section;' + b''.join(hls_server.files['/vod/low/seg{0}.ts'.format(i)] for i in range(6))
+
+
+    @staticmethod
+    def test_encrypted(gp, hls_server, tmpdir):
+        hls_server.files['/vod/low/index.m3u8'] = hls_server.files['/vod/low/index.m3u8'].replace(
+            b'#EXT-X-MEDIA-SEQUENCE:0\n', b'#EXT-X-MEDIA-SEQUENCE:0\n#EXT-X-KEY:METHOD=AES-128,URI="key.bin"\n')
+        version = fake_version(hls_server.base_url + '/vod/manifest.m3u8?token=encrypted')
+        path = str(tmpdir.join('condensed.ts'))
+
+        assert gp.download(version, path, bitrate=800) is None
+        assert not os.path.exists(path)
+        assert '/vod/low/seg0.ts' not in hls_server.requested
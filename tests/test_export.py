@@ -0,0 +1,140 @@
+import csv
+import json
+import os
+from collections import OrderedDict
+
+from pigskin.export import exporter, main
+from pigskin.pigskin import season
+
+
+def fake_schedule(gp, monkeypatch, fail=(), missing=(), current='2'):
+    """Two seasons of two weeks of two games each, during week ``current`` of
+    the 2017 regular season. Fetching a week in ``fail`` raises; one in
+    ``missing`` returns None."""
+    def get_week_games(s, st, w):
+        if (s, w) in fail:
+            raise IOError('connection reset')
+        if (s, w) in missing:
+            return None
+
+        return OrderedDict(('Away{0}{1}{2}@Home{0}'.format(s, w, i), {
+            'city': 'City', 'stadium': 'Stadium', 'phase': 'FINAL',
+            'start_time': '{0}-09-1{1}T17:00:00.000Z'.format(s, w),
+            'home': {'name': 'Home{0}'.format(i), 'abbr': 'H{0}'.format(i), 'city': 'City', 'points': 21},
+            'away': {'name': 'Away{0}'.format(i), 'abbr': 'A{0}'.format(i), 'city': 'City', 'points': 14},
+            'versions': {'full': 'full-{0}-{1}-{2}'.format(s, w, i)},
+        }) for i in range(2))
+
+    monkeypatch.setattr(gp, '_current', {'season': 2017, 'season_type': 'reg', 'week': current})
+    monkeypatch.setattr(gp, '_seasons', OrderedDict((s, season(gp, s)) for s in ['2017', '2016']))
+    monkeypatch.setattr(gp._data, 'get_weeks', lambda s: OrderedDict([
+        ('pre', OrderedDict()),
+        ('reg', OrderedDict([('1', ''), ('2', '')])),
+    ]))
+    monkeypatch.setattr(gp._data, 'get_week_games', get_week_games)
+
+
+class TestExport(object):
+    @staticmethod
+    def test_games_jsonl(gp, monkeypatch, tmpdir):
+        fake_schedule(gp, monkeypatch)
+        path = str(tmpdir.join('games.jsonl'))
+
+        assert exporter(gp, 'games', max_workers=3).export(path) == 8
+
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        assert [(r['season'], r['week']) for r in rows[::2]] == [('2017', '1'), ('2017', '2'), ('2016', '1'), ('2016', '2')]
+        assert rows[0]['home'] == 'Home0'
+        assert rows[0]['video_full'] == 'full-2017-1-0'
+        assert not os.path.exists(path + '.checkpoint')
+
+        # the games were not kept on the week objects
+        assert gp.seasons['2017'].weeks['reg']['1']._games is None
+
+
+    @staticmethod
+    def test_resume(gp, monkeypatch, tmpdir):
+        path = str(tmpdir.join('games.csv'))
+
+        fake_schedule(gp, monkeypatch, fail=[('2016', '1')])
+        assert exporter(gp, 'games', 'csv').export(path, season_types=['reg']) == 4
+        assert os.path.exists(path + '.checkpoint')
+
+        fake_schedule(gp, monkeypatch)
+        assert exporter(gp, 'games', 'csv').export(path, season_types=['reg']) == 4
+
+        with open(path) as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 8
+        assert len(set(r['game'] for r in rows)) == 8
+        assert not os.path.exists(path + '.checkpoint')
+
+
+    @staticmethod
+    def test_missing_week(gp, monkeypatch, tmpdir):
+        path = str(tmpdir.join('games.jsonl'))
+
+        fake_schedule(gp, monkeypatch, missing=[('2017', '2')])
+        assert exporter(gp, 'games', retries=1).export(path, seasons=['2017']) == 2
+        with open(path + '.checkpoint') as f:
+            assert json.load(f)['done'] == ['games/2017/reg/1']
+
+        fake_schedule(gp, monkeypatch)
+        assert exporter(gp, 'games').export(path, seasons=['2017']) == 2
+        assert not os.path.exists(path + '.checkpoint')
+
+
+    @staticmethod
+    def test_future_weeks(gp, monkeypatch, tmpdir):
+        path = str(tmpdir.join('games.jsonl'))
+
+        # the next week has no schedule yet; it does not stop the export
+        fake_schedule(gp, monkeypatch, missing=[('2017', '2')], current='1')
+        assert exporter(gp, 'games').export(path) == 6
+        assert not os.path.exists(path + '.checkpoint')
+
+
+    @staticmethod
+    def test_csv_quoting(gp, monkeypatch, tmpdir):
+        fake_schedule(gp, monkeypatch)
+        monkeypatch.setattr(gp._data, 'get_shows', lambda: OrderedDict([
+            ('Show', {'name': 'Show', 'slug': 'show', 'desc': u'two\r\nlines, and \u00e9'}),
+        ]))
+        monkeypatch.setattr(gp, '_shows', None)
+        path = str(tmpdir.join('shows.csv'))
+
+        assert exporter(gp, 'shows', 'csv').export(path) == 1
+
+        with open(path, 'rb') as f:
+            assert f.read().decode('utf-8') == u'name,slug,desc\nShow,show,"two\r\nlines, and \u00e9"\n'
+
+
+    @staticmethod
+    def test_resume_other_seasons(gp, monkeypatch, tmpdir):
+        path = str(tmpdir.join('games.jsonl'))
+
+        fake_schedule(gp, monkeypatch, fail=[('2017', '2')])
+        assert exporter(gp, 'games').export(path, seasons=['2017']) == 2
+
+        # a checkpoint of another plan is not resumed
+        fake_schedule(gp, monkeypatch)
+        assert exporter(gp, 'games').export(path, seasons=['2016']) == 4
+        with open(path) as f:
+            assert set(json.loads(line)['season'] for line in f) == set(['2016'])
+
+
+    @staticmethod
+    def test_main(gp, monkeypatch, tmpdir):
+        fake_schedule(gp, monkeypatch)
+        monkeypatch.setattr('pigskin.pigskin.pigskin', lambda proxy_url=None: gp)
+        path = str(tmpdir.join('weeks.jsonl'))
+
+        assert main(['weeks', '-o', path, '--seasons', '2016']) == 0
+
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        assert rows == [
+            {'season': '2016', 'season_type': 'reg', 'week': '1', 'desc': ''},
+            {'season': '2016', 'season_type': 'reg', 'week': '2', 'desc': ''},
+        ]
@@ -0,0 +1,75 @@
+from collections import OrderedDict
+
+from pigskin.hls import split_stream_url, variant_url
+
+
+class TestHLS(object):
+    @staticmethod
+    def test_split_stream_url():
+        url, headers = split_stream_url('https://cdn.invalid/manifest.m3u8?hdnts=abc|Connection=keep-alive&User-Agent=Firefox')
+
+        assert url == 'https://cdn.invalid/manifest.m3u8?hdnts=abc'
+        assert headers == {'Connection': 'keep-alive', 'User-Agent': 'Firefox'}
+
+        assert split_stream_url('https://cdn.invalid/a.m3u8') == ('https://cdn.invalid/a.m3u8', {})
+
+
+    @staticmethod
+    def test_variant_url():
+        manifest_url = 'https://cdn.invalid/vod/manifest.m3u8?hdnts=abc'
+
+        assert variant_url(manifest_url, 'low/index.m3u8') == 'https://cdn.invalid/vod/low/index.m3u8?hdnts=abc'
+        assert variant_url(manifest_url, 'https://other.invalid/a.m3u8') == 'https://other.invalid/a.m3u8?hdnts=abc'
+        assert variant_url('https://cdn.invalid/vod/master.m3u8', 'seg0.ts') == 'https://cdn.invalid/vod/seg0.ts'
+
+
+    @staticmethod
+    def test_m3u8_to_dict(gp, hls_server):
+        manifest_url = hls_server.base_url + '/vod/manifest.m3u8?token=abc'
+        streams = gp.m3u8_to_dict(manifest_url)
+
+        assert sorted(streams) == [800, 3000]
+        assert streams[800].startswith(hls_server.base_url + '/vod/low/index.m3u8?token=abc|')
+        assert 'User-Agent=' in streams[800]
+
+
+    @staticmethod
+    def test_m3u8_ladder(gp, hls_server):
+        manifest_url = hls_server.base_url + '/vod/manifest.m3u8?token=ladder'
+        ladder = gp.m3u8_ladder(manifest_url, fetch_variants=True)
+
+        assert type(ladder) is OrderedDict
+        assert list(ladder) == [800, 3000]
+
+        low = ladder[800]
+        assert low['bandwidth'] == 800000
+        assert low['resolution'] == (640, 360)
+        assert low['codecs'] == 'avc1.4d401e,mp4a.40.2'
+        assert low['target_duration'] == 4
+        assert low['segment_count'] == 6
+        assert ladder[3000]['resolution'] == (1280, 720)
+
+        # the ladder is cached per manifest; nothing is fetched again
+        requested = len(hls_server.requested)
+        assert gp.m3u8_ladder(manifest_url + '|User-Agent=Firefox', fetch_variants=True) is ladder
+        assert len(hls_server.requested) == requested
+
+
+    @staticmethod
+    def test_m3u8_ladder_shared(gp, hls_server):
+        # a ladder already handed out is not filled in behind its holder's back
+        manifest_url = hls_server.base_url + '/vod/manifest.m3u8?token=shared'
+        ladder = gp.m3u8_ladder(manifest_url)
+        assert ladder[800]['segment_count'] is None
+
+        full = gp.m3u8_ladder(manifest_url, fetch_variants=True)
+        assert full is not ladder
+        assert full[800]['segment_count'] == 6
+        assert ladder[800]['segment_count'] is None
+        assert gp.m3u8_ladder(manifest_url) is full
+
+
+    @staticmethod
+    def test_m3u8_ladder_failure(gp, hls_server):
+        assert gp.m3u8_ladder(hls_server.base_url + '/does/not/exist.m3u8') is None
+        assert gp.m3u8_to_dict(hls_server.base_url + '/does/not/exist.m3u8') is None
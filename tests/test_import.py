@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+
+def imported_modules(code):
+    """The modules imported by running ``code`` in a fresh interpreter."""
+    output = subprocess.check_output([sys.executable, '-c', code + '\nimport sys\nprint("\\n".join(sys.modules))'])
+    return output.decode().split()
+
+
+class TestImport(object):
+    @staticmethod
+    def test_lazy_imports():
+        modules = imported_modules('import pigskin.pigskin')
+
+        assert 'pigskin.europe.data' in modules
+        for lazy in ['defusedxml', 'm3u8', 'uuid', 'pigskin.europe.auth', 'pigskin.europe.video', 'pigskin.hls']:
+            assert lazy not in modules
+
+
+    @staticmethod
+    def test_imported_on_first_use(gp):
+        assert gp._video
+        assert gp._hls
+        assert gp._video is gp._video
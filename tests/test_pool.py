@@ -0,0 +1,77 @@
+import pytest
+
+from pigskin.pool import session_pool
+
+
+def fake_login(handle, monkeypatch):
+    tokens = {'access_token': 'access-' + handle.username, 'refresh_token': 'refresh-' + handle.username}
+    monkeypatch.setattr(handle._auth, '_gp_auth', lambda u, p: tokens)
+    monkeypatch.setattr(handle._auth, 'get_subscription', lambda: 'gp_pro')
+
+
+@pytest.fixture()
+def pool(gp, monkeypatch):
+    pool = session_pool(gp)
+    for username in ['alice', 'bob']:
+        pool.add_account(username, 'secret')
+        fake_login(pool._sessions[username], monkeypatch)
+
+    return pool
+
+
+class TestSessionPool(object):
+    @staticmethod
+    def test_shared_state(gp, pool):
+        alice = pool._sessions['alice']
+        bob = pool._sessions['bob']
+
+        assert pool.accounts == ['alice', 'bob']
+
+        # public data is shared, account state is not
+        for handle in [alice, bob]:
+            assert handle._store.gp_config is gp._store.gp_config
+            assert handle._store.diva_config_cache is gp._store.diva_config_cache
+            assert handle._store.s.get_adapter('https://') is gp._store.s.get_adapter('https://')
+            assert handle._store.s is not gp._store.s
+        assert alice._store.stream_cache is not bob._store.stream_cache
+
+
+    @staticmethod
+    def test_checkout(gp, pool):
+        with pool.checkout() as first:
+            assert first.username == 'alice'
+            assert first._store.access_token == 'access-alice'
+            assert first.subscription == 'gp_pro'
+
+            # the username ends up in the processing payload
+            assert 'alice' in first._video._build_processing_url_payload('video_id', 'vs_url')
+
+            with pool.checkout() as second:
+                assert second.username == 'bob'
+
+                # every account is checked out
+                assert pool.acquire(timeout=0.01) is None
+
+        # accounts are handed out round-robin
+        with pool.checkout() as third:
+            assert third.username == 'alice'
+
+        with pool.checkout('alice') as handle:
+            assert handle.username == 'alice'
+            assert pool.acquire('alice', timeout=0.01) is None
+
+        assert gp._store.access_token is None
+
+
+    @staticmethod
+    def test_failed_login(gp, monkeypatch):
+        pool = session_pool(gp, max_checkouts=2)
+        pool.add_account('mallory', 'wrong')
+        handle = pool._sessions['mallory']
+        monkeypatch.setattr(handle._auth, '_gp_auth', lambda u, p: {})
+        monkeypatch.setattr(handle._auth, '_gigya_auth', lambda u, p: {})
+
+        with pool.checkout('mallory') as h:
+            assert h is None
+
+        assert pool._checkouts['mallory'] == 0
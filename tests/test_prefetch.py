@@ -0,0 +1,49 @@
+from collections import OrderedDict
+
+from pigskin.prefetch import prefetcher
+
+
+def fake_week_games():
+    games = OrderedDict()
+    for i, start_time in enumerate(['2017-10-29T17:00:00.000Z', '2017-10-29T20:25:00.000Z', '2017-10-30T00:30:00.000Z']):
+        games['Away{0}@Home{0}'.format(i)] = {
+            'start_time': start_time,
+            'versions': {'condensed': 'condensed-{0}'.format(i), 'full': 'full-{0}'.format(i)},
+        }
+
+    # a game which has not been played yet
+    games['Future@Game'] = {'start_time': '2017-10-31T00:30:00.000Z', 'versions': {}}
+
+    return games
+
+
+class TestPrefetcher(object):
+    @staticmethod
+    def test_run_once(gp, monkeypatch):
+        resolved = []
+
+        def fake_diva_streams(video_id, diva_config, formats=None):
+            resolved.append(video_id)
+            return {'hls': 'https://stream.invalid/{0}.m3u8'.format(video_id)}
+
+        monkeypatch.setattr(gp._data, 'get_current_season_and_week', lambda: {'season': '2017', 'season_type': 'reg', 'week': '8'})
+        monkeypatch.setattr(gp._data, 'get_week_games', lambda season, season_type, week: fake_week_games())
+        monkeypatch.setattr(gp._video, '_resolve_diva_streams', fake_diva_streams)
+        monkeypatch.setattr(gp._video, '_get_diva_config', lambda url: {})
+        monkeypatch.setattr(gp._auth, 'refresh_tokens_if_needed', lambda: True)
+        gp._store.stream_cache.clear()
+
+        p = prefetcher(gp, max_workers=2, max_games=2)
+        assert p.run_once() == 4
+
+        # only the two most recent games are resolved, and land in the cache
+        assert sorted(resolved) == ['condensed-1', 'condensed-2', 'full-1', 'full-2']
+        assert gp._video.get_game_streams('full-2')['hls'].endswith('full-2.m3u8')
+        assert len(resolved) == 4
+
+        # already cached streams are not resolved again
+        assert p.run_once() == 2
+        assert sorted(resolved[4:]) == ['condensed-0', 'full-0']
+        assert p.run_once() == 0
+
+        gp._store.stream_cache.clear()
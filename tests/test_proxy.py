@@ -0,0 +1,97 @@
+import base64
+import time
+
+import requests
+
+import pigskin.proxy
+
+
+class TestHLSProxy(object):
+    @staticmethod
+    def test_playlists(gp, hls_server):
+        proxy = gp.start_hls_proxy(prefetch=2)
+        try:
+            stream = hls_server.base_url + '/vod/manifest.m3u8?token=abc|User-Agent=Firefox'
+            master = requests.get(proxy.url_for(stream)).text
+
+            # every variant is rewritten to point at the proxy
+            variants = [l for l in master.splitlines() if not l.startswith('#')]
+            assert len(variants) == 2
+            for v in variants:
+                assert v.startswith(proxy.base_url + '/playlist/')
+
+            playlist = requests.get(variants[0]).text
+            segments = [l for l in playlist.splitlines() if not l.startswith('#')]
+            assert len(segments) == 6
+            assert '#EXT-X-ENDLIST' in playlist
+
+            # segments are served unmodified
+            r = requests.get(segments[0])
+            assert r.content == hls_server.files['/vod/low/seg0.ts']
+
+            # and the following segments are buffered ahead of the player
+            for _ in range(50):
+                if all(s in hls_server.requested for s in ['/vod/low/seg1.ts', '/vod/low/seg2.ts']):
+                    break
+                time.sleep(0.05)
+            assert '/vod/low/seg1.ts' in hls_server.requested
+            assert '/vod/low/seg2.ts' in hls_server.requested
+            assert '/vod/low/seg3.ts' not in hls_server.requested
+
+            # a buffered segment is served without going back to the CDN
+            requested = len(hls_server.requested)
+            assert requests.get(segments[1]).content == hls_server.files['/vod/low/seg1.ts']
+            assert hls_server.requested[requested:].count('/vod/low/seg1.ts') == 0
+        finally:
+            gp.stop_hls_proxy()
+
+
+    @staticmethod
+    def test_bad_requests(gp, hls_server):
+        proxy = gp.start_hls_proxy()
+        try:
+            assert requests.get(proxy.base_url + '/nope').status_code == 404
+            assert requests.get(proxy.url_for(hls_server.base_url + '/missing.m3u8')).status_code == 502
+        finally:
+            gp.stop_hls_proxy()
+
+
+    @staticmethod
+    def test_foreign_tokens(gp, hls_server):
+        proxy = gp.start_hls_proxy()
+        try:
+            # a URL the proxy did not issue is never fetched
+            stream = hls_server.base_url + '/vod/manifest.m3u8'
+            token = base64.urlsafe_b64encode(stream.encode('utf-8')).decode('ascii')
+            assert requests.get(proxy.base_url + '/playlist/' + token).status_code == 404
+
+            forged = proxy.url_for(stream).replace(token, base64.urlsafe_b64encode(b'http://example.invalid/').decode('ascii'))
+            assert requests.get(forged).status_code == 404
+            assert hls_server.requested == []
+        finally:
+            gp.stop_hls_proxy()
+
+
+    @staticmethod
+    def test_iframe_playlists(gp, hls_server):
+        hls_server.files['/vod/manifest.m3u8'] += b'#EXT-X-I-FRAME-STREAM-INF:BANDWIDTH=100000,URI="low/iframes.m3u8"\n'
+        proxy = gp.start_hls_proxy()
+        try:
+            master = requests.get(proxy.url_for(hls_server.base_url + '/vod/manifest.m3u8')).text
+            iframes = [l for l in master.splitlines() if l.startswith('#EXT-X-I-FRAME-STREAM-INF:')]
+            assert len(iframes) == 1
+            assert 'URI="{0}/playlist/'.format(proxy.base_url) in iframes[0]
+        finally:
+            gp.stop_hls_proxy()
+
+
+    @staticmethod
+    def test_bounded(gp, hls_server, monkeypatch):
+        monkeypatch.setattr(pigskin.proxy, 'MAX_SEGMENTS', 4)
+        proxy = gp.start_hls_proxy()
+        try:
+            for variant in ['low', 'high']:
+                requests.get(proxy.url_for('{0}/vod/{1}/index.m3u8'.format(hls_server.base_url, variant)))
+            assert len(proxy._next_segments) == 4
+        finally:
+            gp.stop_hls_proxy()
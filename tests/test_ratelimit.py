@@ -0,0 +1,103 @@
+import time
+
+from pigskin.ratelimit import adaptive_limit, rate_limited_adapter, rate_limiter, token_bucket
+
+
+class TestTokenBucket(object):
+    @staticmethod
+    def test_burst_then_rate():
+        bucket = token_bucket(rate=50, burst=3)
+
+        start = time.time()
+        for _ in range(3):
+            bucket.acquire()
+        assert time.time() - start < 0.05
+
+        # the bucket is empty; the next token takes 1/rate seconds
+        bucket.acquire()
+        assert time.time() - start >= 0.015
+
+
+    @staticmethod
+    def test_pause():
+        bucket = token_bucket(rate=1000, burst=10)
+        bucket.pause(0.05)
+
+        start = time.time()
+        bucket.acquire()
+        assert time.time() - start >= 0.04
+
+
+class TestAdaptiveLimit(object):
+    @staticmethod
+    def test_aimd():
+        limit = adaptive_limit(initial=4, minimum=1, maximum=6)
+
+        def request(status, latency=0.1):
+            limit.acquire()
+            limit.release(status, latency)
+
+        for _ in range(5):
+            request(200)
+        assert limit.limit == 5
+
+        request(429)
+        assert limit.limit == 2
+        request(503)
+        request(None)
+        assert limit.limit == 1
+
+        for _ in range(100):
+            request(200)
+        assert limit.limit == 6
+
+        # a response much slower than usual backs off too
+        request(200, latency=1)
+        assert limit.limit == 3
+        assert limit.in_flight == 0
+
+
+class TestRateLimiter(object):
+    @staticmethod
+    def test_hosts_are_independent():
+        limiter = rate_limiter(rate=10, burst=2, max_concurrency=4, initial_concurrency=2)
+        limiter.acquire('a.invalid')
+        limiter.acquire('a.invalid')
+
+        assert limiter.stats('a.invalid')['in_flight'] == 2
+        assert limiter.stats('b.invalid') == {'tokens': 2, 'limit': 2, 'in_flight': 0}
+
+        limiter.release('a.invalid', 500, 0.1)
+        assert limiter.stats('a.invalid')['limit'] == 1
+
+
+    @staticmethod
+    def test_streaming_hosts():
+        limiter = rate_limiter(rate=100, burst=100, max_concurrency=4, initial_concurrency=4)
+
+        def request(host, status, latency):
+            limiter.acquire(host)
+            limiter.release(host, status, latency)
+
+        for host in ['api.invalid', 'cdn.invalid']:
+            request(host, 200, 0.1)
+        limiter.add_streaming_host('cdn.invalid')
+        limiter.add_streaming_host('new-cdn.invalid')
+        request('new-cdn.invalid', 200, 0.1)
+
+        # a slow segment does not back off a CDN; errors still do
+        for host in ['api.invalid', 'cdn.invalid', 'new-cdn.invalid']:
+            request(host, 200, 5)
+        assert limiter.stats('api.invalid')['limit'] == 2
+        assert limiter.stats('cdn.invalid')['limit'] == 4
+        assert limiter.stats('new-cdn.invalid')['limit'] == 4
+
+        request('cdn.invalid', 503, 0.1)
+        assert limiter.stats('cdn.invalid')['limit'] == 2
+
+
+    @staticmethod
+    def test_session_adapter(gp):
+        adapter = gp._store.s.get_adapter('https://api.invalid/')
+        assert isinstance(adapter, rate_limited_adapter)
+        assert adapter.limiter is gp._store.rate_limiter
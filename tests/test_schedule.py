@@ -0,0 +1,173 @@
+from collections import OrderedDict
+
+import pytest
+
+from pigskin.pigskin import game, season
+from pigskin.pigskin import week as week_cls
+from pigskin.schedule import schedule_index, schedule_store
+
+
+def fake_game(name, points=True, versions=('condensed', 'full')):
+    away, home = name.split('@')
+    return {
+        'city': 'Green Bay, WI',
+        'stadium': 'Lambeau Field',
+        'start_time': '2016-09-11T17:00:00.000Z',
+        'phase': 'FINAL',
+        'home': {'name': home, 'abbr': home[:3].upper(), 'city': 'Green Bay', 'points': 27 if points else None},
+        'away': {'name': away, 'abbr': None, 'city': 'Chicago', 'points': 10 if points else None},
+        'versions': dict((v, '{0}-{1}'.format(name, v)) for v in versions),
+    }
+
+
+def fake_weeks():
+    return [
+        ('2016', 'reg', '1', '', OrderedDict([
+            ('Bears@Packers', fake_game('Bears@Packers')),
+            ('Lions@Vikings', fake_game('Lions@Vikings', points=False, versions=())),
+        ])),
+        ('2016', 'reg', '2', '', OrderedDict([('Packers@Bears', fake_game('Packers@Bears'))])),
+        ('2016', 'post', '22', 'Super Bowl', OrderedDict([('Falcons@Patriots', fake_game('Falcons@Patriots'))])),
+        ('2015', 'reg', '1', '', OrderedDict()),
+    ]
+
+
+class TestScheduleStore(object):
+    @staticmethod
+    def test_roundtrip(tmpdir):
+        path = str(tmpdir.join('schedule'))
+        assert schedule_store.write(path, fake_weeks()) == 4
+
+        store = schedule_store(path)
+        assert len(store) == 4
+        assert store.seasons == ['2016', '2015']
+        assert ('2016', 'reg', 1) in store
+        assert (2016, 'reg', '3') not in store
+
+        for season, season_type, week, desc, games in fake_weeks():
+            assert store.games(season, season_type, week) == games
+
+        weeks = store.weeks(2016)
+        assert list(weeks['reg']) == ['1', '2']
+        assert weeks['post'] == OrderedDict([('22', 'Super Bowl')])
+        assert store.weeks(2014) is None
+        assert store.games(2016, 'pre', 1) is None
+
+        store.close()
+
+
+    @staticmethod
+    def test_invalid_games(tmpdir):
+        bad_time, bad_points = fake_game('Bears@Packers'), fake_game('Lions@Vikings')
+        bad_time['start_time'] = 'TBD'
+        bad_points['home']['points'] = 'n/a'
+        weeks = [('2016', 'reg', '1', '', OrderedDict([
+            ('Bears@Packers', bad_time),
+            ('Lions@Vikings', bad_points),
+            ('Packers@Bears', fake_game('Packers@Bears')),
+        ]))]
+
+        path = str(tmpdir.join('schedule'))
+        assert schedule_store.write(path, weeks) == 1
+
+        store = schedule_store(path)
+        assert list(store.games('2016', 'reg', '1')) == ['Packers@Bears']
+        store.close()
+
+
+    @staticmethod
+    def test_invalid_file(tmpdir):
+        path = str(tmpdir.join('schedule'))
+        with open(path, 'wb') as f:
+            f.write(b'not a schedule file')
+
+        with pytest.raises(ValueError):
+            schedule_store(path)
+
+
+    @staticmethod
+    def test_week_games(tmpdir, gp, monkeypatch):
+        path = str(tmpdir.join('schedule'))
+        schedule_store.write(path, fake_weeks())
+        monkeypatch.setattr(gp, '_schedule', None)
+        assert gp.load_schedule(path)
+
+        def fail(*args):
+            raise AssertionError('fetched from the network')
+
+        monkeypatch.setattr(gp._data, 'get_weeks', fail)
+        monkeypatch.setattr(gp._data, 'get_week_games', fail)
+        monkeypatch.setattr(gp, '_seasons', None)
+        monkeypatch.setattr(gp._data, 'get_seasons', lambda: ['2016', '2015'])
+
+        games = gp.seasons['2016'].weeks['reg']['1'].games
+        assert list(games) == ['Bears@Packers', 'Lions@Vikings']
+        assert games['Bears@Packers'].home == {'name': 'Packers', 'abbr': 'PAC', 'city': 'Green Bay', 'points': 27}
+        assert games['Bears@Packers'].away['abbr'] is None
+        assert games['Lions@Vikings'].versions == {}
+
+        copy_path = str(tmpdir.join('copy'))
+        assert gp.save_schedule(copy_path, ['2016']) == 4
+        assert schedule_store(copy_path).games('2016', 'post', '22') == fake_weeks()[2][4]
+
+
+def fake_week(gp, week, kickoffs):
+    """A week of games kicking off at the given ``(name, start_time, phase)``."""
+    week_obj = week_cls(season(gp, '2016'), 'reg', week, '')
+    week_obj._games = OrderedDict()
+    for name, start_time, phase in kickoffs:
+        info = fake_game(name)
+        info['start_time'] = start_time
+        info['phase'] = phase
+        week_obj._games[name] = game(week_obj, info)
+
+    return week_obj
+
+
+# 2016-09-11T17:00:00Z
+NOW = 1473613200
+
+
+def names(games):
+    return ['{0}@{1}'.format(g.away['name'], g.home['name']) for g in games]
+
+
+class TestScheduleIndex(object):
+    @staticmethod
+    def test_queries(gp):
+        week_obj = fake_week(gp, '1', [
+            ('Bears@Packers', '2016-09-11T17:00:00.000Z', 'INGAME'),
+            ('Lions@Vikings', '2016-09-11T13:00:00.000Z', 'FINAL'),
+            ('Giants@Cowboys', '2016-09-11T20:25:00.000Z', 'PREGAME'),
+            ('Rams@49ers', '2016-09-12 23:10:00Z', 'PREGAME'),
+        ])
+        index = schedule_index()
+        index.add_week('2016', 'reg', '1', week_obj.games)
+
+        assert len(index) == 4
+        assert names(index.live(NOW)) == ['Bears@Packers']
+        assert names(index.upcoming(6, NOW)) == ['Giants@Cowboys']
+        assert names(index.upcoming(48, NOW)) == ['Giants@Cowboys', 'Rams@49ers']
+        assert names(index.recent(24, NOW)) == ['Lions@Vikings']
+        assert names(index.between(NOW - 86400, NOW + 86400 * 2)) == ['Lions@Vikings', 'Bears@Packers', 'Giants@Cowboys', 'Rams@49ers']
+
+        # refreshing a week replaces its games
+        week_obj = fake_week(gp, '1', [('Bears@Packers', '2016-09-11T17:00:00.000Z', 'FINAL')])
+        index.add_week(2016, 'reg', 1, week_obj.games)
+        assert len(index) == 1
+        assert index.live(NOW) == []
+        assert index.recent(24, NOW) == [week_obj.games['Bears@Packers']]
+
+
+    @staticmethod
+    def test_live_games(gp, monkeypatch):
+        week_obj = fake_week(gp, '2', [('Bears@Packers', '2016-09-11T17:00:00.000Z', 'INGAME')])
+        monkeypatch.setattr(gp, '_current', {'season': 2016, 'season_type': 'reg', 'week': '2'})
+        monkeypatch.setattr(gp, '_seasons', OrderedDict([('2016', season(gp, '2016'))]))
+        monkeypatch.setattr(gp, '_schedule_index', None)
+        monkeypatch.setattr(gp._data, 'get_week_games', lambda *args: OrderedDict((g, week_obj._games[g]._game_info) for g in week_obj._games))
+        gp._seasons['2016']._weeks = OrderedDict([('reg', OrderedDict([('2', week_cls(gp._seasons['2016'], 'reg', '2', ''))]))])
+
+        assert names(gp.live_games(NOW)) == ['Bears@Packers']
+        assert gp.upcoming_games(now=NOW) == []
+        assert gp.recent_games(now=NOW) == []
@@ -77,3 +77,19 @@ class TestShow(object):
                 # make sure it's sorted high to low
                 assert int(prev) > int(s)
                 prev = s
+
+
+    @vcr.use_cassette('public_API/europe_show_seasons.yaml')
+    @staticmethod
+    def test_iter_episodes(gp):
+        episodes = list(gp.iter_episodes('Hard Knocks'))
+
+        # make sure we have content and it's the right type
+        assert episodes
+
+        for e in episodes:
+            assert isinstance(e.title, basestring)
+            assert e.title
+            assert e.video_id
+            assert e.season is None or 2000 < int(e.season) < 2050
+            assert e.duration is None or e.duration > 0
@@ -0,0 +1,126 @@
+import json
+import zlib
+from collections import OrderedDict
+
+import vcr
+
+from pigskin import settings
+from pigskin.pigskin import game, pigskin, season, week
+
+
+def fake_game(name):
+    home, away = name.split('@')
+    return {
+        'city': 'Somewhere',
+        'stadium': 'Some Field',
+        'start_time': '2017-09-10T17:00:00.000Z',
+        'phase': 'FINAL',
+        'home': {'name': home, 'city': 'Home City', 'points': 21},
+        'away': {'name': away, 'city': 'Away City', 'points': 17},
+        'versions': {'full': 'video-' + name},
+    }
+
+
+def populate(gp):
+    """Populate an instance as if it had been browsed, without the network."""
+    gp._current = {'season': 2017, 'season_type': 'reg', 'week': 2}
+    gp._seasons = OrderedDict((s, season(gp, s)) for s in [2017, 2016])
+
+    s = gp._seasons[2017]
+    s._weeks = OrderedDict([('pre', OrderedDict()), ('reg', OrderedDict()), ('post', OrderedDict())])
+    for w, name in [(1, 'Bears@Packers'), (2, 'Vikings@Lions')]:
+        week_obj = week(s, 'reg', w, '')
+        week_obj._games = OrderedDict([(name, game(week_obj, fake_game(name)))])
+        s._weeks['reg'][w] = week_obj
+
+    s = gp._seasons[2016]
+    week_obj = week(s, 'post', 22, 'Super Bowl')
+    week_obj._games = OrderedDict([('Falcons@Patriots', game(week_obj, fake_game('Falcons@Patriots')))])
+    s._weeks = OrderedDict([('post', OrderedDict([(22, week_obj)]))])
+
+    gp._store.stream_cache.set('video-Bears@Packers', {'hls': 'http://cdn/manifest.m3u8'})
+
+
+def new_gp(path):
+    with vcr.use_cassette('public_API/europe_gp.yaml'):
+        return pigskin(snapshot_path=path)
+
+
+def age_snapshot(path, seconds):
+    with open(path, 'rb') as f:
+        data = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+    data['created'] -= seconds
+    with open(path, 'wb') as f:
+        f.write(zlib.compress(json.dumps(data).encode('utf-8')))
+
+
+class TestSnapshot(object):
+    @staticmethod
+    def test_roundtrip(tmpdir, monkeypatch):
+        path = str(tmpdir.join('snapshot'))
+        gp = new_gp(path)
+        populate(gp)
+        assert gp.save_snapshot()
+
+        # the config comes from the snapshot; nothing is fetched
+        monkeypatch.setattr(pigskin, '_populate_config', lambda self: None)
+        warm = pigskin(snapshot_path=path)
+        monkeypatch.setattr(warm._data, 'get_week_games', lambda *args: {})
+
+        assert warm._store.gp_config == gp._store.gp_config
+        assert warm.current == gp.current
+        assert list(warm.seasons) == [2017, 2016]
+
+        games = warm.seasons[2017].weeks['reg'][2].games
+        assert list(games) == ['Vikings@Lions']
+        assert games['Vikings@Lions'].home['name'] == 'Vikings'
+        assert warm._store.stream_cache.get('video-Bears@Packers') == {'hls': 'http://cdn/manifest.m3u8'}
+
+
+    @staticmethod
+    def test_stale_entries(tmpdir, monkeypatch):
+        path = str(tmpdir.join('snapshot'))
+        gp = new_gp(path)
+        populate(gp)
+        assert gp.save_snapshot()
+        age_snapshot(path, settings.snapshot_ttl + 1)
+
+        monkeypatch.setattr(pigskin, '_populate_config', lambda self: None)
+        warm = pigskin(snapshot_path=path)
+
+        # the current week must be revalidated, but past weeks are kept
+        assert warm._current is None
+        weeks = warm.seasons[2017].weeks['reg']
+        assert weeks[2]._games is None
+        assert list(weeks[1]._games) == ['Bears@Packers']
+
+
+    @staticmethod
+    def test_past_seasons(tmpdir, monkeypatch):
+        path = str(tmpdir.join('snapshot'))
+        gp = new_gp(path)
+        populate(gp)
+        assert gp.save_snapshot()
+        age_snapshot(path, settings.snapshot_static_ttl + 1)
+
+        monkeypatch.setattr(pigskin, '_populate_config', lambda self: None)
+        warm = pigskin(snapshot_path=path)
+        monkeypatch.setattr(warm._data, 'get_seasons', lambda: [2018, 2017, 2016])
+
+        # the seasons are fetched again, but the past one is kept
+        assert warm._seasons is None
+        assert list(warm.seasons) == [2018, 2017, 2016]
+        assert warm.seasons[2017]._weeks is None
+        games = warm.seasons[2016].weeks['post'][22]._games
+        assert list(games) == ['Falcons@Patriots']
+
+
+    @staticmethod
+    def test_invalid(tmpdir):
+        path = str(tmpdir.join('snapshot'))
+        with open(path, 'wb') as f:
+            f.write(b'not a snapshot')
+
+        gp = new_gp(path)
+        assert gp._store.gp_config
+        assert gp._seasons is None
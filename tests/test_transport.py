@@ -0,0 +1,107 @@
+import pytest
+import requests
+import vcr
+
+from pigskin.pigskin import pigskin
+from pigskin.transport import default_transport, reset_default_transport, stub_backend, transport
+
+
+class TestTransport(object):
+    @staticmethod
+    def test_shared_by_default(gp):
+        with vcr.use_cassette('public_API/europe_gp.yaml'):
+            other = pigskin()
+
+        assert gp._store.transport is default_transport()
+        assert other._store.transport is gp._store.transport
+        assert other._store.s.get_adapter('https://') is gp._store.s.get_adapter('https://')
+
+        # connections are shared; cookies are not
+        assert other._store.s is not gp._store.s
+
+
+    @staticmethod
+    def test_reset():
+        old = default_transport()
+        reset_default_transport()
+
+        assert default_transport() is not old
+        assert default_transport() is default_transport()
+
+
+    @staticmethod
+    def test_injected():
+        t = transport(pool_maxsize=32, keep_alive=False, compression=False)
+        s = requests.Session()
+        s.headers['User-Agent'] = 'test'
+
+        with vcr.use_cassette('public_API/europe_gp.yaml'):
+            gp = pigskin(transport=t, session=s)
+
+        assert gp._store.s is s
+        assert gp._store.rate_limiter is t.rate_limiter
+        assert s.get_adapter('https://') is t.backend.adapter
+        assert t.backend.adapter._pool_maxsize == 32
+        assert s.headers['Connection'] == 'close'
+        assert s.headers['Accept-Encoding'] == 'identity'
+        assert s.headers['User-Agent'] == 'test'
+
+
+    @staticmethod
+    def test_session():
+        s = transport().session('http://proxy.invalid:3128')
+        assert s.proxies == {'http': 'http://proxy.invalid:3128', 'https': 'http://proxy.invalid:3128'}
+        assert 'gzip' in s.headers['Accept-Encoding']
+        assert s.headers['Connection'] == 'keep-alive'
+
+
+class TestStubBackend(object):
+    @staticmethod
+    def test_pigskin():
+        config_url = 'https://www.nflgamepass.com/api/en/content/v1/web/config'
+        games_url = 'https://gp.invalid/games/seasons'
+        backend = stub_backend({
+            config_url: {'modules': {'ROUTES_DATA_PROVIDERS': {'games': games_url}}},
+            games_url: {'modules': {'meta': {'currentContext': {
+                'currentSeason': 2017, 'currentSeasonType': 'reg', 'currentWeek': 8,
+            }}}},
+        })
+        gp = pigskin(transport=transport(backend=backend))
+
+        assert gp.current == {'season': 2017, 'season_type': 'reg', 'week': '8'}
+        assert backend.requests == [('GET', config_url), ('GET', games_url)]
+
+        # unknown URLs get a 404, and parse as any other invalid response
+        backend.responses[games_url] = (404, 'not found')
+        gp._store.json_decoder.shared.clear()
+        assert gp._data.get_seasons() is None
+        assert backend.requests[-1] == ('GET', games_url)
+        assert len(backend.requests) == 3
+
+
+class TestHttpxBackend(object):
+    @staticmethod
+    def test_session(hls_server):
+        pytest.importorskip('httpx')
+        t = transport(backend='httpx')
+        s = t.session()
+        s.cookies.set('session', 'abc', domain='127.0.0.1', path='/')
+
+        r = s.get(hls_server.base_url + '/vod/manifest.m3u8')
+        assert r.ok
+        assert r.text.startswith('#EXTM3U')
+        assert r.url == hls_server.base_url + '/vod/manifest.m3u8'
+
+        r = s.get(hls_server.base_url + '/vod/missing.ts')
+        assert r.status_code == 404
+        with pytest.raises(requests.exceptions.HTTPError):
+            r.raise_for_status()
+
+        # requests go through the transport's request layer
+        host = '127.0.0.1:{0}'.format(hls_server.server_address[1])
+        assert t.rate_limiter.stats(host)['in_flight'] == 0
+        assert t.circuit_breakers.stats()[host + '/vod/manifest.m3u8']['state'] == 'closed'
+        assert [c.name for c in s.cookies] == ['session']
+
+        s.close()
+        t.close()
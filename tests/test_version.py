@@ -73,3 +73,51 @@ class TestVersionAuth(object):
             for s in version.streams:
                 assert version.streams[s]
                 # TODO: test that they are of type ``stream``
+
+
+class TestResolveStreams(object):
+    @staticmethod
+    def test_batch(gp, monkeypatch):
+        calls = {'refresh_tokens': 0, 'diva_config': 0}
+        posted = []
+
+        def refresh_tokens():
+            calls['refresh_tokens'] += 1
+            return True
+
+        def get_diva_config(url):
+            calls['diva_config'] += 1
+            return {'video_data_url': 'https://video.invalid/{V.ID}', 'processing_url': 'https://processing.invalid'}
+
+        def resolve(video_id, diva_config, formats=None):
+            if video_id == 'broken':
+                return {}
+            streams = {}
+            for f in ['hls', 'chromecast']:
+                if formats is None or f in formats:
+                    posted.append((video_id, f))
+                    streams[f] = 'https://stream.invalid/{0}.{1}'.format(video_id, f)
+            return streams
+
+        monkeypatch.setattr(gp._auth, 'refresh_tokens_if_needed', refresh_tokens)
+        monkeypatch.setattr(gp._video, '_get_diva_config', get_diva_config)
+        monkeypatch.setattr(gp._video, '_resolve_diva_streams', resolve)
+        gp._store.stream_cache.clear()
+        gp._store.stream_cache.set('cached', {'hls': 'https://stream.invalid/cached.hls'})
+
+        video_ids = ['video-{0}'.format(i) for i in range(6)] + ['broken', 'cached']
+        results = dict(gp.resolve_streams(video_ids, formats=['hls'], max_workers=3))
+
+        assert sorted(results) == sorted(video_ids)
+        assert results['broken'] is None
+        assert results['cached'] == {'hls': 'https://stream.invalid/cached.hls'}
+        assert results['video-3'] == {'hls': 'https://stream.invalid/video-3.hls'}
+        assert calls == {'refresh_tokens': 1, 'diva_config': 1}
+        assert sorted(posted) == [('video-{0}'.format(i), 'hls') for i in range(6)]
+
+        # only complete results are cached
+        assert 'video-3' not in gp._store.stream_cache
+        assert dict(gp.resolve_streams(['video-3']))['video-3']['chromecast']
+        assert 'video-3' in gp._store.stream_cache
+
+        gp._store.stream_cache.clear()
@@ -3,6 +3,8 @@ from collections import OrderedDict
 import pytest
 import vcr
 
+from pigskin.cache import ttl_cache
+
 
 try:  # Python 2.7
     # requests's ``json()`` function returns strings as unicode (as per the
@@ -82,3 +84,79 @@ class TestWeek(object):
                 assert dt_prev <= dt_game
 
             prev = game
+
+
+class TestIterGames(object):
+    @staticmethod
+    def fake_season(gp, monkeypatch):
+        from pigskin.pigskin import season
+
+        fetched = []
+
+        def get_week_games(s, st, w):
+            fetched.append((st, w))
+            return OrderedDict([
+                ('{0}{1}@Bears'.format(st, w), {
+                    'city': 'Chicago', 'stadium': 'Soldier Field', 'phase': 'FINAL',
+                    'start_time': '2017-09-10T17:00:00.000Z',
+                    'home': {'name': 'Bears', 'city': 'Chicago', 'points': 7},
+                    'away': {'name': 'Packers', 'city': 'Green Bay', 'points': 10},
+                    'versions': {},
+                }),
+            ])
+
+        season_obj = season(gp, '2017')
+        monkeypatch.setattr(gp, '_seasons', OrderedDict([('2017', season_obj)]))
+        monkeypatch.setattr(gp, '_schedule_index', None)
+        monkeypatch.setattr(gp._data, 'get_weeks', lambda s: OrderedDict([
+            ('pre', OrderedDict([('1', '')])),
+            ('reg', OrderedDict([('1', ''), ('2', '')])),
+            ('post', OrderedDict()),
+        ]))
+        monkeypatch.setattr(gp._data, 'get_week_games', get_week_games)
+
+        return season_obj, fetched
+
+
+    @staticmethod
+    def test_iter_games(gp, monkeypatch):
+        season_obj, fetched = TestIterGames.fake_season(gp, monkeypatch)
+
+        games = gp.iter_games(season_types=['reg'])
+        first = next(games)
+
+        # nothing is fetched ahead of what is consumed
+        assert fetched == [('reg', '1')]
+        assert first.away['name'] == 'Packers'
+        assert len(list(games)) == 1
+        assert fetched == [('reg', '1'), ('reg', '2')]
+        assert list(season_obj.weeks['reg']['2'].games) == ['reg2@Bears']
+
+
+    @staticmethod
+    def test_iter_games_read_ahead(gp, monkeypatch):
+        season_obj, fetched = TestIterGames.fake_season(gp, monkeypatch)
+
+        games = list(gp.iter_games(['2017'], read_ahead=True, cache=False))
+
+        assert [g.home['name'] for g in games] == ['Bears'] * 3
+        assert fetched == [('pre', '1'), ('reg', '1'), ('reg', '2')]
+        assert season_obj.weeks['reg']['1']._games is None
+
+
+class TestNegativeCache(object):
+    @staticmethod
+    def test_failed_games(gp, monkeypatch):
+        season_obj, fetched = TestIterGames.fake_season(gp, monkeypatch)
+        monkeypatch.setattr(gp._store, 'negative_cache', ttl_cache(60))
+        monkeypatch.setattr(gp._data, 'get_week_games', lambda s, st, w: fetched.append(w))
+
+        week_obj = season_obj.weeks['reg']['1']
+        assert week_obj.games is None
+        assert week_obj.games is None
+        assert fetched == ['1']
+
+        # retried once the failure is forgotten
+        gp._store.negative_cache.clear()
+        assert week_obj.games is None
+        assert fetched == ['1', '1']
@@ -0,0 +1,122 @@
+import pytest
+from xml.etree.ElementTree import ParseError
+
+from pigskin import settings
+from pigskin.transport import response
+from pigskin.xmlstream import CHUNK_SIZE, find_parameters, find_video_sources
+
+DIVA_CONFIG = (
+    b'<?xml version="1.0" encoding="utf-8"?>\n'
+    b'<settings version="1">\n'
+    b'  <entitlementCheck enabled="true">\n'
+    b'    <parameter name="processingUrlCallPath" value="https://host/open" />\n'
+    b'    <parameter name="heartBeatCallPath" value="https://host/heartbeat" />\n'
+    b'  </entitlementCheck>\n'
+    b'  <videoData enabled="true">\n'
+    b'    <parameter name="videoDataPath" value="https://host/diva/{V.ID}" />\n'
+    b'    <parameter name="videoDataPath" value="https://host/ignored" />\n'
+    b'  </videoData>\n'
+)
+
+VIDEO_DATA = (
+    b'<?xml version="1.0" encoding="utf-8"?>\n'
+    b'<video>\n'
+    b'  <videoId>abc</videoId>\n'
+    b'  <videoSources>\n'
+    b'    <videoSource format="HLS-V3" name="HLS"><uri><![CDATA[https://host/hls.m3u8]]></uri></videoSource>\n'
+    b'    <videoSource format="HLS-V3" name="ChromeCast"><uri>https://host/cc.m3u8</uri></videoSource>\n'
+    b'    <videoSource format="HLS-V3"><uri>https://host/nameless.m3u8</uri></videoSource>\n'
+    b'    <videoSource name="NoUri"><drm /></videoSource>\n'
+    b'  </videoSources>\n'
+)
+
+
+class streamed_response(response):
+    """A response which counts the bytes read from its body."""
+    def __init__(self, content):
+        super(streamed_response, self).__init__(200, content, {}, 'https://host/')
+        self.bytes_read = 0
+        self.closed = False
+
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        for chunk in super(streamed_response, self).iter_content(chunk_size):
+            self.bytes_read += len(chunk)
+            yield chunk
+
+
+    def close(self):
+        self.closed = True
+
+
+def padding(size):
+    return b''.join(b'  <parameter name="padding" value="x" />\n' for _ in range(size // 40))
+
+
+class TestFindParameters(object):
+    @staticmethod
+    def test_found():
+        r = streamed_response(DIVA_CONFIG + b'</settings>')
+        parameters = find_parameters(r, ['processingUrlCallPath', 'videoDataPath'])
+
+        assert parameters == {
+            'processingUrlCallPath': 'https://host/open',
+            'videoDataPath': 'https://host/diva/{V.ID}',
+        }
+        assert r.closed
+
+
+    @staticmethod
+    def test_missing():
+        r = streamed_response(DIVA_CONFIG + b'</settings>')
+        assert find_parameters(r, ['processingUrlCallPath', 'secretTxt']) == {'processingUrlCallPath': 'https://host/open'}
+
+
+    @staticmethod
+    def test_stops_reading():
+        # the tail is neither parsed (it is not even valid XML) nor read, past
+        # what is drained to keep the connection
+        tail = padding(10 * settings.xml_drain_bytes) + b'<unclosed>'
+        r = streamed_response(DIVA_CONFIG + tail)
+        parameters = find_parameters(r, ['processingUrlCallPath', 'videoDataPath'])
+
+        assert len(parameters) == 2
+        assert r.bytes_read <= len(DIVA_CONFIG) + settings.xml_drain_bytes + 2 * CHUNK_SIZE
+
+
+    @staticmethod
+    def test_invalid():
+        for body in [b'', b'{"json": true}', b'<html><body>']:
+            r = streamed_response(body)
+            with pytest.raises(ParseError):
+                find_parameters(r, ['processingUrlCallPath'])
+            assert r.closed
+
+
+class TestFindVideoSources(object):
+    @staticmethod
+    def test_found():
+        r = streamed_response(VIDEO_DATA + b'</video>')
+
+        assert find_video_sources(r) == [
+            ('HLS', 'https://host/hls.m3u8'),
+            ('ChromeCast', 'https://host/cc.m3u8'),
+            (None, 'https://host/nameless.m3u8'),
+            ('NoUri', None),
+        ]
+        assert r.closed
+
+
+    @staticmethod
+    def test_stops_reading():
+        tail = b'  <customAttributes>\n' + padding(10 * settings.xml_drain_bytes) + b'<unclosed>'
+        r = streamed_response(VIDEO_DATA + tail)
+
+        assert len(find_video_sources(r)) == 4
+        assert r.bytes_read <= len(VIDEO_DATA) + settings.xml_drain_bytes + 2 * CHUNK_SIZE
+
+
+    @staticmethod
+    def test_none():
+        r = streamed_response(b'<video><videoId>abc</videoId></video>')
+        assert find_video_sources(r) == []